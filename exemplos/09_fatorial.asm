@@ -6,8 +6,8 @@ lcl r2, 1                # resultado = 1
 lcl r3, 1                # contador = 1
 
 loop:
-slt r4, r3, r1           # r4 = (contador < n)
-beq r4, r0, fim          # Se r4 == 0, termina
+slt r4, r1, r3           # r4 = (n < contador)
+bne r4, r0, fim          # Se contador > n, termina
 
 mul r2, r2, r3           # resultado *= contador
 inc r3, r3               # contador++
@@ -7,8 +7,8 @@ lcl r3, 10               # n = 10
 lcl r4, 2                # contador = 2
 
 loop:
-slt r5, r4, r3           # r5 = (contador < n)
-beq r5, r0, fim          # Se r5 == 0, termina
+slt r5, r3, r4           # r5 = (n < contador)
+bne r5, r0, fim          # Se contador > n, termina
 
 add r6, r1, r2           # fib(i) = fib(i-1) + fib(i-2)
 passa r1, r2             # fib(i-2) = fib(i-1)
@@ -0,0 +1,335 @@
+"""
+conformidade_alu.py - Conformidade da ALU com o Modelo Vetorizado
+
+Compara cada operação de alu.ALU (resultado e flags N/Z/C/V) com o modelo
+de referência em NumPy (simulador/vector_alu.py, o mesmo da execução em
+lote) sobre:
+
+    - pares de casos de borda (0, 1, 0x7FFFFFFF, 0x80000000, 0xFFFFFFFF...)
+    - pares aleatórios (uniformes, borda x aleatório e pequenos com sinal)
+    - todos os pares de valores de N bits, em três imersões em 32 bits:
+      estendidos com zero, estendidos com sinal e alinhados ao bit 31
+      (carry e overflow acontecem como numa ALU de N bits)
+
+Os pares são divididos em blocos executados num pool de processos. Cada
+divergência é reduzida (zerando bits enquanto continua divergindo) e
+impressa como um reprodutor mínimo.
+
+Uso:
+    python src/ferramentas/conformidade_alu.py
+    python src/ferramentas/conformidade_alu.py --ops sub,neg,div --random 1000000 -j 8
+    python src/ferramentas/conformidade_alu.py --bits 10 --json conformidade.json
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_path = os.path.join(_SRC, 'simulador')
+if _path not in sys.path:
+    sys.path.insert(0, _path)
+
+from alu import ALU  # noqa: E402
+from vector_alu import OPERATIONS, flag_bits  # noqa: E402
+
+EDGE_VALUES = [
+    0x00000000, 0x00000001, 0x00000002, 0x00000003, 0x0000001F, 0x00000020,
+    0x00007FFF, 0x00008000, 0x0000FFFF, 0x00010000, 0x7FFFFFFE, 0x7FFFFFFF,
+    0x80000000, 0x80000001, 0xFFFF0000, 0xFFFFFFFE, 0xFFFFFFFF
+]
+
+EMBEDDINGS = ('zero', 'sinal', 'alto')
+
+DEFAULT_RANDOM = 100000
+DEFAULT_BITS = 8
+CHUNK_PAIRS = 1 << 16
+MAX_REPRODUCERS = 5
+
+
+# ==================== OPERANDOS ====================
+
+def edge_pairs():
+    """Todos os pares de EDGE_VALUES."""
+    a, b = np.meshgrid(np.array(EDGE_VALUES, np.uint32),
+                       np.array(EDGE_VALUES, np.uint32))
+    return a.ravel(), b.ravel()
+
+
+def random_pairs(rng, count):
+    """
+    Pares aleatórios: metade uniformes, um quarto borda x aleatório e um
+    quarto de valores pequenos com sinal (divisão e módulo).
+    """
+    a = rng.integers(0, 1 << 32, count, dtype=np.uint64).astype(np.uint32)
+    b = rng.integers(0, 1 << 32, count, dtype=np.uint64).astype(np.uint32)
+    edge = np.array(EDGE_VALUES, np.uint32)
+    quarter = count // 4
+    b[:quarter] = rng.choice(edge, quarter)
+    small = slice(quarter, 2 * quarter)
+    a[small] = rng.integers(-128, 128, quarter).astype(np.uint32)
+    b[small] = rng.integers(-8, 8, quarter).astype(np.uint32)
+    return a, b
+
+
+def embed(values, bits, embedding):
+    """Leva valores de N bits para 32 bits (zero, sinal ou alinhado ao bit 31)."""
+    values = values.astype(np.int64)
+    if embedding == 'zero':
+        return values.astype(np.uint32)
+    if embedding == 'sinal':
+        sign = 1 << (bits - 1)
+        return ((values ^ sign) - sign).astype(np.uint32)
+    return (values << (32 - bits)).astype(np.uint32)
+
+
+def exhaustive_pairs(bits, embedding, arity):
+    """Todos os pares (ou valores, para operações unárias) de N bits."""
+    values = embed(np.arange(1 << bits), bits, embedding)
+    if arity < 2:
+        return values, np.zeros_like(values)
+    a, b = np.meshgrid(values, values)
+    return a.ravel(), b.ravel()
+
+
+# ==================== COMPARAÇÃO ====================
+
+def alu_results(name, arity, a, b):
+    """Resultados e flags (N<<3 | Z<<2 | C<<1 | V) da ALU, par a par."""
+    alu = ALU()
+    method = getattr(alu, name)
+    flags_of = alu.get_flag_values
+    results = array('I')
+    flags = array('B')
+    append_result = results.append
+    append_flags = flags.append
+    # DIV/MOD por zero imprimem aviso
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        for x, y in zip(a.tolist(), b.tolist()):
+            if arity == 2:
+                append_result(method(x, y))
+            elif arity == 1:
+                append_result(method(x))
+            else:
+                append_result(method())
+            n, z, c, v = flags_of()
+            append_flags(n << 3 | z << 2 | c << 1 | v)
+    return (np.frombuffer(results, np.uint32),
+            np.frombuffer(flags, np.uint8))
+
+
+def reference_results(name, a, b):
+    """Resultados e flags do modelo vetorizado (flags None se não alterados)."""
+    function, arity = OPERATIONS[name]
+    operands = (a, b & 0xFFFF) if name.startswith('load_const') else (a, b)
+    result, state = function(*operands[:max(arity, 1)])
+    if state is None:
+        return result, None
+    kind, fa, fb = state
+    return result, flag_bits(kind, result, fa, fb)
+
+
+def check_chunk(name, a, b):
+    """
+    Compara ALU e referência num bloco de pares.
+    Retorna (nº de pares, índices divergentes).
+    """
+    arity = OPERATIONS[name][1]
+    if name.startswith('load_const'):
+        b = b & 0xFFFF
+    results, flags = alu_results(name, arity, a, b)
+    expected, expected_flags = reference_results(name, a, b)
+    bad = results != expected
+    if expected_flags is not None:
+        bad |= flags != expected_flags
+    return len(a), np.flatnonzero(bad)
+
+
+def run_chunk(name, a_bytes, b_bytes):
+    """Worker: compara um bloco e devolve os pares divergentes."""
+    a = np.frombuffer(a_bytes, np.uint32)
+    b = np.frombuffer(b_bytes, np.uint32)
+    count, bad = check_chunk(name, a, b)
+    return name, count, [(int(a[i]), int(b[i])) for i in bad[:100]], len(bad)
+
+
+# ==================== REPRODUTORES ====================
+
+def fails(name, a, b):
+    """True se o par (a, b) diverge."""
+    return len(check_chunk(name, np.array([a], np.uint32),
+                           np.array([b], np.uint32))[1]) > 0
+
+
+def shrink(name, a, b):
+    """
+    Reduz um par divergente: tenta zerar cada bit (do mais alto ao mais
+    baixo) de cada operando, mantendo a divergência, até não haver mudança.
+    """
+    arity = OPERATIONS[name][1]
+    changed = True
+    while changed:
+        changed = False
+        for bit in range(31, -1, -1):
+            mask = ~(1 << bit) & 0xFFFFFFFF
+            if a & (1 << bit) and fails(name, a & mask, b):
+                a &= mask
+                changed = True
+            if arity == 2 and b & (1 << bit) and fails(name, a, b & mask):
+                b &= mask
+                changed = True
+    return a, b
+
+
+def describe(name, a, b):
+    """Reprodutor: chamada da ALU, resultado obtido e esperado."""
+    arity = OPERATIONS[name][1]
+    if name.startswith('load_const'):
+        b &= 0xFFFF
+    args = [f"0x{a:08x}", f"0x{b:08x}"][:arity]
+    results, flags = alu_results(name, arity, np.array([a], np.uint32),
+                                 np.array([b], np.uint32))
+    expected, expected_flags = reference_results(
+        name, np.array([a], np.uint32), np.array([b], np.uint32))
+    text = (f"ALU().{name}({', '.join(args)}) -> 0x{int(results[0]):08x} "
+            f"NZCV={int(flags[0]):04b}; referência 0x{int(expected[0]):08x}")
+    # Assinatura: resultado diverge? e quais flags divergem
+    signature = [bool(results[0] != expected[0]), 0]
+    if expected_flags is not None:
+        text += f" NZCV={int(expected_flags[0]):04b}"
+        signature[1] = int(flags[0] ^ expected_flags[0])
+    return {'operacao': name, 'a': a, 'b': b, 'reprodutor': text,
+            'assinatura': signature}
+
+
+# ==================== EXECUÇÃO ====================
+
+def build_work(names, random_count, bits, seed):
+    """Gera (nome, a, b) para todos os conjuntos de pares pedidos."""
+    rng = np.random.default_rng(seed)
+    for name in names:
+        arity = OPERATIONS[name][1]
+        yield (name,) + edge_pairs()
+        if random_count:
+            yield (name,) + random_pairs(rng, random_count)
+        if bits:
+            for embedding in EMBEDDINGS:
+                yield (name,) + exhaustive_pairs(bits, embedding, arity)
+
+
+def run_harness(names, random_count=DEFAULT_RANDOM, bits=DEFAULT_BITS,
+                seed=0, jobs=None):
+    """
+    Executa a comparação em paralelo.
+
+    Retorna: dicionário por operação com 'pares', 'divergencias' e até
+    MAX_REPRODUCERS reprodutores mínimos (um por assinatura de divergência)
+    """
+    summary = {name: {'pares': 0, 'divergencias': 0, 'exemplos': []}
+               for name in names}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = []
+        for name, a, b in build_work(names, random_count, bits, seed):
+            for start in range(0, len(a), CHUNK_PAIRS):
+                chunk = slice(start, start + CHUNK_PAIRS)
+                futures.append(pool.submit(
+                    run_chunk, name, np.ascontiguousarray(a[chunk]).tobytes(),
+                    np.ascontiguousarray(b[chunk]).tobytes()))
+        for future in futures:
+            name, count, examples, bad = future.result()
+            entry = summary[name]
+            entry['pares'] += count
+            entry['divergencias'] += bad
+            entry['exemplos'].extend(examples[:MAX_REPRODUCERS])
+
+    for name, entry in summary.items():
+        # Um reprodutor por assinatura, o de menos bits ligados
+        pairs = sorted({shrink(name, a, b) for a, b in entry.pop('exemplos')},
+                       key=lambda pair: (bin(pair[0]).count('1') +
+                                         bin(pair[1]).count('1'), pair))
+        reproducers = []
+        seen = set()
+        for pair in pairs:
+            reproducer = describe(name, *pair)
+            signature = tuple(reproducer['assinatura'])
+            if signature not in seen:
+                seen.add(signature)
+                reproducers.append(reproducer)
+        entry['reprodutores'] = reproducers[:MAX_REPRODUCERS]
+    return summary
+
+
+def parse_ops(text):
+    """Converte lista de operações separadas por vírgula."""
+    names = text.split(',')
+    for name in names:
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"operação desconhecida: {name} (opções: {', '.join(OPERATIONS)})")
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Conformidade da ALU com o modelo vetorizado (NumPy)")
+    parser.add_argument('--ops', type=parse_ops, default=list(OPERATIONS),
+                        metavar='OPERACOES',
+                        help="métodos da ALU a testar (padrão: todos)")
+    parser.add_argument('--random', type=int, default=DEFAULT_RANDOM,
+                        metavar='N', help=f"pares aleatórios por operação "
+                        f"(padrão: {DEFAULT_RANDOM})")
+    parser.add_argument('--bits', type=int, default=DEFAULT_BITS,
+                        help=f"largura da varredura exaustiva, 0 para omitir "
+                        f"(padrão: {DEFAULT_BITS})")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="processos (padrão: nº de CPUs)")
+    parser.add_argument('--json', metavar='ARQUIVO',
+                        help="grava resumo em JSON ('-' para saída padrão)")
+    args = parser.parse_args()
+    if not 0 <= args.bits <= 12:
+        parser.error("--bits deve estar entre 0 e 12")
+
+    start_time = time.perf_counter()
+    summary = run_harness(args.ops, args.random, args.bits, args.seed,
+                          args.jobs)
+    elapsed = time.perf_counter() - start_time
+    total = sum(entry['pares'] for entry in summary.values())
+    failures = sum(entry['divergencias'] for entry in summary.values())
+
+    if args.json:
+        report = {'total': total, 'divergencias': failures,
+                  'segundos': round(elapsed, 3), 'operacoes': summary}
+        if args.json == '-':
+            json.dump(report, sys.stdout, indent=2)
+            print()
+        else:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+    if args.json != '-':
+        print("=" * 70)
+        print("CONFORMIDADE DA ALU")
+        print("=" * 70)
+        for name, entry in summary.items():
+            symbol = '❌' if entry['divergencias'] else '✓'
+            print(f"{symbol} {name:<16} {entry['pares']:>10} pares, "
+                  f"{entry['divergencias']} divergências")
+            for reproducer in entry['reprodutores']:
+                print(f"    {reproducer['reprodutor']}")
+        print("-" * 70)
+        print(f"Total: {total} pares em {elapsed:.2f} s "
+              f"({total / elapsed / 1e6:.2f} M pares/s), "
+              f"{failures} divergências")
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,477 @@
+"""
+desempenho.py - Benchmarks de Desempenho do Simulador
+
+Mede a vazão do simulador na máquina hospedeira e compara com uma linha
+de base salva:
+
+    sim_<modo>_<programa>  instruções simuladas/s (staged, fast, translate,
+                           pipeline e verbose, com a saída descartada)
+    decodificacao          InstructionDecoder.decode por segundo
+    montagem               linhas/s de Assembler.assemble_lines
+    carga_<formato>        palavras/s dos carregadores de Memory (texto sem
+                           e com cache, binário e imagem empacotada)
+    partida_<programa>     tempo de partida a frio de simulador/main.py e
+                           interpretador/main.py (segundos)
+
+Os programas são versões ampliadas de exemplos/09_fatorial.asm (12!) e
+exemplos/10_fibonacci.asm (F(40)), repetidas num laço externo.
+
+Cada benchmark é executado --repeat vezes; o JSON guarda as amostras. O
+comando compare aplica o teste t de Welch entre base e atual e aponta
+como regressão a piora maior que --threshold com p < --alpha.
+
+Uso:
+    python src/ferramentas/desempenho.py run -o base.json
+    python src/ferramentas/desempenho.py run -o atual.json --only sim_fast,montagem
+    python src/ferramentas/desempenho.py compare base.json atual.json
+    python src/ferramentas/desempenho.py run --baseline base.json --repeat 10
+"""
+
+import argparse
+import contextlib
+import datetime
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_ROOT = os.path.dirname(_SRC)
+for _module_dir in ('simulador', 'interpretador'):
+    _path = os.path.join(_SRC, _module_dir)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from assembler import Assembler  # noqa: E402
+from instruction_decoder import InstructionDecoder  # noqa: E402
+from memory import Memory  # noqa: E402
+from program_image import write_image_file  # noqa: E402
+from simulador import Simulator  # noqa: E402
+from text_loader import ParsedImageCache  # noqa: E402
+
+RESULTS_VERSION = 1
+DEFAULT_REPEAT = 5
+DEFAULT_ALPHA = 0.05
+DEFAULT_THRESHOLD = 5.0  # %
+
+# Programa de exemplo, substituições (escala do cálculo) e repetições
+# do laço externo com escala 1.0
+WORKLOADS = {
+    'fatorial': ('09_fatorial.asm', {'lcl r1, 5': 'lcl r1, 12'}, 700),
+    'fibonacci': ('10_fibonacci.asm', {'lcl r3, 10': 'lcl r3, 40'}, 200),
+}
+
+SIM_MODES = (Simulator.MODE_STAGED, Simulator.MODE_FAST,
+             Simulator.MODE_TRANSLATE, Simulator.MODE_PIPELINE, 'verbose')
+VERBOSE_FRACTION = 50      # modo verboso executa 1/50 das repetições
+DECODE_COUNT = 200000
+ASSEMBLE_LINES = 100000
+LOAD_WORDS = 60000
+
+
+# ==================== PROGRAMAS ====================
+
+def scaled_source(name, repeats):
+    """
+    Versão ampliada de um exemplo: o corpo (sem o HALT) é repetido
+    'repeats' vezes por um laço externo em R20/R21.
+    """
+    filename, replacements, _ = WORKLOADS[name]
+    with open(os.path.join(_ROOT, 'exemplos', filename), encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    body = []
+    for line in lines:
+        for old, new in replacements.items():
+            line = line.replace(old, new)
+        if line.split('#')[0].strip() != 'halt':
+            body.append(line)
+    return ([f"# {filename} repetido {repeats} vezes",
+             "lcl r20, 0",
+             f"lch r21, {repeats >> 16}",
+             f"lcl r21, {repeats & 0xFFFF}",
+             "repete:"] + body +
+            ["inc r20, r20", "bne r20, r21, repete", "halt"])
+
+
+def assemble(lines):
+    """Monta linhas e retorna o Assembler."""
+    assembler = Assembler()
+    with _quiet():
+        assembler.assemble_lines(lines)
+    return assembler
+
+
+@contextlib.contextmanager
+def _quiet():
+    """Descarta a saída padrão (carregadores e simulação imprimem)."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+# ==================== BENCHMARKS ====================
+# Cada função executa uma amostra e retorna o valor medido.
+
+def bench_simulation(mode, words):
+    """Instruções simuladas por segundo."""
+    verbose = mode == 'verbose'
+    sim = Simulator(verbose=verbose,
+                    mode=Simulator.MODE_STAGED if verbose else mode)
+    for address, word in words:
+        sim.memory.write(address, word)
+    with _quiet():
+        start = time.perf_counter()
+        sim.run(max_cycles=10 ** 12)
+        elapsed = time.perf_counter() - start
+    return sim.instruction_count / elapsed
+
+
+def bench_decode(words):
+    """Decodificações por segundo (InstructionDecoder.decode)."""
+    decode = InstructionDecoder().decode
+    start = time.perf_counter()
+    for word in words:
+        decode(word)
+    return len(words) / (time.perf_counter() - start)
+
+
+def bench_assemble(sources, copies):
+    """Linhas montadas por segundo (Assembler.assemble_lines)."""
+    assembler = Assembler()
+    with _quiet():
+        start = time.perf_counter()
+        for _ in range(copies):
+            for lines in sources:
+                assembler.assemble_lines(lines)
+        elapsed = time.perf_counter() - start
+    return sum(len(lines) for lines in sources) * copies / elapsed
+
+
+def bench_load(loader, filename, words, **options):
+    """Palavras carregadas por segundo por um carregador de Memory."""
+    memory = Memory()
+    with _quiet():
+        start = time.perf_counter()
+        getattr(memory, loader)(filename, **options)
+        elapsed = time.perf_counter() - start
+    return words / elapsed
+
+
+def bench_cold_start(command):
+    """Segundos até o processo terminar (interpretador Python novo)."""
+    start = time.perf_counter()
+    subprocess.run(command, stdout=subprocess.DEVNULL,
+                   stderr=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+# ==================== SUÍTE ====================
+
+def build_suite(workdir, scale):
+    """
+    Prepara arquivos de trabalho em workdir e retorna lista de
+    (nome, unidade, maior_melhor, função sem argumentos).
+    """
+    suite = []
+    assembled = {}
+    for name, (_, _, repeats) in WORKLOADS.items():
+        count = max(1, int(repeats * scale))
+        assembled[name] = assemble(scaled_source(name, count))
+        verbose_words = assemble(scaled_source(
+            name, max(1, count // VERBOSE_FRACTION))).words
+        for mode in SIM_MODES:
+            words = verbose_words if mode == 'verbose' else assembled[name].words
+            suite.append((f"sim_{mode}_{name}", 'instr/s', True,
+                          lambda mode=mode, words=words:
+                          bench_simulation(mode, words)))
+
+    program_words = [word for a in assembled.values() for _, word in a.words]
+    decode_words = (program_words *
+                    (int(DECODE_COUNT * scale) // len(program_words) + 1))
+    suite.append(('decodificacao', 'decodificações/s', True,
+                  lambda: bench_decode(decode_words)))
+
+    sources = [scaled_source(name, 1) for name in WORKLOADS]
+    copies = max(1, int(ASSEMBLE_LINES * scale) //
+                 sum(len(lines) for lines in sources))
+    suite.append(('montagem', 'linhas/s', True,
+                  lambda: bench_assemble(sources, copies)))
+
+    # Programa grande para os carregadores: código repetido até LOAD_WORDS
+    words = (program_words * (LOAD_WORDS // len(program_words) + 1))[:LOAD_WORDS]
+    text_file = os.path.join(workdir, 'carga.bin')
+    with open(text_file, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(f"{word:032b}" for word in words))
+    raw_file = os.path.join(workdir, 'carga.raw')
+    with open(raw_file, 'wb') as f:
+        f.write(b''.join(word.to_bytes(4, 'big') for word in words))
+    image_file = os.path.join(workdir, 'carga.img')
+    write_image_file(image_file, [(0, words)])
+
+    suite.append(('carga_texto', 'palavras/s', True,
+                  lambda: bench_load('load_program_from_text', text_file,
+                                     len(words), use_cache=False)))
+    suite.append(('carga_texto_cache', 'palavras/s', True,
+                  lambda: bench_load('load_program_from_text', text_file,
+                                     len(words), use_cache=True)))
+    suite.append(('carga_binario', 'palavras/s', True,
+                  lambda: bench_load('load_program_from_binary', raw_file,
+                                     len(words))))
+    suite.append(('carga_imagem', 'palavras/s', True,
+                  lambda: bench_load('load_program_image', image_file,
+                                     len(words))))
+
+    # Partida a frio dos dois main.py com o fatorial original
+    source = os.path.join(_ROOT, 'exemplos', WORKLOADS['fatorial'][0])
+    binary = os.path.join(workdir, 'fatorial.bin')
+    with open(binary, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(assemble_file_lines(source)))
+    suite.append(('partida_simulador', 's', False, lambda: bench_cold_start(
+        [sys.executable, os.path.join(_SRC, 'simulador', 'main.py'), binary])))
+    suite.append(('partida_montador', 's', False, lambda: bench_cold_start(
+        [sys.executable, os.path.join(_SRC, 'interpretador', 'main.py'),
+         source, os.path.join(workdir, 'saida.bin')])))
+    return suite
+
+
+def assemble_file_lines(path):
+    """Linhas do formato texto de um arquivo .asm."""
+    assembler = Assembler()
+    with _quiet():
+        assembler.assemble_file(path)
+    return assembler.get_text_lines()
+
+
+def summarize(samples, unit, higher_is_better):
+    """Entrada do JSON de resultados para um benchmark."""
+    return {
+        'unidade': unit,
+        'maior_melhor': higher_is_better,
+        'amostras': samples,
+        'media': statistics.mean(samples),
+        'desvio': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'mediana': statistics.median(samples)
+    }
+
+
+def run_suite(repeat=DEFAULT_REPEAT, scale=1.0, only=None, progress=True):
+    """
+    Executa os benchmarks (com uma rodada de aquecimento cada).
+
+    Args:
+        only: prefixos de nomes a executar (None: todos)
+
+    Retorna: dicionário de resultados (formato do JSON)
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        # Cache de programas texto isolado (também nos subprocessos)
+        previous = os.environ.get(ParsedImageCache.ENV_DIR)
+        os.environ[ParsedImageCache.ENV_DIR] = os.path.join(workdir, 'cache')
+        try:
+            for name, unit, higher, function in build_suite(workdir, scale):
+                if only and not any(name.startswith(p) for p in only):
+                    continue
+                function()
+                samples = [function() for _ in range(repeat)]
+                results[name] = summarize(samples, unit, higher)
+                if progress:
+                    print(f"  {name:<28} {format_value(results[name]['media'])} "
+                          f"{unit} (±{results[name]['desvio'] / results[name]['media'] * 100:.1f}%)",
+                          file=sys.stderr)
+        finally:
+            if previous is None:
+                del os.environ[ParsedImageCache.ENV_DIR]
+            else:
+                os.environ[ParsedImageCache.ENV_DIR] = previous
+
+    return {
+        'versao': RESULTS_VERSION,
+        'data': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'repeticoes': repeat,
+        'escala': scale,
+        'benchmarks': results
+    }
+
+
+def format_value(value):
+    """Número com precisão adequada à magnitude."""
+    if value >= 1000:
+        return f"{value:,.0f}"
+    return f"{value:.4g}"
+
+
+# ==================== COMPARAÇÃO ====================
+
+def _betacf(a, b, x):
+    """Fração contínua da beta incompleta (método de Lentz)."""
+    tiny = 1e-300
+    c = 1.0
+    d = 1.0 - (a + b) * x / (a + 1.0)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        for numerator in (m * (b - m) * x / ((a + m2 - 1) * (a + m2)),
+                          -(a + m) * (a + b + m) * x / ((a + m2) * (a + m2 + 1))):
+            d = 1.0 + numerator * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-12:
+            break
+    return h
+
+
+def incomplete_beta(a, b, x):
+    """Beta incompleta regularizada I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) +
+                     a * math.log(x) + b * math.log(1.0 - x))
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def welch_test(base, current):
+    """
+    Teste t de Welch (bicaudal) entre duas listas de amostras.
+    Retorna (t, p).
+    """
+    n1, n2 = len(base), len(current)
+    if n1 < 2 or n2 < 2:
+        return 0.0, 1.0
+    m1, m2 = statistics.mean(base), statistics.mean(current)
+    v1, v2 = statistics.variance(base) / n1, statistics.variance(current) / n2
+    if v1 + v2 == 0:
+        return (0.0, 1.0) if m1 == m2 else (math.copysign(math.inf, m2 - m1), 0.0)
+    t = (m2 - m1) / math.sqrt(v1 + v2)
+    df = (v1 + v2) ** 2 / (v1 ** 2 / (n1 - 1) + v2 ** 2 / (n2 - 1))
+    return t, incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+
+
+def compare_results(base, current, alpha=DEFAULT_ALPHA,
+                    threshold=DEFAULT_THRESHOLD):
+    """
+    Compara dois resultados benchmark a benchmark.
+
+    Retorna: lista de dicionários (nome, base, atual, variação % já no
+    sentido "positivo = melhor", p e status: 'regressao', 'melhoria',
+    'ruido' ou 'ok')
+    """
+    rows = []
+    for name, old in base['benchmarks'].items():
+        new = current['benchmarks'].get(name)
+        if new is None:
+            continue
+        change = (new['media'] - old['media']) / old['media'] * 100
+        if not old.get('maior_melhor', True):
+            change = -change
+        _, p = welch_test(old['amostras'], new['amostras'])
+        if abs(change) < threshold:
+            status = 'ok'
+        elif p >= alpha:
+            status = 'ruido'
+        else:
+            status = 'regressao' if change < 0 else 'melhoria'
+        rows.append({'nome': name, 'unidade': old['unidade'],
+                     'base': old['media'], 'atual': new['media'],
+                     'variacao': change, 'p': p, 'status': status})
+    return rows
+
+
+def print_comparison(rows, alpha, threshold):
+    """Tabela da comparação."""
+    symbols = {'ok': '✓  ', 'ruido': '~  ', 'melhoria': '⬆️ ',
+               'regressao': '❌ '}
+    print("=" * 70)
+    print("COMPARAÇÃO COM A LINHA DE BASE")
+    print("=" * 70)
+    print(f"{'':3}{'Benchmark':<28} {'Base':>12} {'Atual':>12} "
+          f"{'Variação':>9} {'p':>7}")
+    print("-" * 70)
+    for row in rows:
+        print(f"{symbols[row['status']]}{row['nome']:<28} "
+              f"{format_value(row['base']):>12} {format_value(row['atual']):>12} "
+              f"{row['variacao']:>+8.1f}% {row['p']:>7.3f}")
+    print("-" * 70)
+    regressions = sum(1 for row in rows if row['status'] == 'regressao')
+    print(f"Regressões significativas (piora > {threshold:g}%, p < {alpha:g}): "
+          f"{regressions}")
+
+
+def load_results(filename):
+    """Lê arquivo de resultados."""
+    with open(filename, encoding='utf-8') as f:
+        results = json.load(f)
+    if results.get('versao') != RESULTS_VERSION:
+        raise ValueError(f"Versão de resultados não suportada: {filename}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmarks de desempenho do simulador UFLA-RISC")
+    commands = parser.add_subparsers(dest='comando', required=True)
+
+    run = commands.add_parser('run', help="executa os benchmarks")
+    run.add_argument('-o', '--output', metavar='ARQUIVO',
+                     help="grava resultados em JSON")
+    run.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                     help=f"amostras por benchmark (padrão: {DEFAULT_REPEAT})")
+    run.add_argument('--scale', type=float, default=1.0,
+                     help="fator de tamanho das cargas (padrão: 1.0)")
+    run.add_argument('--only', type=lambda text: text.split(','),
+                     metavar='PREFIXOS', help="apenas benchmarks com esses prefixos")
+    run.add_argument('--baseline', metavar='ARQUIVO',
+                     help="compara com resultados salvos ao final")
+
+    compare = commands.add_parser('compare', help="compara dois resultados")
+    compare.add_argument('base')
+    compare.add_argument('atual')
+
+    for command in (run, compare):
+        command.add_argument('--alpha', type=float, default=DEFAULT_ALPHA,
+                             help=f"nível de significância (padrão: {DEFAULT_ALPHA})")
+        command.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                             help=f"variação mínima em %% (padrão: {DEFAULT_THRESHOLD:g})")
+    args = parser.parse_args()
+
+    try:
+        if args.comando == 'run':
+            if args.repeat < 2:
+                parser.error("--repeat deve ser pelo menos 2")
+            base = load_results(args.baseline) if args.baseline else None
+            print(f"Executando benchmarks ({args.repeat} amostras)...",
+                  file=sys.stderr)
+            current = run_suite(args.repeat, args.scale, args.only)
+            if args.output:
+                with open(args.output, 'w', encoding='utf-8') as f:
+                    json.dump(current, f, indent=2)
+                print(f"✓ Resultados salvos: {args.output}")
+        else:
+            base = load_results(args.base)
+            current = load_results(args.atual)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    if base is None:
+        return 0
+    rows = compare_results(base, current, args.alpha, args.threshold)
+    print_comparison(rows, args.alpha, args.threshold)
+    return 1 if any(row['status'] == 'regressao' for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+rastro.py - Leitor de Rastros Binários
+
+Converte um rastro gravado com --trace (ver simulador/binary_trace.py)
+em texto legível, no estilo do modo verboso, ou em JSON lines, opcionalmente
+filtrando instruções por PC, opcode, registrador escrito, endereço de
+memória acessado e intervalo de instruções.
+
+Uso:
+    python src/ferramentas/rastro.py execucao.trace
+    python src/ferramentas/rastro.py execucao.trace --format jsonl -o eventos.jsonl
+    python src/ferramentas/rastro.py execucao.trace --pc 10:20 --opcode store,load
+    python src/ferramentas/rastro.py execucao.trace --addr 0x100:0x1ff --limit 50
+"""
+
+import argparse
+import json
+import os
+import sys
+
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_path = os.path.join(_SRC, 'simulador')
+if _path not in sys.path:
+    sys.path.insert(0, _path)
+
+from binary_trace import TraceError, TraceReader  # noqa: E402
+from instruction_decoder import InstructionDecoder  # noqa: E402
+
+FORMATS = ('text', 'jsonl')
+
+
+def parse_interval(text):
+    """Converte 'início[:fim]' (decimal ou 0x...) em tupla inclusiva."""
+    start, _, end = text.partition(':')
+    start = int(start, 0)
+    return start, int(end, 0) if end else start
+
+
+def parse_opcodes(text):
+    """Converte lista de mnemônicos separados por vírgula em opcodes."""
+    by_name = {name.lower(): opcode
+               for opcode, name in InstructionDecoder.OPCODE_NAMES.items()}
+    opcodes = set()
+    for name in text.lower().split(','):
+        if name not in by_name:
+            raise argparse.ArgumentTypeError(f"opcode desconhecido: {name}")
+        opcodes.add(by_name[name])
+    return opcodes
+
+
+# ==================== FILTROS ====================
+
+def build_filter(args):
+    """Retorna função step -> bool com os filtros pedidos (None: todos)."""
+    tests = []
+    if args.pc:
+        low, high = args.pc
+        tests.append(lambda step: low <= step.pc <= high)
+    if args.opcode:
+        opcodes = args.opcode
+        tests.append(lambda step: (step.ir >> 24) & 0xFF in opcodes)
+    if args.reg is not None:
+        reg = args.reg
+        tests.append(lambda step: any(r == reg for r, _ in step.registers))
+    if args.addr:
+        low, high = args.addr
+        tests.append(lambda step: any(low <= a <= high
+                                      for a, _ in step.reads + step.writes))
+    if not tests:
+        return None
+    return lambda step: all(test(step) for test in tests)
+
+
+def select(reader, args):
+    """Itera as instruções do rastro que passam pelos filtros."""
+    accept = build_filter(args)
+    emitted = 0
+    for step in reader:
+        if args.first is not None and step.index < args.first:
+            continue
+        if args.last is not None and step.index > args.last:
+            return
+        if accept is not None and not accept(step):
+            continue
+        yield step
+        emitted += 1
+        if args.limit is not None and emitted >= args.limit:
+            return
+
+
+# ==================== RENDERIZAÇÃO ====================
+
+def render_text(step, decoder):
+    """Texto de uma instrução, no estilo do modo verboso."""
+    lines = [
+        "=" * 70,
+        f"Instrução #{step.index} - Ciclo {step.cycle + 1} - PC {step.pc} "
+        f"(0x{step.pc:04x})",
+        "=" * 70,
+        f"IR <- 0x{step.ir:08x}",
+        f"Instrução: {decoder.format_instruction(decoder.decode(step.ir)).rstrip()}"
+    ]
+    for address, value in step.reads:
+        lines.append(f"Leitura: Memória[{address}] = 0x{value:08x}")
+    for address, value in step.writes:
+        lines.append(f"Memória[{address}] <- 0x{value:08x}")
+    for reg, value in step.registers:
+        lines.append(f"R{reg} <- 0x{value:08x}")
+    if step.flags_changed:
+        flags = step.flags
+        lines.append(f"Flags (CPU): N={flags >> 3 & 1} Z={flags >> 2 & 1} "
+                     f"C={flags >> 1 & 1} V={flags & 1}")
+    return '\n'.join(lines)
+
+
+def render_jsonl(step, decoder):
+    """Uma linha JSON por instrução."""
+    record = step.to_dict()
+    record['asm'] = decoder.format_instruction(decoder.decode(step.ir)).rstrip()
+    return json.dumps(record)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Leitor de rastros binários UFLA-RISC")
+    parser.add_argument('rastro', help="arquivo gravado com --trace")
+    parser.add_argument('--format', choices=FORMATS, default='text')
+    parser.add_argument('-o', '--output', metavar='ARQUIVO',
+                        help="arquivo de saída (padrão: saída padrão)")
+    parser.add_argument('--pc', type=parse_interval, metavar='INICIO[:FIM]',
+                        help="apenas instruções nesse intervalo de PC")
+    parser.add_argument('--opcode', type=parse_opcodes, metavar='MNEMONICOS',
+                        help="apenas esses opcodes (ex.: load,store)")
+    parser.add_argument('--reg', type=int, metavar='N',
+                        help="apenas instruções que escrevem em RN")
+    parser.add_argument('--addr', type=parse_interval, metavar='INICIO[:FIM]',
+                        help="apenas acessos à memória nesse intervalo")
+    parser.add_argument('--first', type=int, metavar='N',
+                        help="a partir da instrução N")
+    parser.add_argument('--last', type=int, metavar='N',
+                        help="até a instrução N")
+    parser.add_argument('--limit', type=int, metavar='N',
+                        help="no máximo N instruções")
+    args = parser.parse_args()
+
+    try:
+        reader = TraceReader(args.rastro)
+    except (OSError, TraceError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    decoder = InstructionDecoder()
+    render = render_text if args.format == 'text' else render_jsonl
+    out = (open(args.output, 'w', encoding='utf-8') if args.output
+           else sys.stdout)
+    try:
+        for step in select(reader, args):
+            out.write(render(step, decoder) + '\n')
+    except TraceError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""
+regressao.py - Executor Paralelo de Regressão
+
+Monta todos os programas .asm de um diretório, executa cada um num pool de
+processos e compara o estado final (registradores, PC, ciclos, instruções
+e intervalos de memória) com arquivos golden em JSON.
+
+Os workers recebem a imagem empacotada (bytes) e devolvem o estado final
+como um buffer compacto de palavras de 32 bits, sem dicionários serializados.
+
+Uso:
+    python src/ferramentas/regressao.py exemplos
+    python src/ferramentas/regressao.py exemplos --update
+    python src/ferramentas/regressao.py exemplos --json resumo.json -j 8
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _module_dir in ('simulador', 'interpretador'):
+    _path = os.path.join(_SRC, _module_dir)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from parser import AssemblyError  # noqa: E402
+
+from assembler import Assembler  # noqa: E402
+from memory import WORD_TYPECODE  # noqa: E402
+from program_image import encode_image, load_image_buffer  # noqa: E402
+from simulador import Simulator  # noqa: E402
+
+GOLDEN_VERSION = 1
+DEFAULT_MAX_CYCLES = 100000
+
+# Layout do buffer de resultado (palavras de 32 bits)
+RESULT_CYCLES = 0
+RESULT_INSTRUCTIONS = 1
+RESULT_PC = 2
+RESULT_IR = 3
+RESULT_FLAGS = 4      # N<<3 | Z<<2 | C<<1 | V
+RESULT_HALTED = 5
+RESULT_REGISTERS = 6  # 32 registradores a partir daqui
+RESULT_HEADER = RESULT_REGISTERS + 32
+
+
+# ==================== WORKER ====================
+
+def run_image(image, mode, max_cycles, ranges, capture):
+    """
+    Executa uma imagem empacotada e retorna o estado final em bytes.
+
+    Layout: cabeçalho (RESULT_*), 32 registradores, palavras de cada
+    intervalo em ranges e, se capture, sequências (início, tamanho,
+    palavras...) com as regiões não-zero da memória.
+    """
+    sim = Simulator(mode=mode)
+    info = load_image_buffer(sim.memory, image)
+    if info.entry is not None:
+        sim.cpu.set_pc(info.entry)
+
+    sim.execute(max_cycles=max_cycles)
+
+    cpu = sim.cpu
+    n, z, c, v = cpu.get_flag_values()
+    result = array(WORD_TYPECODE, [
+        sim.cycle_counter, sim.instruction_count, cpu.get_pc() & 0xFFFFFFFF,
+        cpu.get_ir(), n << 3 | z << 2 | c << 1 | v, 1 if sim.halted else 0])
+    result.extend(cpu.regs)
+
+    for start, count in ranges:
+        result.extend(sim.memory.read_block(start, count))
+
+    if capture:
+        for start, count in _non_zero_runs(sim.memory):
+            result.append(start)
+            result.append(count)
+            result.extend(sim.memory.read_block(start, count))
+
+    return result.tobytes()
+
+
+def _non_zero_runs(memory):
+    """Retorna lista de (início, tamanho) das sequências não-zero."""
+    runs = []
+    for addr in memory.get_non_zero_words():
+        if runs and runs[-1][0] + runs[-1][1] == addr:
+            runs[-1][1] += 1
+        else:
+            runs.append([addr, 1])
+    return runs
+
+
+def decode_result(raw, ranges, capture):
+    """Converte buffer devolvido por run_image em dicionário de estado."""
+    words = array(WORD_TYPECODE)
+    words.frombytes(raw)
+
+    flags = words[RESULT_FLAGS]
+    state = {
+        'cycles': words[RESULT_CYCLES],
+        'instructions': words[RESULT_INSTRUCTIONS],
+        'pc': words[RESULT_PC],
+        'ir': words[RESULT_IR],
+        'flags': {'neg': flags >> 3 & 1, 'zero': flags >> 2 & 1,
+                  'carry': flags >> 1 & 1, 'overflow': flags & 1},
+        'halted': bool(words[RESULT_HALTED]),
+        'registers': words[RESULT_REGISTERS:RESULT_HEADER].tolist(),
+        'memory': []
+    }
+
+    pos = RESULT_HEADER
+    for start, count in ranges:
+        state['memory'].append(
+            {'start': start, 'words': words[pos:pos + count].tolist()})
+        pos += count
+
+    if capture:
+        state['memory'] = []
+        while pos < len(words):
+            start, count = words[pos], words[pos + 1]
+            pos += 2
+            state['memory'].append(
+                {'start': start, 'words': words[pos:pos + count].tolist()})
+            pos += count
+
+    return state
+
+
+# ==================== GOLDEN ====================
+
+def golden_path(golden_dir, program):
+    """Caminho do arquivo golden de um programa."""
+    name = os.path.splitext(os.path.basename(program))[0]
+    return os.path.join(golden_dir, name + '.json')
+
+
+def load_golden(path):
+    """Lê arquivo golden (None se não existir)."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_golden(path, program, state, max_cycles, pipeline_cycles=None):
+    """
+    Grava estado final como arquivo golden. Os ciclos do modelo sequencial
+    ficam em 'cycles' e os do pipeline sobreposto em 'pipeline_cycles'.
+    """
+    golden = {
+        'versao': GOLDEN_VERSION,
+        'programa': os.path.basename(program),
+        'max_cycles': max_cycles,
+        'cycles': state['cycles'],
+        'pipeline_cycles': pipeline_cycles,
+        'instructions': state['instructions'],
+        'pc': state['pc'],
+        'halted': state['halted'],
+        'registers': state['registers'],
+        'memory': state['memory']
+    }
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    # Um campo por linha (listas compactas, para diffs legíveis)
+    fields = [f'  {json.dumps(key)}: {json.dumps(value)}'
+              for key, value in golden.items()]
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{\n' + ',\n'.join(fields) + '\n}\n')
+
+
+def compare_with_golden(state, golden, mode=Simulator.MODE_TRANSLATE):
+    """Retorna lista de diferenças (strings) entre estado e golden."""
+    diffs = []
+    # Os ciclos dependem do modelo de temporização (ver save_golden)
+    expected_cycles = golden.get('pipeline_cycles' if mode == Simulator.MODE_PIPELINE
+                                 else 'cycles')
+    if expected_cycles is not None and expected_cycles != state['cycles']:
+        diffs.append(f"cycles: esperado {expected_cycles}, "
+                     f"obtido {state['cycles']}")
+    for key in ('instructions', 'pc', 'halted'):
+        if key in golden and golden[key] != state[key]:
+            diffs.append(f"{key}: esperado {golden[key]}, obtido {state[key]}")
+
+    for index, (expected, actual) in enumerate(
+            zip(golden.get('registers', []), state['registers'])):
+        if expected != actual:
+            diffs.append(f"R{index}: esperado {expected}, obtido {actual}")
+
+    actual_memory = {(r['start'], len(r['words'])): r['words']
+                     for r in state['memory']}
+    for region in golden.get('memory', []):
+        start = region['start']
+        actual = actual_memory.get((start, len(region['words'])), [])
+        for offset, expected in enumerate(region['words']):
+            value = actual[offset] if offset < len(actual) else None
+            if value != expected:
+                diffs.append(f"Mem[{start + offset}]: esperado {expected}, "
+                             f"obtido {value}")
+    return diffs
+
+
+def golden_ranges(golden):
+    """Intervalos de memória (início, tamanho) registrados no golden."""
+    if not golden:
+        return []
+    return [(r['start'], len(r['words'])) for r in golden.get('memory', [])]
+
+
+# ==================== EXECUÇÃO ====================
+
+def assemble_program(path):
+    """Monta arquivo .asm e retorna imagem empacotada (bytes)."""
+    assembler = Assembler()
+    assembler.assemble_file(path)
+    return encode_image(assembler.get_segments(), assembler.get_entry_point())
+
+
+def run_suite(programs, golden_dir, mode=Simulator.MODE_TRANSLATE,
+              max_cycles=DEFAULT_MAX_CYCLES, ranges=None, update=False,
+              jobs=None):
+    """
+    Monta e executa programas em paralelo, comparando com os goldens.
+
+    Args:
+        programs: lista de caminhos .asm
+        golden_dir: diretório dos arquivos golden
+        ranges: intervalos (início, tamanho) extras de memória a comparar
+        update: se True, regrava os goldens em vez de comparar (executa
+                também o pipeline para registrar os dois modelos de ciclos)
+        jobs: número de processos (padrão: nº de CPUs)
+
+    Retorna: lista de resultados por programa (dicionários)
+    """
+    results = []
+    pending = []
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for program in programs:
+            entry = {'programa': program, 'status': 'ok', 'diffs': []}
+            results.append(entry)
+            try:
+                image = assemble_program(program)
+            except AssemblyError as e:
+                entry['status'] = 'erro'
+                entry['diffs'].append(f"montagem: {e}")
+                continue
+
+            path = golden_path(golden_dir, program)
+            golden = None if update else load_golden(path)
+            program_ranges = list(ranges or []) + golden_ranges(golden)
+            capture = update and not ranges
+            if not update and golden is None:
+                entry['status'] = 'sem_golden'
+
+            run_mode = mode
+            pipeline_future = None
+            if update:
+                if mode == Simulator.MODE_PIPELINE:
+                    run_mode = Simulator.MODE_TRANSLATE
+                pipeline_future = pool.submit(run_image, image,
+                                              Simulator.MODE_PIPELINE,
+                                              max_cycles, [], False)
+            future = pool.submit(run_image, image, run_mode, max_cycles,
+                                 program_ranges, capture)
+            pending.append((entry, future, pipeline_future, path, golden,
+                            program_ranges, capture))
+
+        for (entry, future, pipeline_future, path, golden, program_ranges,
+             capture) in pending:
+            try:
+                state = decode_result(future.result(), program_ranges, capture)
+                if pipeline_future is not None:
+                    pipeline_cycles = decode_result(pipeline_future.result(),
+                                                    [], False)['cycles']
+            except Exception as e:
+                entry['status'] = 'erro'
+                entry['diffs'].append(f"execução: {e}")
+                continue
+
+            entry['cycles'] = state['cycles']
+            entry['instructions'] = state['instructions']
+            if update:
+                save_golden(path, entry['programa'], state, max_cycles,
+                            pipeline_cycles)
+                entry['status'] = 'atualizado'
+            elif golden is not None:
+                entry['diffs'] = compare_with_golden(state, golden, mode)
+                if entry['diffs']:
+                    entry['status'] = 'falhou'
+
+    return results
+
+
+def parse_range(text):
+    """Converte 'início:tamanho' (decimal ou 0x...) em tupla."""
+    start, _, count = text.partition(':')
+    return int(start, 0) & 0xFFFF, int(count or '1', 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Executor paralelo de regressão UFLA-RISC")
+    parser.add_argument('diretorio', help="diretório com programas .asm")
+    parser.add_argument('--golden', help="diretório dos goldens "
+                        "(padrão: <diretorio>/golden)")
+    parser.add_argument('--update', action='store_true',
+                        help="regrava os goldens com o estado atual")
+    parser.add_argument('--mem', action='append', type=parse_range, default=[],
+                        metavar='INICIO:TAMANHO',
+                        help="intervalo de memória a comparar (repetível)")
+    parser.add_argument('--mode', choices=Simulator.MODES,
+                        default=Simulator.MODE_TRANSLATE)
+    parser.add_argument('--max-cycles', type=int, default=DEFAULT_MAX_CYCLES)
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+                        help="processos (padrão: nº de CPUs)")
+    parser.add_argument('--json', metavar='ARQUIVO',
+                        help="grava resumo em JSON ('-' para saída padrão)")
+    args = parser.parse_args()
+
+    programs = sorted(glob.glob(os.path.join(args.diretorio, '*.asm')))
+    if not programs:
+        print(f"❌ Nenhum programa .asm em {args.diretorio}")
+        return 1
+    golden_dir = args.golden or os.path.join(args.diretorio, 'golden')
+
+    start_time = time.perf_counter()
+    results = run_suite(programs, golden_dir, mode=args.mode,
+                        max_cycles=args.max_cycles, ranges=args.mem,
+                        update=args.update, jobs=args.jobs)
+    elapsed = time.perf_counter() - start_time
+
+    failed = [r for r in results if r['status'] in ('falhou', 'erro')]
+    summary = {
+        'total': len(results),
+        'falhas': len(failed),
+        'segundos': round(elapsed, 3),
+        'resultados': results
+    }
+
+    if args.json == '-':
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        symbols = {'ok': '✓', 'atualizado': '✓', 'sem_golden': '⚠️ ',
+                   'falhou': '❌', 'erro': '❌'}
+        for r in results:
+            name = os.path.basename(r['programa'])
+            print(f"{symbols[r['status']]} {name}: {r['status']}")
+            for diff in r['diffs'][:10]:
+                print(f"    {diff}")
+        print(f"\n{len(results)} programas, {len(failed)} falha(s) "
+              f"em {elapsed:.2f}s")
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
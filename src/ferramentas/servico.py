@@ -0,0 +1,745 @@
+"""
+servico.py - Serviço Local de Simulação
+
+Servidor JSON-RPC 2.0 (HTTP em 127.0.0.1 ou socket Unix) que recebe
+programas em assembly ou imagem e executa cada job num pool de processos
+já aquecidos: sem partida do interpretador, imports e análise por
+execução. Imagens montadas ficam em cache pelo hash SHA-256 da fonte.
+
+Métodos:
+    executar     {"fonte": "..."} ou {"imagem": "<base64>"} + opções:
+                 modo, max_ciclos, max_instrucoes, tempo_limite,
+                 registradores {"1": 10}, memoria {"0x100": 5},
+                 bits_endereco, paginada, intervalos [[início, n]],
+                 nao_zero (limite de posições não-zero a devolver)
+    montar       {"fonte": "..."} -> imagem (base64), hash, palavras
+    estatisticas jobs, cache, workers
+
+Limites: --max-jobs jobs simultâneos (além disso, a requisição espera até
+--espera segundos e recebe erro de serviço ocupado) e --timeout segundos
+por job (o cliente pode pedir menos). O modo pipeline não tem limite de
+tempo cooperativo: o teto de ciclos vem do timeout. Um job que passa do
+timeout com folga tem o worker encerrado e o pool é recriado.
+
+Uso:
+    python src/ferramentas/servico.py serve --port 8765 -j 4
+    python src/ferramentas/servico.py serve --unix /tmp/ufla-risc.sock
+    python src/ferramentas/servico.py executar exemplos/09_fatorial.asm --port 8765
+    python src/ferramentas/servico.py executar binarios/fatorial.img --unix /tmp/ufla-risc.sock \\
+        --reg 1=10 --repeat 1000
+"""
+
+import argparse
+import base64
+import hashlib
+import http.client
+import json
+import os
+import signal
+import socket
+import socketserver
+import statistics
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from multiprocessing import Manager, SimpleQueue, active_children
+
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for _module_dir in ('simulador', 'interpretador'):
+    _path = os.path.join(_SRC, _module_dir)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+from parser import AssemblyError  # noqa: E402
+
+from assembler import Assembler  # noqa: E402
+from headless import ProgramError, run_program  # noqa: E402
+from program_image import encode_image  # noqa: E402
+from simulador import Simulator  # noqa: E402
+
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 10.0      # segundos por job
+DEFAULT_CYCLE_LIMIT = 10 ** 9
+DEFAULT_CACHE_ENTRIES = 256
+DEFAULT_WAIT = 5.0          # espera por vaga quando no limite de jobs
+HARD_TIMEOUT_MARGIN = 5.0   # folga além do limite cooperativo do job
+WARM_UP_TIMEOUT = 30.0      # espera pelos workers ao subir o serviço
+# Ciclos por segundo assumidos para o modo pipeline (medido: ~200 mil/s),
+# que não aceita limite de tempo: teto de ciclos = timeout × valor
+PIPELINE_CYCLES_PER_SECOND = 100000
+MAX_NON_ZERO = 100000
+
+# Códigos de erro JSON-RPC
+ERROR_PARSE = -32700
+ERROR_REQUEST = -32600
+ERROR_METHOD = -32601
+ERROR_PARAMS = -32602
+ERROR_INTERNAL = -32603
+ERROR_PROGRAM = -32000
+ERROR_BUSY = -32001
+ERROR_TIMEOUT = -32002
+
+
+class ServiceError(Exception):
+    """Erro devolvido ao cliente (código JSON-RPC e mensagem)."""
+
+    def __init__(self, code, message):
+        self.code = code
+        super().__init__(message)
+
+
+# ==================== WORKER ====================
+
+def assemble_source(source):
+    """Monta fonte assembly e retorna a imagem empacotada (bytes)."""
+    assembler = Assembler()
+    assembler.assemble_lines(source.splitlines())
+    if not assembler.words:
+        raise ProgramError("Nenhuma instrução na fonte")
+    return encode_image(assembler.get_segments(), assembler.get_entry_point())
+
+
+def run_job(image, source, options):
+    """
+    Executa um job no worker.
+
+    Args:
+        image: imagem empacotada ou formato texto (bytes), ou None
+        source: fonte assembly (usada quando image é None)
+        options: opções já validadas (ver parse_run_options)
+
+    Retorna: (resposta, imagem montada ou None); a resposta tem 'erro' se
+    o programa for inválido
+    """
+    assembled = None
+    try:
+        if image is None:
+            image = assembled = assemble_source(source)
+        result = run_program(
+            image, options['max_ciclos'], options['max_instrucoes'],
+            options['tempo_limite'], options['modo'],
+            options['bits_endereco'], options['paginada'],
+            options['registradores'], options['memoria'])
+    except (AssemblyError, ProgramError, ValueError) as e:
+        return {'erro': str(e)}, assembled
+
+    stop = result.stop
+    response = {
+        'parada': stop.kind,
+        'descricao': stop.describe(),
+        'pc': result.pc,
+        'ciclos': result.cycles,
+        'instrucoes': result.instructions,
+        'registradores': result.registers,
+        'flags': result.flags,
+        'trap': (None if result.trap is None else
+                 {'endereco': result.trap[0], 'instrucao': result.trap[1]}),
+        'divisoes_por_zero': result.zero_divisions,
+        'avisos': [[line, message] for line, message in result.warnings],
+        'tempo': result.elapsed,
+    }
+    if stop.address is not None:
+        response['endereco'] = stop.address
+    if options['intervalos']:
+        response['memoria'] = [
+            {'inicio': start, 'palavras': result.memory[start:start + count]}
+            for start, count in options['intervalos']]
+    if options['nao_zero']:
+        response['nao_zero'] = result.memory.non_zero()[:options['nao_zero']]
+    return response, assembled
+
+
+def warm_worker(pids=None):
+    """
+    Inicializador do pool: informa o PID (ver WorkerPool) e exercita
+    montagem e execução.
+    """
+    # Workers criados depois de serve() instalar o tratador de SIGTERM o
+    # herdariam; o encerramento deles é sempre pelo processo principal
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if pids is not None:
+        pids.put(os.getpid())
+    run_job(None, "lcl r1, 1\nhalt", parse_run_options({}, DEFAULT_TIMEOUT,
+                                                       DEFAULT_CYCLE_LIMIT))
+
+
+def worker_ready(barrier=None, timeout=None):
+    """
+    Confirma que o worker subiu. Com barrier, espera todos os workers
+    chegarem (cada tarefa fica presa num processo diferente); se a espera
+    estourar, devolve o PID assim mesmo e quem chama conta os distintos.
+    """
+    if barrier is not None:
+        try:
+            barrier.wait(timeout)
+        except threading.BrokenBarrierError:
+            pass
+    return os.getpid()
+
+
+class WorkerPool(ProcessPoolExecutor):
+    """
+    ProcessPoolExecutor que pode ser encerrado sem esperar os jobs em
+    andamento. O executor não expõe seus processos: cada worker informa o
+    PID ao subir (warm_worker) e os processos são os filhos ativos com
+    esses PIDs. Um worker que ainda não informou o PID não está rodando
+    job e sai no shutdown normal.
+    """
+
+    def __init__(self, workers):
+        self.pid_queue = SimpleQueue()
+        self.pids = set()
+        super().__init__(max_workers=workers, initializer=warm_worker,
+                         initargs=(self.pid_queue,))
+
+    def processes(self):
+        """Processos dos workers que já subiram."""
+        while not self.pid_queue.empty():
+            self.pids.add(self.pid_queue.get())
+        return [process for process in active_children()
+                if process.pid in self.pids]
+
+    def terminate(self):
+        """Encerra o pool sem esperar os jobs em andamento."""
+        processes = self.processes()
+        self.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.kill()
+        for process in processes:
+            process.join()
+        # Com os processos mortos, a thread de gerenciamento termina logo
+        self.shutdown(wait=True)
+
+
+# ==================== OPÇÕES ====================
+
+def _integer(params, key, default=None, minimum=0):
+    """Inteiro opcional de params (aceita '0x..' em strings)."""
+    value = params.get(key, default)
+    if value is None:
+        return None
+    try:
+        value = int(value, 0) if isinstance(value, str) else int(value)
+    except (TypeError, ValueError):
+        raise ServiceError(ERROR_PARAMS, f"'{key}' deve ser inteiro")
+    if value < minimum:
+        raise ServiceError(ERROR_PARAMS, f"'{key}' deve ser >= {minimum}")
+    return value
+
+
+def _int_map(params, key):
+    """Dicionário {"alvo": valor} com chaves e valores inteiros."""
+    mapping = params.get(key) or {}
+    if not isinstance(mapping, dict):
+        raise ServiceError(ERROR_PARAMS, f"'{key}' deve ser um objeto")
+    return {_integer({key: k}, key): _integer(mapping, k, minimum=-(1 << 31))
+            for k in mapping}
+
+
+def parse_run_options(params, timeout, cycle_limit):
+    """
+    Valida as opções de execução e aplica os limites do serviço
+    (tempo por job e teto de ciclos).
+    """
+    mode = params.get('modo', Simulator.MODE_FAST)
+    if mode not in Simulator.MODES:
+        raise ServiceError(ERROR_PARAMS, f"Modo inválido: {mode}")
+    max_cycles = min(_integer(params, 'max_ciclos', cycle_limit), cycle_limit)
+    requested = params.get('tempo_limite')
+    try:
+        job_timeout = min(timeout, float(requested)) if requested else timeout
+    except (TypeError, ValueError):
+        raise ServiceError(ERROR_PARAMS, "'tempo_limite' deve ser número")
+    if mode == Simulator.MODE_PIPELINE:
+        # O pipeline não aceita limite de tempo: vale só o teto de ciclos
+        max_cycles = min(max_cycles,
+                         int(job_timeout * PIPELINE_CYCLES_PER_SECOND))
+    ranges = params.get('intervalos') or []
+    try:
+        ranges = [(int(start), int(count)) for start, count in ranges]
+    except (TypeError, ValueError):
+        raise ServiceError(ERROR_PARAMS, "'intervalos' deve ser [[início, n]]")
+    return {
+        'modo': mode,
+        'max_ciclos': max_cycles,
+        'max_instrucoes': _integer(params, 'max_instrucoes'),
+        'tempo_limite': (None if mode == Simulator.MODE_PIPELINE
+                         else job_timeout),
+        'bits_endereco': _integer(params, 'bits_endereco', minimum=1),
+        'paginada': bool(params.get('paginada', False)),
+        'registradores': _int_map(params, 'registradores'),
+        'memoria': _int_map(params, 'memoria'),
+        'intervalos': ranges,
+        'nao_zero': min(_integer(params, 'nao_zero', 0), MAX_NON_ZERO),
+    }
+
+
+# ==================== SERVIÇO ====================
+
+class ImageCache:
+    """Cache LRU de imagens montadas por hash da fonte (thread-safe)."""
+
+    def __init__(self, capacity=DEFAULT_CACHE_ENTRIES):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self.entries.get(key)
+            if image is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            self.entries[key] = image
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+    def get_stats(self):
+        with self._lock:
+            return {'entradas': len(self.entries), 'acertos': self.hits,
+                    'faltas': self.misses,
+                    'bytes': sum(len(i) for i in self.entries.values())}
+
+
+class SimulationService:
+    """Despacha jobs para o pool de workers com limites de concorrência."""
+
+    def __init__(self, workers=None, max_jobs=None, timeout=DEFAULT_TIMEOUT,
+                 cycle_limit=DEFAULT_CYCLE_LIMIT,
+                 cache_entries=DEFAULT_CACHE_ENTRIES, wait=DEFAULT_WAIT):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_jobs = max_jobs or 2 * self.workers
+        self.timeout = timeout
+        self.cycle_limit = cycle_limit
+        self.wait = wait
+        self.cache = ImageCache(cache_entries)
+        self.pool = self._new_pool()
+        self.closed = False
+        self._slots = threading.BoundedSemaphore(self.max_jobs)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.completed = self.failed = self.rejected = self.timeouts = 0
+        self.restarts = 0
+        self.started = time.time()
+
+    def _new_pool(self):
+        return WorkerPool(self.workers)
+
+    def warm_up(self, timeout=WARM_UP_TIMEOUT):
+        """
+        Sobe todos os workers antes da primeira requisição. Retorna o nº de
+        workers distintos que responderam (menor que workers se algum não
+        subiu a tempo).
+        """
+        with Manager() as manager:
+            barrier = manager.Barrier(self.workers)
+            futures = [self.pool.submit(worker_ready, barrier, timeout)
+                       for _ in range(self.workers)]
+            return len({future.result() for future in futures})
+
+    def _restart_pool(self, pool):
+        """Troca o pool (se ainda for o atual) e encerra o antigo."""
+        with self._lock:
+            if self.closed or self.pool is not pool:
+                return
+            self.pool = self._new_pool()
+            self.restarts += 1
+        pool.terminate()
+
+    def shutdown(self):
+        """Encerra os workers sem esperar os jobs em andamento."""
+        with self._lock:
+            self.closed = True
+        self.pool.terminate()
+
+    def _count(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def _program(self, params):
+        """Retorna (imagem ou None, fonte ou None, hash) do pedido."""
+        source = params.get('fonte')
+        encoded = params.get('imagem')
+        if (source is None) == (encoded is None):
+            raise ServiceError(ERROR_PARAMS,
+                               "Informe exatamente um de 'fonte' e 'imagem'")
+        if source is not None:
+            if not isinstance(source, str):
+                raise ServiceError(ERROR_PARAMS, "'fonte' deve ser texto")
+            digest = hashlib.sha256(source.encode('utf-8')).hexdigest()
+            return self.cache.get(digest), source, digest
+        try:
+            image = base64.b64decode(encoded, validate=True)
+        except (TypeError, ValueError):
+            raise ServiceError(ERROR_PARAMS, "'imagem' deve ser base64")
+        return image, None, hashlib.sha256(image).hexdigest()
+
+    def _submit(self, function, *args, timeout):
+        """Executa no pool respeitando o limite de jobs simultâneos."""
+        if not self._slots.acquire(timeout=self.wait):
+            self._count('rejected')
+            raise ServiceError(ERROR_BUSY, "Serviço ocupado: limite de "
+                               f"{self.max_jobs} jobs simultâneos")
+        with self._lock:
+            self.active += 1
+        try:
+            # Uma nova tentativa se o pool for recriado durante o job
+            for _ in range(2):
+                pool = self.pool
+                try:
+                    future = pool.submit(function, *args)
+                except RuntimeError:
+                    future = None  # pool já encerrado ou quebrado
+                if future is not None:
+                    try:
+                        return future.result(
+                            timeout=timeout + HARD_TIMEOUT_MARGIN)
+                    except FutureTimeoutError:
+                        # O job não respeitou o limite: só encerrando o
+                        # worker a CPU é liberada
+                        self._count('timeouts')
+                        self._restart_pool(pool)
+                        raise ServiceError(ERROR_TIMEOUT,
+                                           "Tempo do job esgotado")
+                    except BrokenProcessPool:
+                        pass  # pool encerrado por outro job (ou worker morto)
+                if self.closed:
+                    raise ServiceError(ERROR_INTERNAL, "Serviço encerrando")
+                self._restart_pool(pool)
+            raise ServiceError(ERROR_INTERNAL, "Worker encerrado durante o job")
+        finally:
+            with self._lock:
+                self.active -= 1
+            self._slots.release()
+
+    def execute(self, params):
+        """Método 'executar'."""
+        options = parse_run_options(params, self.timeout, self.cycle_limit)
+        image, source, digest = self._program(params)
+        response, assembled = self._submit(
+            run_job, image, source if image is None else None, options,
+            timeout=options['tempo_limite'] or self.timeout)
+        if assembled is not None:
+            self.cache.put(digest, assembled)
+        if 'erro' in response:
+            self._count('failed')
+            raise ServiceError(ERROR_PROGRAM, response['erro'])
+        self._count('completed')
+        response['hash'] = digest
+        if source is not None:
+            response['cache'] = assembled is None  # imagem já montada
+        return response
+
+    def assemble(self, params):
+        """Método 'montar'."""
+        image, source, digest = self._program(params)
+        if source is None:
+            raise ServiceError(ERROR_PARAMS, "'montar' exige 'fonte'")
+        if image is None:
+            try:
+                image = self._submit(assemble_source, source,
+                                     timeout=self.timeout)
+            except (AssemblyError, ProgramError) as e:
+                raise ServiceError(ERROR_PROGRAM, str(e))
+            self.cache.put(digest, image)
+        return {'hash': digest, 'imagem': base64.b64encode(image).decode(),
+                'bytes': len(image)}
+
+    def get_stats(self, params=None):
+        """Método 'estatisticas'."""
+        with self._lock:
+            jobs = {'ativos': self.active, 'concluidos': self.completed,
+                    'com_erro': self.failed, 'rejeitados': self.rejected,
+                    'tempo_esgotado': self.timeouts}
+        return {'workers': self.workers, 'max_jobs': self.max_jobs,
+                'timeout': self.timeout, 'jobs': jobs,
+                'reinicios_pool': self.restarts,
+                'cache': self.cache.get_stats(),
+                'ativo_ha': time.time() - self.started}
+
+    def handle(self, request):
+        """Processa uma requisição JSON-RPC (dict) e retorna a resposta."""
+        request_id = request.get('id') if isinstance(request, dict) else None
+        try:
+            if (not isinstance(request, dict) or
+                    not isinstance(request.get('method'), str)):
+                raise ServiceError(ERROR_REQUEST, "Requisição inválida")
+            method = {'executar': self.execute, 'montar': self.assemble,
+                      'estatisticas': self.get_stats}.get(request['method'])
+            if method is None:
+                raise ServiceError(ERROR_METHOD,
+                                   f"Método desconhecido: {request['method']}")
+            params = request.get('params') or {}
+            if not isinstance(params, dict):
+                raise ServiceError(ERROR_PARAMS, "'params' deve ser objeto")
+            return {'jsonrpc': '2.0', 'id': request_id,
+                    'result': method(params)}
+        except ServiceError as e:
+            error = {'code': e.code, 'message': str(e)}
+        except Exception as e:
+            error = {'code': ERROR_INTERNAL, 'message': f"Erro interno: {e}"}
+        return {'jsonrpc': '2.0', 'id': request_id, 'error': error}
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """POST com JSON-RPC; GET devolve as estatísticas."""
+
+    protocol_version = 'HTTP/1.1'  # conexões persistentes
+    # Cabeçalho e corpo saem em escritas separadas: sem TCP_NODELAY, o
+    # algoritmo de Nagle com ACK atrasado soma ~40 ms por resposta
+    disable_nagle_algorithm = True
+
+    def _reply(self, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length))
+        except ValueError:
+            self._reply({'jsonrpc': '2.0', 'id': None, 'error': {
+                'code': ERROR_PARSE, 'message': "JSON inválido"}})
+            return
+        self._reply(self.server.service.handle(request))
+
+    def do_GET(self):
+        self._reply(self.server.service.get_stats())
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixRequestHandler(RequestHandler):
+    """RequestHandler para socket Unix (sem opções de TCP)."""
+
+    disable_nagle_algorithm = False
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor HTTP em socket Unix."""
+
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+def create_server(service, port=DEFAULT_PORT, unix=None):
+    """Servidor HTTP (127.0.0.1:port) ou em socket Unix."""
+    if unix:
+        if os.path.exists(unix):
+            os.remove(unix)
+        server = UnixHTTPServer(unix, UnixRequestHandler)
+    else:
+        server = ThreadingHTTPServer(('127.0.0.1', port), RequestHandler)
+        server.daemon_threads = True
+    server.service = service
+    return server
+
+
+# ==================== CLIENTE ====================
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection sobre socket Unix."""
+
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class ServiceClient:
+    """Cliente JSON-RPC do serviço (conexão persistente)."""
+
+    def __init__(self, port=DEFAULT_PORT, unix=None, timeout=None):
+        if unix:
+            self.connection = UnixHTTPConnection(unix, timeout)
+        else:
+            self.connection = http.client.HTTPConnection('127.0.0.1', port,
+                                                         timeout=timeout)
+        self.next_id = 1
+
+    def call(self, method, params=None):
+        """Chama um método; retorna 'result' ou levanta ServiceError."""
+        request = {'jsonrpc': '2.0', 'id': self.next_id, 'method': method,
+                   'params': params or {}}
+        self.next_id += 1
+        body = json.dumps(request).encode('utf-8')
+        self.connection.request('POST', '/', body,
+                                {'Content-Type': 'application/json'})
+        response = json.loads(self.connection.getresponse().read())
+        if 'error' in response:
+            raise ServiceError(response['error']['code'],
+                               response['error']['message'])
+        return response['result']
+
+    def close(self):
+        self.connection.close()
+
+
+def program_params(filename):
+    """Parâmetros 'fonte' (.asm) ou 'imagem' (demais) de um arquivo."""
+    if filename.endswith('.asm'):
+        with open(filename, encoding='utf-8') as f:
+            return {'fonte': f.read()}
+    with open(filename, 'rb') as f:
+        return {'imagem': base64.b64encode(f.read()).decode()}
+
+
+def parse_assignment(text):
+    """Converte 'ALVO=VALOR' em (alvo, valor) inteiros."""
+    target, sep, value = text.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"esperado ALVO=VALOR: {text}")
+    try:
+        return int(target.lstrip('rR'), 0), int(value, 0)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"valor inválido: {text}")
+
+
+def print_latencies(latencies):
+    """Resumo de latências de ida e volta (ms)."""
+    ordered = sorted(latencies)
+    percentile = (lambda q: ordered[min(len(ordered) - 1,
+                                        int(q * len(ordered)))] * 1000)
+    print(f"{len(ordered)} chamadas: média {statistics.mean(ordered) * 1000:.2f} ms, "
+          f"p50 {percentile(0.5):.2f} ms, p99 {percentile(0.99):.2f} ms, "
+          f"máx {ordered[-1] * 1000:.2f} ms")
+
+
+def stop_on_signal(signum, frame):
+    raise KeyboardInterrupt
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serviço local de simulação UFLA-RISC (JSON-RPC)")
+    commands = parser.add_subparsers(dest='comando', required=True)
+
+    serve = commands.add_parser('serve', help="inicia o serviço")
+    serve.add_argument('-j', '--workers', type=int, default=None,
+                       help="processos do pool (padrão: nº de CPUs)")
+    serve.add_argument('--max-jobs', type=int, default=None,
+                       help="jobs simultâneos (padrão: 2 × workers)")
+    serve.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT,
+                       help=f"segundos por job (padrão: {DEFAULT_TIMEOUT:g})")
+    serve.add_argument('--cycle-limit', type=int, default=DEFAULT_CYCLE_LIMIT,
+                       help="teto de ciclos por job (padrão: 10^9)")
+    serve.add_argument('--cache', type=int, default=DEFAULT_CACHE_ENTRIES,
+                       help="imagens montadas em cache (padrão: "
+                       f"{DEFAULT_CACHE_ENTRIES})")
+    serve.add_argument('--espera', type=float, default=DEFAULT_WAIT,
+                       help="espera por vaga antes de recusar (padrão: "
+                       f"{DEFAULT_WAIT:g} s)")
+
+    run = commands.add_parser('executar', help="executa um programa no serviço")
+    run.add_argument('programa', help=".asm (fonte) ou .img/.bin (imagem)")
+    run.add_argument('--modo', default=Simulator.MODE_FAST,
+                     choices=Simulator.MODES)
+    run.add_argument('--max-cycles', type=int)
+    run.add_argument('--max-instructions', type=int)
+    run.add_argument('--tempo-limite', type=float)
+    run.add_argument('--reg', type=parse_assignment, action='append',
+                     default=[], metavar='N=VALOR')
+    run.add_argument('--nao-zero', type=int, default=0, metavar='N',
+                     help="devolve até N posições não-zero da memória")
+    run.add_argument('--repeat', type=int, default=1,
+                     help="repete a chamada e mostra latências")
+
+    for command in (serve, run):
+        command.add_argument('--port', type=int, default=DEFAULT_PORT,
+                             help=f"porta HTTP local (padrão: {DEFAULT_PORT})")
+        command.add_argument('--unix', metavar='CAMINHO',
+                             help="usa socket Unix em vez de HTTP/TCP")
+    args = parser.parse_args()
+
+    if args.comando == 'serve':
+        service = SimulationService(args.workers, args.max_jobs, args.timeout,
+                                    args.cycle_limit, args.cache, args.espera)
+        try:
+            server = create_server(service, args.port, args.unix)
+        except OSError as e:
+            print(f"❌ {e}")
+            service.shutdown()
+            return 1
+        ready = service.warm_up()
+        where = args.unix or f"http://127.0.0.1:{args.port}"
+        if ready < service.workers:
+            print(f"⚠️  Só {ready} de {service.workers} workers subiram em "
+                  f"{WARM_UP_TIMEOUT:g} s")
+        print(f"✓ Serviço em {where} ({ready} worker(s), "
+              f"até {service.max_jobs} jobs simultâneos)")
+        # SIGTERM (kill) encerra como Ctrl+C: encerra os workers (mesmo com
+        # jobs em andamento) e remove o socket
+        signal.signal(signal.SIGTERM, stop_on_signal)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            service.shutdown()
+            if args.unix and os.path.exists(args.unix):
+                os.remove(args.unix)
+        return 0
+
+    try:
+        params = program_params(args.programa)
+    except OSError as e:
+        print(f"❌ {e}")
+        return 1
+    params.update({'modo': args.modo, 'registradores': dict(args.reg),
+                   'nao_zero': args.nao_zero})
+    for key, value in (('max_ciclos', args.max_cycles),
+                       ('max_instrucoes', args.max_instructions),
+                       ('tempo_limite', args.tempo_limite)):
+        if value is not None:
+            params[key] = value
+
+    client = ServiceClient(args.port, args.unix)
+    latencies = []
+    try:
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            result = client.call('executar', params)
+            latencies.append(time.perf_counter() - start)
+    except ServiceError as e:
+        print(f"❌ {e}")
+        return 1
+    except OSError as e:
+        print(f"❌ Serviço indisponível: {e}")
+        return 1
+    finally:
+        client.close()
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    if args.repeat > 1:
+        print_latencies(latencies)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+varredura.py - Varredura de Entradas em Lote
+
+Executa um programa para muitos valores iniciais de registradores e de
+memória de uma vez (ver simulador/batch.py) e mostra ou grava o estado
+final de cada instância.
+
+Valores (--reg N=VALORES, --mem ENDEREÇO=VALORES):
+    7            mesmo valor em todas as lanes
+    0:1000[:2]   sequência (início:fim[:passo]), uma lane por valor
+    rand:0:255   aleatório uniforme no intervalo (inclusive; ver --seed)
+
+Uso:
+    python src/ferramentas/varredura.py programa.bin --reg 1=1:10001 --show 4
+    python src/ferramentas/varredura.py programa.bin --lanes 5000 --reg 1=rand:0:99 \\
+        --mem 0x100=rand:0:255 --show 3,4 --show-mem 0x200 -o resultado.npz
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+
+_SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_path = os.path.join(_SRC, 'simulador')
+if _path not in sys.path:
+    sys.path.insert(0, _path)
+
+from batch import BatchSimulator  # noqa: E402
+from utils import ADDRESS_BITS  # noqa: E402
+
+
+def parse_assignment(text):
+    """Converte 'ALVO=VALORES' em (alvo inteiro, especificação)."""
+    target, sep, spec = text.partition('=')
+    if not sep or not spec:
+        raise argparse.ArgumentTypeError(f"esperado ALVO=VALORES: {text}")
+    try:
+        return int(target.lstrip('rR'), 0), spec
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"alvo inválido: {target}")
+
+
+def sequence_length(spec):
+    """Nº de valores de uma sequência início:fim[:passo] (None se não for)."""
+    if spec.startswith('rand:') or ':' not in spec:
+        return None
+    return len(range(*(int(part, 0) for part in spec.split(':'))))
+
+
+def expand(spec, lanes, rng):
+    """Valores por lane de uma especificação."""
+    if spec.startswith('rand:'):
+        low, high = (int(part, 0) for part in spec[5:].split(':'))
+        return rng.integers(low, high + 1, lanes)
+    if ':' in spec:
+        values = np.arange(*(int(part, 0) for part in spec.split(':')))
+        if len(values) != lanes:
+            raise ValueError(f"Sequência {spec} tem {len(values)} valores "
+                             f"para {lanes} lanes")
+        return values
+    return np.full(lanes, int(spec, 0))
+
+
+def parse_list(text):
+    """Converte '3,4' ou '0x200,0x201' em lista de inteiros."""
+    return [int(item, 0) for item in text.split(',')]
+
+
+def print_table(state, registers, addresses, limit):
+    """Estado final das primeiras lanes."""
+    columns = [f"R{reg}" for reg in registers] + [f"M[{a}]" for a in addresses]
+    print(f"\n{'Lane':>6} {'Ciclos':>10} {'Estado':>8} " +
+          ' '.join(f"{name:>12}" for name in columns))
+    print("-" * (27 + 13 * len(columns)))
+    for lane in range(min(limit, len(state['cycles']))):
+        status = ('trap' if state['trapped'][lane] else
+                  'halt' if state['halted'][lane] else 'limite')
+        values = ([state['registers'][lane, reg] for reg in registers] +
+                  [state['memory'][lane, a] for a in addresses])
+        print(f"{lane:>6} {state['cycles'][lane]:>10} {status:>8} " +
+              ' '.join(f"{int(v):>12}" for v in values))
+
+
+def print_summary(state, registers, addresses):
+    """Mínimo, máximo e nº de valores distintos por coluna mostrada."""
+    for name, values in ([(f"R{reg}", state['registers'][:, reg])
+                          for reg in registers] +
+                         [(f"M[{a}]", state['memory'][:, a])
+                          for a in addresses]):
+        print(f"  {name}: min {int(values.min())}, max {int(values.max())}, "
+              f"{len(np.unique(values))} valores distintos")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Varredura de entradas em lote (UFLA-RISC)")
+    parser.add_argument('programa', help="binário (.bin) ou imagem (.img)")
+    parser.add_argument('--lanes', type=int,
+                        help="nº de instâncias (padrão: tamanho das sequências)")
+    parser.add_argument('--reg', type=parse_assignment, action='append',
+                        default=[], metavar='N=VALORES',
+                        help="valor inicial de RN em cada lane")
+    parser.add_argument('--mem', type=parse_assignment, action='append',
+                        default=[], metavar='END=VALORES',
+                        help="valor inicial de uma palavra em cada lane")
+    parser.add_argument('--seed', type=int, default=0,
+                        help="semente dos valores aleatórios (padrão: 0)")
+    parser.add_argument('--max-cycles', type=int, default=100000,
+                        help="limite de ciclos por lane (padrão: 100000)")
+    parser.add_argument('--address-bits', type=int, default=ADDRESS_BITS,
+                        help=f"bits de endereço por lane (padrão: {ADDRESS_BITS})")
+    parser.add_argument('--show', type=parse_list, default=[], metavar='REGS',
+                        help="registradores a mostrar (ex.: 3,4)")
+    parser.add_argument('--show-mem', type=parse_list, default=[],
+                        metavar='ENDS', help="palavras de memória a mostrar")
+    parser.add_argument('--limit', type=int, default=10,
+                        help="lanes na tabela (padrão: 10)")
+    parser.add_argument('-o', '--output', metavar='ARQUIVO',
+                        help="grava o estado final (arrays) em .npz")
+    args = parser.parse_args()
+
+    lanes = args.lanes
+    if lanes is None:
+        lengths = [sequence_length(spec) for _, spec in args.reg + args.mem]
+        lanes = max([n for n in lengths if n is not None], default=1)
+
+    rng = np.random.default_rng(args.seed)
+    try:
+        batch = BatchSimulator(lanes, args.address_bits)
+        if batch.load_program(args.programa) == 0:
+            print("❌ Nenhuma instrução carregada. Encerrando.")
+            return 1
+        for reg, spec in args.reg:
+            batch.set_register(reg, expand(spec, lanes, rng))
+        for address, spec in args.mem:
+            batch.set_memory(address, expand(spec, lanes, rng))
+    except (ValueError, OSError, MemoryError) as e:
+        print(f"❌ {e}")
+        return 1
+
+    state = batch.run(max_cycles=args.max_cycles)
+    batch.print_report()
+    if args.show or args.show_mem:
+        print_table(state, args.show, args.show_mem, args.limit)
+        print("\nResumo de todas as lanes:")
+        print_summary(state, args.show, args.show_mem)
+
+    if args.output:
+        np.savez_compressed(args.output, **state)
+        print(f"\n✓ Estado final salvo: {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,11 +12,15 @@ from encoder import InstructionEncoder
 class Assembler:
     """Assembler UFLA-RISC."""
 
+    # Labels usadas como ponto de entrada da imagem empacotada
+    ENTRY_LABELS = ("main", "inicio", "_start")
+
     def __init__(self):
         self.parser = Parser()
         self.encoder = None
         self.instructions = []
         self.labels = {}
+        self.words = []  # (endereço, instrução codificada)
 
     def assemble_file(self, input_filename):
         """
@@ -49,12 +53,50 @@ class Assembler:
 
         # Segunda passagem: codificação
         binary_lines = []
+        self.words = []
         for instr in self.instructions:
             encoded = self.encoder.encode(instr)
+            self.words.append((instr["address"], encoded))
             binary_lines.append(f"{encoded:032b}")
 
         return binary_lines
 
+    def get_segments(self):
+        """
+        Agrupa instruções montadas em segmentos contíguos, respeitando as
+        diretivas 'address'.
+
+        Retorna: lista de (endereço_inicial, lista de palavras)
+        """
+        segments = []
+        for address, word in self.words:
+            if segments:
+                start, words = segments[-1]
+                if start + len(words) == address:
+                    words.append(word)
+                    continue
+            segments.append((address, [word]))
+        return segments
+
+    def get_entry_point(self):
+        """Retorna endereço da label de entrada (main/inicio/_start) ou None."""
+        for label in self.ENTRY_LABELS:
+            if label in self.labels:
+                return self.labels[label]
+        return None
+
+    def get_text_lines(self):
+        """
+        Retorna linhas do formato texto com diretivas 'address' (16 bits em
+        binário) onde o layout não é contíguo a partir do endereço 0.
+        """
+        lines = []
+        for index, (address, words) in enumerate(self.get_segments()):
+            if index > 0 or address != 0:
+                lines.append(f"address {address:016b}")
+            lines.extend(f"{word:032b}" for word in words)
+        return lines
+
     def get_stats(self):
         """Retorna estatísticas da montagem."""
         return {
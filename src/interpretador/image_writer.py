@@ -0,0 +1,23 @@
+"""
+image_writer.py - Escrita de Imagem Binária Empacotada
+
+Gera o formato de imagem lido pelo simulador: cabeçalho, tabela de
+segmentos (endereço de carga, tamanho, offset) e palavras de 32 bits
+big-endian. Preserva o layout das diretivas 'address'. O formato é
+definido uma única vez em simulador/program_image.py.
+"""
+
+import os
+import sys
+
+_SIMULADOR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'simulador')
+if _SIMULADOR not in sys.path:
+    sys.path.append(_SIMULADOR)
+
+from program_image import encode_image, write_image_file  # noqa: E402,F401
+
+
+def write_image(filename, segments, entry=None):
+    """Grava imagem empacotada em arquivo. Retorna tamanho em bytes."""
+    return write_image_file(filename, segments, entry)
@@ -9,6 +9,7 @@ import sys
 from parser import AssemblyError
 
 from assembler import Assembler
+from image_writer import write_image
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
@@ -26,6 +27,9 @@ def print_usage():
     print("  • Controle: jal, jr, beq, bne, j, halt")
     print("  • Adicionais: slt, mul, div, mod, neg, inc, dec, nop")
     print("=" * 70)
+    print("Uso: python main.py <entrada.asm> <saída> [--packed]")
+    print("  --packed, -p : Gera imagem binária empacotada (4 bytes/palavra)")
+    print("=" * 70)
 
 
 def main():
@@ -36,6 +40,7 @@ def main():
 
     input_file = sys.argv[1]
     output_file = sys.argv[2]
+    packed = '--packed' in sys.argv or '-p' in sys.argv
 
     try:
         # Criar assembler
@@ -43,11 +48,16 @@ def main():
 
         # Montar arquivo
         print(f"Montando '{input_file}'...")
-        binary_lines = assembler.assemble_file(input_file)
+        assembler.assemble_file(input_file)
 
         # Escrever saída
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write("\n".join(binary_lines))
+        if packed:
+            size = write_image(output_file, assembler.get_segments(),
+                               assembler.get_entry_point())
+            print(f"✓ Imagem empacotada: {size} bytes")
+        else:
+            with open(output_file, "w", encoding="utf-8") as f:
+                f.write("\n".join(assembler.get_text_lines()))
 
         # Estatísticas
         stats = assembler.get_stats()
@@ -77,5 +87,6 @@ def main():
 
 # Para usar:
 # python src/interpretador/main.py exemplos/programa.asm binarios/programa.bin
+# python src/interpretador/main.py exemplos/programa.asm binarios/programa.img --packed
 if __name__ == "__main__":
     sys.exit(main())
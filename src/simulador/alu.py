@@ -5,7 +5,12 @@ Implementa todas as operações de cálculo e gerencia atualização de flags
 
 """
 
-from utils import MASK32, to_s32, to_u32
+from utils import (FLAGS_ADD, FLAGS_CLEAR, FLAGS_LOGICAL, FLAGS_SUB,
+                   evaluate_flags, lazy_flag_property, make_flag_state,
+                   to_s32, to_u32)
+
+# Estado de flags de um resultado zero em operação lógica (Z=1)
+_FLAGS_ZERO_RESULT = (FLAGS_LOGICAL, 0, 0, 0)
 
 
 class ALUException(Exception):
@@ -16,16 +21,42 @@ class ALUException(Exception):
 class ALU:
     """Unidade Lógica e Aritmética do UFLA-RISC"""
 
-    def __init__(self):
-        """Inicializa ALU."""
+    def __init__(self, warnings=True):
+        """
+        Inicializa ALU.
+
+        Args:
+            warnings: imprime aviso em divisão/módulo por zero (as
+                      ocorrências são sempre contadas em zero_divisions)
+        """
+        self.warnings = warnings
+        self.zero_divisions = 0
         self.last_result = 0
-        self.flags_neg = 0
-        self.flags_zero = 0
-        self.flags_carry = 0
-        self.flags_overflow = 0
+        # Flags avaliados sob demanda (ver utils.evaluate_flags)
+        self.flag_state = FLAGS_CLEAR
+        self._evaluated_state = None
+        self._flag_values = (0, 0, 0, 0)
 
     # ==================== FLAGS ====================
 
+    flags_neg = lazy_flag_property(0, "Flag N (materializado sob demanda).")
+    flags_zero = lazy_flag_property(1, "Flag Z (materializado sob demanda).")
+    flags_carry = lazy_flag_property(2, "Flag C (materializado sob demanda).")
+    flags_overflow = lazy_flag_property(
+        3, "Flag V (materializado sob demanda).")
+
+    def get_flag_values(self):
+        """Retorna tupla (neg, zero, carry, overflow), calculando se preciso."""
+        state = self.flag_state
+        if state is not self._evaluated_state:
+            self._flag_values = evaluate_flags(state)
+            self._evaluated_state = state
+        return self._flag_values
+
+    def set_flag_state(self, state):
+        """Define estado de flags preguiçoso."""
+        self.flag_state = state
+
     def get_flags(self):
         """Retorna flags como dicionário."""
         return {
@@ -37,15 +68,13 @@ class ALU:
 
     def set_flags_dict(self, flags_dict):
         """Define flags a partir de dicionário."""
-        self.flags_neg = flags_dict.get('neg', 0)
-        self.flags_zero = flags_dict.get('zero', 0)
-        self.flags_carry = flags_dict.get('carry', 0)
-        self.flags_overflow = flags_dict.get('overflow', 0)
+        self.flag_state = make_flag_state(
+            flags_dict.get('neg', 0), flags_dict.get('zero', 0),
+            flags_dict.get('carry', 0), flags_dict.get('overflow', 0))
 
     def clear_flags(self):
         """Zera todos os flags."""
-        self.flags_neg = self.flags_zero = 0
-        self.flags_carry = self.flags_overflow = 0
+        self.flag_state = FLAGS_CLEAR
 
     def update_flags_arithmetic(self, result, a, b, is_sub=False):
         """
@@ -56,40 +85,10 @@ class ALU:
         - zero: resultado == 0
         - carry: overflow do cálculo
         - overflow: overflow aritmético
-        """
-        result_u32 = to_u32(result)
-
-        # Flag ZERO
-        self.flags_zero = 1 if result_u32 == 0 else 0
-
-        # Flag NEG
-        self.flags_neg = 1 if (result_u32 & 0x80000000) else 0
-
-        # Flag CARRY
-        if is_sub:
-            self.flags_carry = 1 if (a < b) else 0
-        else:
-            self.flags_carry = 1 if (result > MASK32) else 0
 
-        # Flag OVERFLOW (two's complement overflow)
-        a_s32 = to_s32(a)
-        b_s32 = to_s32(b)
-        result_s32 = to_s32(result_u32)
-
-        if is_sub:
-            # Overflow na subtração: (a >= 0 && b < 0 && result < 0) ||
-            #                        (a < 0 && b >= 0 && result >= 0)
-            self.flags_overflow = 1 if (
-                (a_s32 >= 0 and b_s32 < 0 and result_s32 < 0) or
-                (a_s32 < 0 and b_s32 >= 0 and result_s32 >= 0)
-            ) else 0
-        else:
-            # Overflow na adição: (a >= 0 && b >= 0 && result < 0) ||
-            #                     (a < 0 && b < 0 && result >= 0)
-            self.flags_overflow = 1 if (
-                (a_s32 >= 0 and b_s32 >= 0 and result_s32 < 0) or
-                (a_s32 < 0 and b_s32 < 0 and result_s32 >= 0)
-            ) else 0
+        Apenas registra a operação; os flags são calculados quando lidos.
+        """
+        self.flag_state = (FLAGS_SUB if is_sub else FLAGS_ADD, result, a, b)
 
     def update_flags_logical(self, result):
         """
@@ -101,11 +100,7 @@ class ALU:
         - carry: sempre 0
         - overflow: sempre 0
         """
-        result_u32 = to_u32(result)
-        self.flags_zero = 1 if result_u32 == 0 else 0
-        self.flags_neg = 1 if (result_u32 & 0x80000000) else 0
-        self.flags_carry = 0
-        self.flags_overflow = 0
+        self.flag_state = (FLAGS_LOGICAL, result, 0, 0)
 
     # ==================== OPERAÇÕES ALU ====================
 
@@ -154,10 +149,7 @@ class ALU:
     def zeros(self):
         """Retorna zero e atualiza flags."""
         self.last_result = 0
-        self.flags_zero = 1
-        self.flags_neg = 0
-        self.flags_carry = 0
-        self.flags_overflow = 0
+        self.flag_state = _FLAGS_ZERO_RESULT
         return 0
 
     # ==================== OPERAÇÕES ESPECIAIS ====================
@@ -172,12 +164,11 @@ class ALU:
     def div(self, a, b):
         """Divisão com sinal."""
         if b == 0:
-            print("WARNING: Divisão por zero detectada! Retornando 0")
+            self.zero_divisions += 1
+            if self.warnings:
+                print("WARNING: Divisão por zero detectada! Retornando 0")
             self.last_result = 0
-            self.flags_zero = 1
-            self.flags_neg = 0
-            self.flags_carry = 0
-            self.flags_overflow = 0
+            self.flag_state = _FLAGS_ZERO_RESULT
             return 0
             #
             # raise ALUException("Divisão por zero")
@@ -193,12 +184,11 @@ class ALU:
         """Módulo com sinal."""
         if b == 0:
             # Comportamento alternativo: retornar 0 com warning
-            print("⚠️  WARNING: Módulo por zero detectado! Retornando 0")
+            self.zero_divisions += 1
+            if self.warnings:
+                print("⚠️  WARNING: Módulo por zero detectado! Retornando 0")
             self.last_result = 0
-            self.flags_zero = 1
-            self.flags_neg = 0
-            self.flags_carry = 0
-            self.flags_overflow = 0
+            self.flag_state = _FLAGS_ZERO_RESULT
             return 0
             # 
             # raise ALUException("Módulo por zero")
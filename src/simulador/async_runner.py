@@ -0,0 +1,201 @@
+"""
+async_runner.py - Execução Cooperativa com asyncio
+
+Executa um Simulator em trechos de instruções dentro de um event loop,
+cedendo o controle entre trechos para que várias simulações (e outras
+tarefas) compartilhem o mesmo processo. O tamanho do trecho se ajusta
+sozinho para que cada um dure cerca de target_latency segundos.
+
+    runner = AsyncRunner(sim, max_instructions=10**8, progress=mostrar)
+    task = asyncio.create_task(runner.run())
+    runner.pause(); ...; runner.resume()
+    task.cancel()    # CancelledError no próximo ponto de cessão
+
+    async for progress in AsyncRunner(sim).slices():
+        print(progress.instructions)
+
+Cancelada a tarefa, o simulador fica numa fronteira de instrução e a
+execução pode continuar com uma nova chamada a run() do mesmo runner.
+"""
+
+import asyncio
+import inspect
+import math
+import time
+
+from breakpoints import STOP_INSTRUCTIONS, STOP_LIMIT
+from headless import RunResult, create_simulator
+
+DEFAULT_TARGET_LATENCY = 0.005  # segundos por trecho
+INITIAL_SLICE = 256             # instruções no primeiro trecho
+MIN_SLICE = 16
+MAX_SLICE = 1 << 20
+MAX_GROWTH = 4                  # fator máximo de ajuste entre trechos
+
+
+class Progress:
+    """Situação após um trecho (callback de progresso e slices())."""
+
+    __slots__ = ('slices', 'cycles', 'instructions', 'slice_size',
+                 'slice_time', 'busy', 'elapsed')
+
+    def __init__(self, slices, cycles, instructions, slice_size, slice_time,
+                 busy, elapsed):
+        self.slices = slices              # trechos executados
+        self.cycles = cycles
+        self.instructions = instructions
+        self.slice_size = slice_size      # instruções do próximo trecho
+        self.slice_time = slice_time      # duração do último trecho (s)
+        self.busy = busy                  # tempo total simulando (s)
+        self.elapsed = elapsed            # tempo de relógio desde o início
+
+    def __repr__(self):
+        return (f"Progress(slices={self.slices}, "
+                f"instructions={self.instructions}, "
+                f"slice_size={self.slice_size})")
+
+
+class AsyncRunner:
+    """Executa um Simulator em trechos, cedendo ao event loop entre eles."""
+
+    def __init__(self, sim, max_cycles=100000, max_instructions=None,
+                 resume=False, target_latency=DEFAULT_TARGET_LATENCY,
+                 progress=None, initial_slice=INITIAL_SLICE):
+        """
+        Args:
+            sim: Simulator com o programa carregado (modo pipeline não
+                 suportado: o pipeline esvazia a cada parada)
+            max_cycles: limite de ciclos (None: sem limite)
+            max_instructions: limite de instruções (None: sem limite)
+            resume: continua do estado atual sem zerar contadores
+            target_latency: duração desejada de cada trecho (segundos)
+            progress: função chamada com Progress após cada trecho; se
+                      retornar um awaitable, ele é aguardado
+            initial_slice: instruções do primeiro trecho
+        """
+        self.sim = sim
+        self.max_cycles = math.inf if max_cycles is None else max_cycles
+        self.max_instructions = max_instructions
+        self.resume_state = resume
+        self.target_latency = target_latency
+        self.progress = progress
+        self.slice_size = max(MIN_SLICE, min(MAX_SLICE, initial_slice))
+        self.stop = None          # StopReason ao terminar
+        self.slice_count = 0
+        self.busy = 0.0
+        self._started = False
+        self._paused = False
+        self._resumed = None      # asyncio.Event (criado dentro do loop)
+
+    # ==================== CONTROLE ====================
+
+    @property
+    def paused(self):
+        return self._paused
+
+    def pause(self):
+        """Suspende a execução ao fim do trecho atual."""
+        self._paused = True
+        if self._resumed is not None:
+            self._resumed.clear()
+
+    def resume(self):
+        """Retoma execução suspensa por pause()."""
+        self._paused = False
+        if self._resumed is not None:
+            self._resumed.set()
+
+    # ==================== EXECUÇÃO ====================
+
+    def _adapt(self, executed, duration):
+        """Ajusta o tamanho do trecho para durar cerca de target_latency."""
+        size = self.slice_size
+        if executed < size:
+            return  # trecho encurtado por limite: medida não representativa
+        if duration <= 0:
+            ideal = size * MAX_GROWTH
+        else:
+            ideal = executed * self.target_latency / duration
+        ideal = max(size / MAX_GROWTH, min(size * MAX_GROWTH, ideal))
+        self.slice_size = int(max(MIN_SLICE, min(MAX_SLICE, ideal)))
+
+    async def slices(self):
+        """
+        Gerador assíncrono: executa um trecho, cede ao event loop e produz
+        Progress, até a execução terminar (ver self.stop).
+        """
+        sim = self.sim
+        if not self._started:
+            sim.begin(self.resume_state, sliced=True)
+            self._started = True
+        if self._resumed is None:
+            self._resumed = asyncio.Event()
+            if not self._paused:
+                self._resumed.set()
+        stages = sim.STAGES_PER_INSTRUCTION
+        start = time.perf_counter()
+
+        while self.stop is None:
+            await asyncio.sleep(0)
+            if self._paused:
+                await self._resumed.wait()
+
+            count = self.slice_size
+            if self.max_instructions is not None:
+                remaining = self.max_instructions - sim.instruction_count
+                if remaining <= 0:
+                    self.stop = sim.finish(STOP_INSTRUCTIONS)
+                    break
+                count = min(count, remaining)
+            limit = min(self.max_cycles, sim.cycle_counter + count * stages)
+
+            cycles = sim.cycle_counter
+            instructions = sim.instruction_count
+            slice_start = time.perf_counter()
+            self.stop = sim.advance(limit)
+            duration = time.perf_counter() - slice_start
+            if self.stop is None and (limit >= self.max_cycles or
+                                      sim.cycle_counter == cycles):
+                self.stop = sim.finish(STOP_LIMIT)
+
+            self.slice_count += 1
+            self.busy += duration
+            self._adapt(sim.instruction_count - instructions, duration)
+            progress = Progress(self.slice_count, sim.cycle_counter,
+                                sim.instruction_count, self.slice_size,
+                                duration, self.busy,
+                                time.perf_counter() - start)
+            if self.progress is not None:
+                result = self.progress(progress)
+                if inspect.isawaitable(result):
+                    await result
+            yield progress
+
+    async def run(self):
+        """Executa até terminar; retorna StopReason."""
+        async for _ in self.slices():
+            pass
+        return self.stop
+
+    def __await__(self):
+        return self.run().__await__()
+
+
+async def run_program_async(program, max_cycles=100000, max_instructions=None,
+                            target_latency=DEFAULT_TARGET_LATENCY,
+                            progress=None, **options):
+    """
+    Versão assíncrona de headless.run_program: carrega e executa um
+    programa (caminho ou bytes) em trechos cooperativos.
+
+    Args:
+        options: mode, address_bits, paged, registers, memory_words (ver
+                 headless.create_simulator)
+
+    Retorna: RunResult (elapsed inclui o tempo cedido a outras tarefas)
+    """
+    sim, warnings = create_simulator(program, **options)
+    start = time.perf_counter()
+    stop = await AsyncRunner(sim, max_cycles, max_instructions,
+                             target_latency=target_latency, progress=progress)
+    return RunResult(sim, stop, time.perf_counter() - start, warnings)
@@ -0,0 +1,543 @@
+"""
+batch.py - Execução em Lote (NumPy, lockstep)
+
+Executa o mesmo programa em N instâncias da máquina (lanes) ao mesmo
+tempo, com o estado de todas em arrays NumPy: cada instrução é
+decodificada uma vez e aplicada às lanes com uma operação vetorizada.
+
+Desvios divergentes: cada lane tem seu PC. A cada passo executa o grupo de
+lanes no menor PC (as demais esperam, mascaradas) até os PCs voltarem a
+coincidir. Enquanto todas as lanes ativas estão no mesmo PC (caso comum),
+o PC é um inteiro Python e os contadores só são gravados nos arrays ao
+fim do trecho.
+
+A semântica é a do modo rápido (Simulator.execute_instruction), sem
+impressão: divisão e módulo por zero resultam em 0 e opcode inválido para
+a lane após 3 ciclos (operações da ALU em vector_alu.py). A execução para
+em fronteiras de instrução; com max_cycles múltiplo de 4 o estado final
+coincide com o do Simulator.
+
+Internamente registradores e memória são guardados por registrador /
+endereço (32 x N e tamanho x N), para que cada operação percorra uma
+linha contígua; get_state() devolve N x 32 e N x tamanho.
+
+Uso:
+    batch = BatchSimulator(1000, address_bits=12)
+    batch.load_program('binarios/programa.bin')
+    batch.set_register(1, np.arange(1000))
+    state = batch.run(max_cycles=100000)
+    state['registers'][:, 3]    # R3 final de cada lane
+
+Requer NumPy (dependência opcional: o restante do simulador não o usa).
+"""
+
+import time
+
+import numpy as np
+
+from instruction_decoder import InstructionDecoder
+from memory import Memory
+from program_image import is_packed_image
+from simulador import Simulator
+from utils import (ADDRESS_BITS, FLAGS_LOGICAL, MASK32, MAX_ADDRESS_BITS,
+                   NUM_REGISTERS, make_flag_state)
+import vector_alu
+from vector_alu import flag_bits
+
+STAGES_PER_INSTRUCTION = Simulator.STAGES_PER_INSTRUCTION
+
+OP_HALT = 0xFF
+
+
+class BatchInstruction:
+    """Instrução decodificada uma vez para todas as lanes."""
+
+    __slots__ = ('raw', 'handler', 'ra', 'rb', 'rc', 'write', 'const16',
+                 'address', 'target', 'ends')
+
+    def __init__(self, decoded, handler):
+        raw, opcode, ra, rb, rc, const16, address, branch_offset = decoded
+        last = NUM_REGISTERS - 1
+        self.raw = raw
+        self.handler = handler
+        self.ra = min(ra, last)
+        self.rb = min(rb, last)
+        self.rc = min(rc, last)
+        self.write = rc != 0           # R0 nunca é escrito
+        self.const16 = const16
+        self.address = address         # J/JAL (24 bits)
+        self.target = branch_offset & 0xFF
+        self.ends = (opcode == OP_HALT or
+                     handler is BatchSimulator._exec_trap)
+
+
+class BatchSimulator:
+    """N instâncias do UFLA-RISC executando o mesmo programa em lockstep."""
+
+    def __init__(self, lanes, address_bits=ADDRESS_BITS):
+        """
+        Args:
+            lanes: número de instâncias
+            address_bits: bits de endereço de palavra de cada instância
+                          (a memória ocupa lanes x 2^bits x 4 bytes)
+        """
+        if lanes < 1:
+            raise ValueError(f"Número de lanes inválido: {lanes}")
+        if not 1 <= address_bits <= MAX_ADDRESS_BITS:
+            raise ValueError(f"Espaço de endereçamento inválido: {address_bits} "
+                             f"bits (máximo {MAX_ADDRESS_BITS})")
+        self.lanes = lanes
+        self.address_bits = address_bits
+        self.size = 1 << address_bits
+        self.address_mask = self.size - 1
+
+        self.regs = np.zeros((NUM_REGISTERS, lanes), np.uint32)
+        self.memory = np.zeros((self.size, lanes), np.uint32)
+        self.pc = np.zeros(lanes, np.int64)
+        self.ir = np.zeros(lanes, np.uint32)
+        self.flags = np.zeros(lanes, np.uint8)      # N<<3 | Z<<2 | C<<1 | V
+        self.halted = np.zeros(lanes, bool)
+        self.trapped = np.zeros(lanes, bool)        # opcode inválido
+        self.cycles = np.zeros(lanes, np.int64)
+        self.instructions = np.zeros(lanes, np.int64)
+        self.running = np.zeros(lanes, bool)
+
+        self.decoder = InstructionDecoder()
+        self._decoded = {}            # IR -> BatchInstruction
+        self._pending_flags = None    # (tipo, seleção, resultado, a, b)
+        self.varying = None           # endereços cujo conteúdo difere entre lanes
+
+        # Estatísticas da última execução
+        self.steps = 0                # instruções despachadas
+        self.lane_steps = 0           # instruções executadas somando as lanes
+        self.elapsed = 0.0
+
+    # ==================== ESTADO INICIAL ====================
+
+    def load_memory(self, memory):
+        """Copia o conteúdo de um Memory/PagedMemory para todas as lanes."""
+        count = min(memory.size, self.size)
+        words = np.frombuffer(memory.to_bytes(0, count, byteorder='little'),
+                              dtype='<u4')
+        self.memory[:count] = words[:, None]
+
+    def load_program(self, filename):
+        """
+        Carrega programa (texto ou imagem empacotada) em todas as lanes.
+        Retorna o número de palavras carregadas.
+        """
+        memory = Memory(self.address_bits)
+        if is_packed_image(filename):
+            info = memory.load_program_image(filename)
+            count = info.words if info else 0
+            if info and info.entry is not None:
+                self.pc[:] = info.entry
+        else:
+            count = memory.load_program_from_text(filename)
+        self.load_memory(memory)
+        return count
+
+    def load_simulator(self, sim):
+        """Copia o estado de um Simulator (em fronteira de instrução) para todas as lanes."""
+        if sim.current_stage != 'IF' and not sim.halted:
+            raise ValueError("Estado no meio de uma instrução "
+                             f"(estágio {sim.current_stage})")
+        cpu = sim.cpu
+        self.load_memory(sim.memory)
+        self.regs[:] = np.array(cpu.regs, np.uint32)[:, None]
+        self.pc[:] = cpu.PC
+        self.ir[:] = cpu.IR
+        n, z, c, v = cpu.get_flag_values()
+        self.flags[:] = n << 3 | z << 2 | c << 1 | v
+        self.halted[:] = sim.halted
+        self.cycles[:] = sim.cycle_counter
+        self.instructions[:] = sim.instruction_count
+
+    def set_register(self, reg, values):
+        """Define o registrador reg (1 a 31) em cada lane (escalar ou array de N)."""
+        if not 1 <= reg < NUM_REGISTERS:
+            raise ValueError(f"Registrador inválido: R{reg}")
+        self.regs[reg] = np.asarray(values, np.int64) & MASK32
+
+    def set_memory(self, address, values):
+        """
+        Escreve na memória de cada lane: array de N (uma palavra) ou
+        N x k (k palavras a partir de address).
+        """
+        values = np.asarray(values, np.int64) & MASK32
+        count = values.shape[1] if values.ndim == 2 else 1
+        if not 0 <= address <= self.size - count:
+            raise ValueError(f"Bloco fora da memória: {address} (+{count})")
+        if values.ndim == 2:
+            self.memory[address:address + count] = values.T
+        else:
+            self.memory[address] = values
+
+    def set_pc(self, values):
+        """Define o PC de cada lane (escalar ou array de N)."""
+        self.pc[:] = np.asarray(values, np.int64) & MASK32
+
+    # ==================== EXECUÇÃO ====================
+
+    def run(self, max_cycles=100000):
+        """
+        Executa todas as lanes até HALT, opcode inválido ou max_cycles
+        (total acumulado por lane, como em Simulator.run).
+
+        Retorna: get_state()
+        """
+        last_full = max_cycles - STAGES_PER_INSTRUCTION
+        self.running = ~self.halted & (self.cycles <= last_full)
+        memory = self.memory
+        self.varying = (memory != memory[:, :1]).any(axis=1)
+        self.steps = self.lane_steps = 0
+        start = time.perf_counter()
+
+        pc = self.pc
+        while True:
+            rows = np.flatnonzero(self.running)
+            if not len(rows):
+                break
+            pcs = pc[rows]
+            p = int(pcs.min())
+            at_p = pcs == p
+            converged = bool(at_p.all())
+            if not converged:
+                rows = rows[at_p]
+            address = p & self.address_mask
+            if self.varying[address]:
+                # Código automodificado de forma diferente entre as lanes
+                words = memory[address, rows]
+                same = words == words[0]
+                if not same.all():
+                    rows = rows[same]
+                    converged = False
+            self._execute(rows, p, last_full, converged)
+
+        self._commit_flags()
+        self.elapsed = time.perf_counter() - start
+        return self.get_state()
+
+    def _execute(self, rows, p, last_full, converged):
+        """
+        Executa o grupo de lanes rows, todas no PC p. Se o grupo contém
+        todas as lanes ativas, continua enquanto os PCs coincidirem;
+        senão executa um único passo.
+        """
+        sel = slice(None) if len(rows) == self.lanes else rows
+        if converged:
+            # Passos até a primeira lane do grupo atingir o limite
+            budget = ((last_full - int(self.cycles[rows].max()))
+                      // STAGES_PER_INSTRUCTION + 1)
+        else:
+            budget = 1
+        memory = self.memory
+        varying = self.varying
+        decoded = self._decoded
+        mask = self.address_mask
+        steps = 0
+        ir = None
+        while True:
+            address = p & mask
+            if varying[address]:
+                words = memory[address, rows]
+                fetched = int(words[0])
+                if steps and (words != fetched).any():
+                    break
+            else:
+                fetched = int(memory[address, 0])
+            ir = fetched
+            instruction = decoded.get(ir) or self._decode(ir)
+            next_pc = instruction.handler(self, instruction, sel, rows, p)
+            steps += 1
+            if next_pc is None:
+                p = (p + 1) & MASK32
+            elif isinstance(next_pc, int):
+                p = next_pc
+            else:
+                # Alvo por lane (desvio condicional ou JR)
+                first = int(next_pc[0])
+                if (next_pc == first).all():
+                    p = first
+                else:
+                    self.pc[rows] = next_pc
+                    p = None
+                    break
+            if instruction.ends or steps >= budget:
+                break
+
+        if p is not None:
+            self.pc[rows] = p
+        self.ir[rows] = ir
+        self.instructions[rows] += steps
+        self.cycles[rows] += STAGES_PER_INSTRUCTION * steps
+        if instruction.ends:
+            self.running[rows] = False
+        elif steps >= budget:
+            self.running[rows] = self.cycles[rows] <= last_full
+        self.steps += steps
+        self.lane_steps += steps * len(rows)
+
+    def _decode(self, ir):
+        """Decodifica e guarda no cache uma instrução."""
+        decoded = self.decoder.decode_compact(ir)
+        instruction = BatchInstruction(decoded, self.EXEC_TABLE[decoded[1]])
+        self._decoded[ir] = instruction
+        return instruction
+
+    # ==================== FLAGS ====================
+    # Como na CPU, os flags são guardados como a última operação e só
+    # calculados quando outra seleção de lanes os altera ou ao final.
+
+    def _set_flags(self, kind, sel, result, a=None, b=None):
+        """Registra a operação que definiu os flags das lanes sel."""
+        pending = self._pending_flags
+        if pending is not None and pending[1] is not sel:
+            self._commit_flags()
+        self._pending_flags = (kind, sel, result, a, b)
+
+    def _commit_flags(self):
+        """Materializa os flags pendentes em self.flags."""
+        if self._pending_flags is not None:
+            kind, sel, result, a, b = self._pending_flags
+            self.flags[sel] = flag_bits(kind, result, a, b)
+            self._pending_flags = None
+
+    # ==================== TABELA DE EXECUÇÃO ====================
+    # Cada handler recebe a instrução, a seleção de lanes (slice ou índices
+    # para os registradores), os índices das lanes (acessos à memória) e o
+    # PC; retorna o próximo PC (None: sequencial; int: igual para todas;
+    # array: por lane).
+
+    def _write(self, instruction, sel, value):
+        """Write-back em RC (ignorado para R0)."""
+        if instruction.write:
+            self.regs[instruction.rc, sel] = value
+
+    def _alu(self, instruction, sel, operation, *operands):
+        """Executa operação de vector_alu, registra flags e faz o write-back."""
+        result, flags = operation(*operands)
+        if flags is not None:
+            kind, a, b = flags
+            if kind != FLAGS_LOGICAL:
+                # Cópias: a e b podem ser visões de registradores sobrescritos depois
+                a, b = np.array(a), np.array(b)
+            self._set_flags(kind, sel, result, a, b)
+        self._write(instruction, sel, result)
+
+    def _binary(self, instruction, sel, operation):
+        """Operação com RA e RB."""
+        regs = self.regs
+        self._alu(instruction, sel, operation, regs[instruction.ra, sel],
+                  regs[instruction.rb, sel])
+
+    def _unary(self, instruction, sel, operation):
+        """Operação com RA."""
+        self._alu(instruction, sel, operation, self.regs[instruction.ra, sel])
+
+    def _branch(self, taken, instruction, p):
+        """Próximo PC de desvio condicional."""
+        if taken.all():
+            return instruction.target
+        if not taken.any():
+            return None
+        return np.where(taken, instruction.target, (p + 1) & MASK32)
+
+    # ALU Operations
+    def _exec_add(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.add)
+
+    def _exec_sub(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.sub)
+
+    def _exec_zeros(self, instruction, sel, rows, p):
+        self._alu(instruction, sel, vector_alu.zeros, rows)
+
+    def _exec_xor(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.xor)
+
+    def _exec_or(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.or_op)
+
+    def _exec_not(self, instruction, sel, rows, p):
+        self._unary(instruction, sel, vector_alu.not_op)
+
+    def _exec_and(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.and_op)
+
+    # Shifts
+    def _exec_asl(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.asl)
+
+    def _exec_asr(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.asr)
+
+    def _exec_lsl(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.lsl)
+
+    def _exec_lsr(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.lsr)
+
+    def _exec_passa(self, instruction, sel, rows, p):
+        self._unary(instruction, sel, vector_alu.copy)
+
+    # Constantes
+    def _exec_lch(self, instruction, sel, rows, p):
+        self._alu(instruction, sel, vector_alu.load_const_high,
+                  self.regs[instruction.rc, sel], instruction.const16)
+
+    def _exec_lcl(self, instruction, sel, rows, p):
+        self._alu(instruction, sel, vector_alu.load_const_low,
+                  self.regs[instruction.rc, sel], instruction.const16)
+
+    # Memory Operations
+    def _exec_load(self, instruction, sel, rows, p):
+        address = self.regs[instruction.ra, sel] & self.address_mask
+        self._write(instruction, sel, self.memory[address, rows])
+
+    def _exec_store(self, instruction, sel, rows, p):
+        address = self.regs[instruction.rc, sel] & self.address_mask
+        self.memory[address, rows] = self.regs[instruction.ra, sel]
+        self.varying[address] = True
+
+    # Control Flow
+    def _exec_jal(self, instruction, sel, rows, p):
+        self.regs[31, sel] = (p + 1) & MASK32
+        return instruction.address
+
+    def _exec_jr(self, instruction, sel, rows, p):
+        return self.regs[instruction.rc, sel] & self.address_mask
+
+    def _exec_beq(self, instruction, sel, rows, p):
+        return self._branch(self.regs[instruction.ra, sel] ==
+                            self.regs[instruction.rb, sel], instruction, p)
+
+    def _exec_bne(self, instruction, sel, rows, p):
+        return self._branch(self.regs[instruction.ra, sel] !=
+                            self.regs[instruction.rb, sel], instruction, p)
+
+    def _exec_j(self, instruction, sel, rows, p):
+        return instruction.address
+
+    # Additional Instructions
+    def _exec_slt(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.slt)
+
+    def _exec_mul(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.mul)
+
+    def _exec_div(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.div)
+
+    def _exec_mod(self, instruction, sel, rows, p):
+        self._binary(instruction, sel, vector_alu.mod)
+
+    def _exec_neg(self, instruction, sel, rows, p):
+        self._unary(instruction, sel, vector_alu.neg)
+
+    def _exec_inc(self, instruction, sel, rows, p):
+        self._unary(instruction, sel, vector_alu.inc)
+
+    def _exec_dec(self, instruction, sel, rows, p):
+        self._unary(instruction, sel, vector_alu.dec)
+
+    def _exec_nop(self, instruction, sel, rows, p):
+        pass
+
+    def _exec_halt(self, instruction, sel, rows, p):
+        self.halted[rows] = True
+
+    def _exec_trap(self, instruction, sel, rows, p):
+        """Opcode inválido: a lane para no EX/MEM (3 ciclos, sem contar a instrução)."""
+        self.halted[rows] = True
+        self.trapped[rows] = True
+        self.instructions[rows] -= 1
+        self.cycles[rows] -= 1
+
+    # ==================== RESULTADOS ====================
+
+    def get_state(self, memory=True):
+        """
+        Estado final de todas as lanes como arrays (cópias): registers
+        (N x 32), memory (N x tamanho; omitida com memory=False), pc, ir,
+        flags (N<<3 | Z<<2 | C<<1 | V), halted, trapped, cycles e
+        instructions (N).
+        """
+        self._commit_flags()
+        state = {
+            'registers': np.ascontiguousarray(self.regs.T),
+            'pc': self.pc.astype(np.uint32),
+            'ir': self.ir.copy(),
+            'flags': self.flags.copy(),
+            'halted': self.halted.copy(),
+            'trapped': self.trapped.copy(),
+            'cycles': self.cycles.copy(),
+            'instructions': self.instructions.copy()
+        }
+        if memory:
+            state['memory'] = np.ascontiguousarray(self.memory.T)
+        return state
+
+    def to_simulator(self, lane, **options):
+        """
+        Cria um Simulator com o estado de uma lane (ex.: para continuar
+        em modo verboso ou gravar um checkpoint). options vão para o
+        construtor do Simulator.
+        """
+        self._commit_flags()
+        sim = Simulator(memory=Memory(self.address_bits), **options)
+        sim.memory.load_buffer(0, np.ascontiguousarray(self.memory[:, lane]))
+        cpu = sim.cpu
+        cpu.regs[:] = self.regs[:, lane].tolist()
+        cpu.PC = int(self.pc[lane])
+        cpu.IR = int(self.ir[lane])
+        flags = int(self.flags[lane])
+        cpu.flag_state = sim.alu.flag_state = make_flag_state(
+            flags >> 3 & 1, flags >> 2 & 1, flags >> 1 & 1, flags & 1)
+        sim.halted = bool(self.halted[lane])
+        sim.cycle_counter = int(self.cycles[lane])
+        sim.instruction_count = int(self.instructions[lane])
+        return sim
+
+    def get_stats(self):
+        """Resumo da última execução."""
+        halted = int(self.halted.sum())
+        return {
+            'lanes': self.lanes,
+            'halted': halted,
+            'trapped': int(self.trapped.sum()),
+            'limit': self.lanes - halted,
+            'steps': self.steps,
+            'lane_instructions': self.lane_steps,
+            'occupancy': self.lane_steps / (self.steps * self.lanes)
+                         if self.steps else 0.0,
+            'elapsed': self.elapsed,
+            'rate': self.lane_steps / self.elapsed if self.elapsed else 0.0
+        }
+
+    def print_report(self):
+        """Imprime resumo da execução em lote."""
+        stats = self.get_stats()
+        print("=" * 70)
+        print("EXECUÇÃO EM LOTE")
+        print("=" * 70)
+        print(f"Lanes: {stats['lanes']} ({stats['halted']} em HALT, "
+              f"{stats['trapped']} com opcode inválido, "
+              f"{stats['limit']} no limite de ciclos)")
+        print(f"Instruções despachadas: {stats['steps']} "
+              f"({stats['lane_instructions']} somando as lanes)")
+        print(f"Ocupação média: {stats['occupancy'] * 100:.1f}% das lanes por "
+              f"instrução despachada")
+        print(f"Tempo: {stats['elapsed']:.3f} s "
+              f"({stats['rate'] / 1e6:.2f} M instruções-lane/s)")
+
+
+def _build_exec_table():
+    """Tabela de 256 handlers indexada pelo opcode (como Simulator.EXEC_TABLE)."""
+    table = [BatchSimulator._exec_trap] * 256
+    for opcode, mnemonic in InstructionDecoder.OPCODE_NAMES.items():
+        table[opcode] = getattr(BatchSimulator, '_exec_' + mnemonic.lower())
+    return table
+
+
+BatchSimulator.EXEC_TABLE = _build_exec_table()
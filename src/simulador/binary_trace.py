@@ -0,0 +1,303 @@
+"""
+binary_trace.py - Rastro Binário de Execução
+
+Grava um evento por instrução executada (PC, IR, escritas em
+registradores, leituras e escritas de memória e flags) como registros de
+tamanho fixo num arquivo com buffer próprio, sem formatação de texto
+durante a simulação. A leitura e a renderização (texto, JSON lines,
+filtros) ficam a cargo de TraceReader e da ferramenta
+src/ferramentas/rastro.py.
+
+Formato:
+    Cabeçalho (28 bytes, big-endian)
+        magic          4 bytes  b'URTR'
+        versão         u16      1
+        registro       u16      bytes por registro (8)
+        endereço       u8       bits de endereço da memória (+3 de preenchimento)
+        ciclo inicial  u64
+        instr. inicial u64
+    Registros (8 bytes, little-endian): valor << 32 | campo << 8 | aux << 4 | tipo
+        TRACE_INSN       campo = PC - (PC anterior + 1) (mod 2^24), valor = IR
+        TRACE_REG        campo = registrador, valor = novo conteúdo
+        TRACE_MEM_READ   campo = endereço, valor = palavra lida
+        TRACE_MEM_WRITE  campo = endereço, valor = palavra escrita
+        TRACE_FLAGS      aux = N<<3 | Z<<2 | C<<1 | V
+
+Codificação delta: instruções sequenciais têm campo 0 (só desvios
+carregam deslocamento) e TRACE_FLAGS só aparece quando os flags mudam.
+Os efeitos seguem o TRACE_INSN da instrução que os produziu.
+"""
+
+import struct
+import sys
+from array import array
+
+TRACE_MAGIC = b'URTR'
+TRACE_VERSION = 1
+
+HEADER = struct.Struct('>4sHHBxxxQQ')
+RECORD_SIZE = 8
+
+# Tipos de registro (4 bits)
+TRACE_INSN = 0
+TRACE_REG = 1
+TRACE_MEM_READ = 2
+TRACE_MEM_WRITE = 3
+TRACE_FLAGS = 4
+
+FIELD_MASK = 0xFFFFFF  # campo de 24 bits (alcance máximo de endereço)
+
+# Registros lidos por vez na leitura
+BUFFER_RECORDS = 1 << 16
+
+# Instruções gravadas entre escritas no arquivo (até 4 registros cada)
+CHUNK = BUFFER_RECORDS >> 2
+
+OP_LOAD = 0x10
+OP_STORE = 0x11
+OP_JAL = 0x12
+
+# Efeito extra por opcode (além do write-back), consultado numa tabela
+EFFECT_LOAD = 1
+EFFECT_STORE = 2
+EFFECT_JAL = 3
+_EFFECTS = bytearray(256)
+_EFFECTS[OP_LOAD] = EFFECT_LOAD
+_EFFECTS[OP_STORE] = EFFECT_STORE
+_EFFECTS[OP_JAL] = EFFECT_JAL
+
+_SWAP = sys.byteorder != 'little'
+
+
+class TraceError(Exception):
+    """Arquivo de rastro inválido ou corrompido."""
+
+
+def is_trace(filename):
+    """Verifica se o arquivo começa com o magic de rastro."""
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(TRACE_MAGIC)) == TRACE_MAGIC
+    except OSError:
+        return False
+
+
+# ==================== GRAVAÇÃO ====================
+
+class TraceWriter:
+    """Rastro binário de um Simulator, gravado instrução a instrução."""
+
+    def __init__(self, sim, filename):
+        self.sim = sim
+        self.filename = filename
+        self.file = open(filename, 'wb')
+        self.started = False  # cabeçalho gravado na primeira execução
+        self.buffer = array('Q')
+        self.records = 0
+        self.instructions = 0
+        self.expected_pc = 0
+        self.flag_state = None  # último estado preguiçoso visto
+        self.flag_bits = None   # últimos flags gravados
+
+    def run(self, last_full):
+        """
+        Executa instruções completas (como o modo rápido) enquanto
+        cycle_counter <= last_full, gravando um evento por instrução.
+        """
+        sim = self.sim
+        if not self.started:
+            # Depois de uma eventual restauração de checkpoint
+            self.file.write(HEADER.pack(
+                TRACE_MAGIC, TRACE_VERSION, RECORD_SIZE,
+                sim.memory.address_bits, sim.cycle_counter,
+                sim.instruction_count))
+            self.started = True
+        cpu = sim.cpu
+        regs = cpu.regs
+        mask = sim.address_mask
+        execute = sim.execute_instruction
+        effects = _EFFECTS
+        buffer = self.buffer
+        append = buffer.append
+        expected = self.expected_pc
+        flag_state = self.flag_state
+        first = sim.instruction_count
+        running = True
+
+        while running:
+            # Lotes de CHUNK instruções: o buffer só é verificado entre lotes
+            for _ in range(CHUNK):
+                if sim.cycle_counter > last_full or not execute():
+                    running = False
+                    break
+                pc = sim.fetch_address
+                append(cpu.IR << 32 | ((pc - expected) & FIELD_MASK) << 8)
+                expected = pc + 1
+
+                effect = effects[sim.opcode]
+                if effect:
+                    if effect == EFFECT_LOAD:
+                        append(sim.mem_data << 32 | (sim.val_a & mask) << 8
+                               | TRACE_MEM_READ)
+                    elif effect == EFFECT_STORE:
+                        append(sim.val_a << 32 | (sim.val_c & mask) << 8
+                               | TRACE_MEM_WRITE)
+                    else:
+                        append(regs[31] << 32 | 31 << 8 | TRACE_REG)
+                if sim.write_enable:
+                    reg = sim.rc
+                    if reg:
+                        if reg > 31:
+                            reg = 31
+                        append(regs[reg] << 32 | reg << 8 | TRACE_REG)
+
+                if cpu.flag_state is not flag_state:
+                    flag_state = cpu.flag_state
+                    n, z, c, v = cpu.get_flag_values()
+                    bits = n << 3 | z << 2 | c << 1 | v
+                    if bits != self.flag_bits:
+                        self.flag_bits = bits
+                        append(bits << 4 | TRACE_FLAGS)
+            self.flush(sync=not running)
+
+        self.expected_pc = expected
+        self.flag_state = flag_state
+        self.instructions += sim.instruction_count - first
+
+    def flush(self, sync=True):
+        """Grava os registros pendentes no arquivo."""
+        buffer = self.buffer
+        if buffer:
+            if _SWAP:
+                buffer.byteswap()
+            self.file.write(buffer.tobytes())
+            self.records += len(buffer)
+            del buffer[:]
+        if sync:
+            self.file.flush()
+
+    def close(self):
+        """Grava pendências e fecha o arquivo."""
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def get_stats(self):
+        """Instruções, registros e bytes gravados."""
+        return {
+            'instructions': self.instructions,
+            'records': self.records + len(self.buffer),
+            'bytes': HEADER.size + RECORD_SIZE * (self.records + len(self.buffer))
+        }
+
+    def print_stats(self):
+        """Imprime resumo do rastro gravado."""
+        stats = self.get_stats()
+        print(f"Rastro binário: {self.filename}")
+        print(f"  {stats['instructions']} instruções, {stats['records']} "
+              f"registros, {stats['bytes']} bytes")
+
+
+# ==================== LEITURA ====================
+
+class TraceStep:
+    """Uma instrução do rastro e seus efeitos."""
+
+    __slots__ = ('index', 'cycle', 'pc', 'ir', 'registers', 'reads',
+                 'writes', 'flags', 'flags_changed')
+
+    def __init__(self, index, cycle, pc, ir, flags):
+        self.index = index          # nº da instrução (a partir de 1)
+        self.cycle = cycle          # ciclo de início (modelo de 4 estágios)
+        self.pc = pc
+        self.ir = ir
+        self.registers = []         # [(registrador, valor)]
+        self.reads = []             # [(endereço, palavra)]
+        self.writes = []            # [(endereço, palavra)]
+        self.flags = flags          # N<<3 | Z<<2 | C<<1 | V após a instrução
+        self.flags_changed = False
+
+    def to_dict(self):
+        """Representação serializável (JSON)."""
+        return {
+            'index': self.index,
+            'cycle': self.cycle,
+            'pc': self.pc,
+            'ir': self.ir,
+            'registers': self.registers,
+            'reads': self.reads,
+            'writes': self.writes,
+            'flags': {name: (self.flags >> (3 - i)) & 1
+                      for i, name in enumerate(('neg', 'zero', 'carry',
+                                                'overflow'))},
+            'flags_changed': self.flags_changed
+        }
+
+
+class TraceReader:
+    """Leitura sequencial de um arquivo de rastro."""
+
+    def __init__(self, filename, chunk_records=BUFFER_RECORDS):
+        self.filename = filename
+        self.chunk_records = chunk_records
+        with open(filename, 'rb') as f:
+            header = f.read(HEADER.size)
+        if len(header) < HEADER.size:
+            raise TraceError("Arquivo de rastro truncado")
+        (magic, version, record_size, self.address_bits, self.start_cycle,
+         self.start_instruction) = HEADER.unpack(header)
+        if magic != TRACE_MAGIC:
+            raise TraceError("Arquivo não é um rastro (magic inválido)")
+        if version != TRACE_VERSION or record_size != RECORD_SIZE:
+            raise TraceError(f"Versão de rastro não suportada: {version}")
+
+    def records(self):
+        """Itera os registros brutos (inteiros de 64 bits)."""
+        with open(self.filename, 'rb') as f:
+            f.seek(HEADER.size)
+            while True:
+                data = f.read(self.chunk_records * RECORD_SIZE)
+                if not data:
+                    return
+                if len(data) % RECORD_SIZE:
+                    raise TraceError("Arquivo de rastro truncado")
+                chunk = array('Q')
+                chunk.frombytes(data)
+                if _SWAP:
+                    chunk.byteswap()
+                yield from chunk
+
+    def __iter__(self):
+        """Itera TraceStep, uma por instrução."""
+        step = None
+        expected = 0
+        flags = 0
+        index = self.start_instruction
+        cycle = self.start_cycle
+        for record in self.records():
+            kind = record & 0xF
+            field = (record >> 8) & FIELD_MASK
+            value = record >> 32
+            if kind == TRACE_INSN:
+                if step is not None:
+                    yield step
+                pc = (expected + field) & FIELD_MASK
+                expected = pc + 1
+                index += 1
+                step = TraceStep(index, cycle, pc, value, flags)
+                cycle += 4
+            elif step is None:
+                raise TraceError("Efeito sem instrução no início do rastro")
+            elif kind == TRACE_REG:
+                step.registers.append((field, value))
+            elif kind == TRACE_MEM_READ:
+                step.reads.append((field, value))
+            elif kind == TRACE_MEM_WRITE:
+                step.writes.append((field, value))
+            elif kind == TRACE_FLAGS:
+                flags = step.flags = (record >> 4) & 0xF
+                step.flags_changed = True
+            else:
+                raise TraceError(f"Tipo de registro desconhecido: {kind}")
+        if step is not None:
+            yield step
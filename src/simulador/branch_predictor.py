@@ -0,0 +1,382 @@
+"""
+branch_predictor.py - Preditores de Desvio
+
+Modelos de previsão para BEQ/BNE, alimentados pela unidade de controle
+na resolução de cada desvio (e consultados pelo pipeline sobreposto para
+decidir o caminho da busca). O estado de cada preditor fica em arrays
+indexados pelos bits menos significativos do PC.
+
+Preditores disponíveis (create_predictor / PREDICTORS):
+    not-taken       estático: nunca tomado
+    backward-taken  estático: tomado se o destino estiver para trás (laços)
+    1bit            último resultado de cada desvio
+    2bit            contadores saturantes de 2 bits
+    btb             branch target buffer (tag, destino e contador de 2
+                    bits); prevê já na busca, antes da decodificação
+    gshare          contadores de 2 bits indexados por PC XOR histórico
+                    global
+
+Nos modos funcionais a previsão não altera a execução, então os desvios
+resolvidos são apenas registrados (record) e o preditor os processa em
+lote (sync), num laço sem chamadas por desvio. O pipeline usa a previsão
+na hora (predict/update).
+
+Cada desvio é guardado como um inteiro: pc << 9 | destino << 1 | tomado.
+"""
+
+from array import array
+from collections import Counter
+
+from memory import new_word_array
+
+# Bits do PC usados para indexar as tabelas
+DEFAULT_INDEX_BITS = 10
+
+# Desvios registrados antes de um processamento em lote
+LOG_SIZE = 4096
+
+# Contadores de 2 bits: 0-1 não tomado, 2-3 tomado
+COUNTER_TAKEN = 2
+COUNTER_INIT = 1  # fracamente não tomado
+_INCREMENT = bytes([1, 2, 3, 3])
+_DECREMENT = bytes([0, 0, 1, 2])
+
+
+def pack_branch(pc, taken, target):
+    """Codifica um desvio resolvido como inteiro."""
+    return pc << 9 | (target & 0xFF) << 1 | (1 if taken else 0)
+
+
+class BranchPredictor:
+    """
+    Interface comum dos preditores.
+
+    predict() apenas consulta; train() atualiza o modelo; _replay() faz
+    o mesmo que predict + train para um lote de desvios e devolve os que
+    foram previstos errado.
+    """
+
+    NAME = 'base'
+    # True se o preditor conhece o destino já no IF (fetch_target)
+    PREDICTS_AT_FETCH = False
+
+    def __init__(self, index_bits=DEFAULT_INDEX_BITS):
+        self.index_bits = index_bits
+        self.index_mask = (1 << index_bits) - 1
+        self.log = []
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zera contadores de desvios e erros (o estado aprendido é mantido)."""
+        self.sync()
+        self.counts = Counter()  # desvio codificado -> execuções
+        self.missed = Counter()  # desvio codificado -> erros de previsão
+
+    # ==================== MODELO ====================
+
+    def predict(self, pc, target):
+        """Retorna True se o desvio em pc for previsto como tomado."""
+        return False
+
+    def train(self, pc, taken, target):
+        """Atualiza o estado do preditor com o resultado real."""
+        pass
+
+    def _replay(self, records):
+        """Prevê e treina um lote de desvios; retorna os previstos errado."""
+        missed = []
+        for record in records:
+            pc = record >> 9
+            target = (record >> 1) & 0xFF
+            taken = record & 1 == 1
+            if self.predict(pc, target) != taken:
+                missed.append(record)
+            self.train(pc, taken, target)
+        return missed
+
+    # ==================== RESOLUÇÃO ====================
+
+    def record(self, pc, taken, target):
+        """Registra desvio resolvido para processamento em lote."""
+        log = self.log
+        log.append(pc << 9 | target << 1 | taken)
+        if len(log) >= LOG_SIZE:
+            self.sync()
+
+    def sync(self):
+        """Processa os desvios registrados e ainda pendentes."""
+        log = self.log
+        if log:
+            self.counts.update(log)
+            self.missed.update(self._replay(log))
+            log.clear()
+
+    def update(self, pc, taken, target, predicted=None):
+        """
+        Contabiliza e treina com um desvio, na hora.
+
+        Args:
+            predicted: previsão já usada pela busca (None: consulta agora)
+
+        Retorna: True se a previsão estava correta
+        """
+        self.sync()
+        if predicted is None:
+            predicted = self.predict(pc, target)
+        self.train(pc, taken, target)
+        record = pack_branch(pc, taken, target)
+        self.counts[record] += 1
+        if predicted != taken:
+            self.missed[record] += 1
+            return False
+        return True
+
+    # ==================== ESTATÍSTICAS ====================
+
+    def per_pc(self):
+        """Retorna {PC: [execuções, tomados, erros]}."""
+        self.sync()
+        table = {}
+        for record, count in self.counts.items():
+            entry = table.setdefault(record >> 9, [0, 0, 0])
+            entry[0] += count
+            if record & 1:
+                entry[1] += count
+        for record, count in self.missed.items():
+            table[record >> 9][2] += count
+        return table
+
+    def get_stats(self, instructions=0):
+        """Retorna acurácia e MPKI (erros por mil instruções)."""
+        self.sync()
+        branches = sum(self.counts.values())
+        taken = sum(count for record, count in self.counts.items()
+                    if record & 1)
+        mispredictions = sum(self.missed.values())
+        return {
+            'predictor': self.NAME,
+            'branches': branches,
+            'taken': taken,
+            'mispredictions': mispredictions,
+            'accuracy': (1 - mispredictions / branches) if branches else 0.0,
+            'mpki': (1000 * mispredictions / instructions
+                     if instructions else 0.0)
+        }
+
+    def print_stats(self, instructions=0, limit=10):
+        """Imprime resumo e os desvios com mais erros de previsão."""
+        stats = self.get_stats(instructions)
+        print(f"Preditor de desvios: {self.NAME}")
+        print(f"  Desvios: {stats['branches']} "
+              f"(tomados: {stats['taken']})")
+        print(f"  Erros de previsão: {stats['mispredictions']}")
+        print(f"  Acurácia: {100 * stats['accuracy']:.2f}% | "
+              f"MPKI: {stats['mpki']:.2f}")
+
+        worst = sorted(self.per_pc().items(),
+                       key=lambda item: (-item[1][2], item[0]))[:limit]
+        if worst:
+            print(f"  {'PC':>8} {'Execuções':>10} {'Tomados':>8} "
+                  f"{'Erros':>7} {'Taxa':>7}")
+            for pc, (count, taken, missed) in worst:
+                print(f"  {pc:8d} {count:10d} {taken:8d} {missed:7d} "
+                      f"{100 * missed / count:6.1f}%")
+
+
+# ==================== PREDITORES ESTÁTICOS ====================
+
+class StaticNotTakenPredictor(BranchPredictor):
+    """Prevê sempre não tomado."""
+
+    NAME = 'not-taken'
+
+    def _replay(self, records):
+        return [record for record in records if record & 1]
+
+
+class BackwardTakenPredictor(BranchPredictor):
+    """Prevê tomado para desvios para trás (fim de laço)."""
+
+    NAME = 'backward-taken'
+
+    def predict(self, pc, target):
+        return target <= pc
+
+    def _replay(self, records):
+        return [record for record in records
+                if (((record >> 1) & 0xFF) <= (record >> 9)) != (record & 1)]
+
+
+# ==================== PREDITORES DINÂMICOS ====================
+
+class OneBitPredictor(BranchPredictor):
+    """Um bit por entrada: repete o último resultado."""
+
+    NAME = '1bit'
+
+    def __init__(self, index_bits=DEFAULT_INDEX_BITS):
+        self.bits = array('B', bytes(1 << index_bits))
+        super().__init__(index_bits)
+
+    def predict(self, pc, target):
+        return self.bits[pc & self.index_mask] == 1
+
+    def train(self, pc, taken, target):
+        self.bits[pc & self.index_mask] = 1 if taken else 0
+
+    def _replay(self, records):
+        bits = self.bits
+        mask = self.index_mask
+        missed = []
+        for record in records:
+            index = (record >> 9) & mask
+            taken = record & 1
+            if bits[index] != taken:
+                missed.append(record)
+                bits[index] = taken
+        return missed
+
+
+class TwoBitPredictor(BranchPredictor):
+    """Contadores saturantes de 2 bits por entrada."""
+
+    NAME = '2bit'
+
+    def __init__(self, index_bits=DEFAULT_INDEX_BITS):
+        self.counters = array('B', [COUNTER_INIT]) * (1 << index_bits)
+        super().__init__(index_bits)
+
+    def predict(self, pc, target):
+        return self.counters[pc & self.index_mask] >= COUNTER_TAKEN
+
+    def train(self, pc, taken, target):
+        index = pc & self.index_mask
+        counters = self.counters
+        counters[index] = (_INCREMENT if taken else _DECREMENT)[counters[index]]
+
+    def _replay(self, records):
+        counters = self.counters
+        mask = self.index_mask
+        missed = []
+        for record in records:
+            index = (record >> 9) & mask
+            value = counters[index]
+            if record & 1:
+                if value < COUNTER_TAKEN:
+                    missed.append(record)
+                counters[index] = _INCREMENT[value]
+            else:
+                if value >= COUNTER_TAKEN:
+                    missed.append(record)
+                counters[index] = _DECREMENT[value]
+        return missed
+
+
+class BTBPredictor(BranchPredictor):
+    """
+    Branch target buffer de mapeamento direto.
+
+    Cada entrada guarda o PC do desvio (tag), o destino e um contador de
+    2 bits. Entradas são alocadas quando um desvio é tomado; sem entrada
+    válida a previsão é "não tomado".
+    """
+
+    NAME = 'btb'
+    PREDICTS_AT_FETCH = True
+
+    def __init__(self, index_bits=DEFAULT_INDEX_BITS):
+        size = 1 << index_bits
+        self.valid = array('B', bytes(size))
+        self.tags = new_word_array(size)
+        self.targets = new_word_array(size)
+        self.counters = array('B', [COUNTER_INIT]) * size
+        self.allocations = 0
+        super().__init__(index_bits)
+
+    def fetch_target(self, pc):
+        """Destino previsto para a busca seguinte a pc (None: sequencial)."""
+        index = pc & self.index_mask
+        if (self.valid[index] and self.tags[index] == pc and
+                self.counters[index] >= COUNTER_TAKEN):
+            return self.targets[index]
+        return None
+
+    def predict(self, pc, target):
+        return self.fetch_target(pc) is not None
+
+    def train(self, pc, taken, target):
+        index = pc & self.index_mask
+        if self.valid[index] and self.tags[index] == pc:
+            counters = self.counters
+            counters[index] = (_INCREMENT if taken else _DECREMENT)[counters[index]]
+        elif taken:
+            self.valid[index] = 1
+            self.tags[index] = pc
+            self.counters[index] = COUNTER_TAKEN
+            self.allocations += 1
+        else:
+            return
+        self.targets[index] = target
+
+    def get_stats(self, instructions=0):
+        stats = super().get_stats(instructions)
+        stats['allocations'] = self.allocations
+        return stats
+
+
+class GSharePredictor(BranchPredictor):
+    """Contadores de 2 bits indexados por PC XOR histórico global."""
+
+    NAME = 'gshare'
+
+    def __init__(self, index_bits=DEFAULT_INDEX_BITS):
+        self.counters = array('B', [COUNTER_INIT]) * (1 << index_bits)
+        self.history = 0
+        super().__init__(index_bits)
+
+    def predict(self, pc, target):
+        return self.counters[(pc ^ self.history) & self.index_mask] >= COUNTER_TAKEN
+
+    def train(self, pc, taken, target):
+        index = (pc ^ self.history) & self.index_mask
+        counters = self.counters
+        counters[index] = (_INCREMENT if taken else _DECREMENT)[counters[index]]
+        self.history = ((self.history << 1) | (1 if taken else 0)) & self.index_mask
+
+    def _replay(self, records):
+        counters = self.counters
+        mask = self.index_mask
+        history = self.history
+        missed = []
+        for record in records:
+            index = ((record >> 9) ^ history) & mask
+            value = counters[index]
+            taken = record & 1
+            if taken:
+                if value < COUNTER_TAKEN:
+                    missed.append(record)
+                counters[index] = _INCREMENT[value]
+            else:
+                if value >= COUNTER_TAKEN:
+                    missed.append(record)
+                counters[index] = _DECREMENT[value]
+            history = ((history << 1) | taken) & mask
+        self.history = history
+        return missed
+
+
+# ==================== FÁBRICA ====================
+
+PREDICTORS = {
+    cls.NAME: cls for cls in (StaticNotTakenPredictor, BackwardTakenPredictor,
+                              OneBitPredictor, TwoBitPredictor, BTBPredictor,
+                              GSharePredictor)
+}
+
+
+def create_predictor(name, index_bits=DEFAULT_INDEX_BITS):
+    """Cria preditor pelo nome (ver PREDICTORS)."""
+    if name not in PREDICTORS:
+        raise ValueError(f"Preditor desconhecido: {name} "
+                         f"(opções: {', '.join(PREDICTORS)})")
+    return PREDICTORS[name](index_bits)
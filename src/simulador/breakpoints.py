@@ -0,0 +1,210 @@
+"""
+breakpoints.py - Breakpoints, Watchpoints e Motivo de Parada
+
+Breakpoints de PC (guardados em Memory.breakpoints) e watchpoints de
+leitura/escrita em intervalos de endereços (WatchpointIndex). Sem nenhum
+ponto definido, Simulator.run() usa o laço normal, sem verificações; com
+pontos definidos, run_with_stops() executa instrução a instrução com uma
+consulta a um bytearray por instrução (e outra por LOAD/STORE).
+
+A parada não imprime nada: Simulator.run() devolve um StopReason.
+"""
+
+from bisect import bisect_right
+
+# Tipos de watchpoint (bits no mapa por endereço)
+WATCH_READ = 1
+WATCH_WRITE = 2
+WATCH_KINDS = {'r': WATCH_READ, 'w': WATCH_WRITE,
+               'rw': WATCH_READ | WATCH_WRITE}
+
+# Motivos de parada
+STOP_HALT = 'halt'
+STOP_LIMIT = 'limit'
+STOP_BREAKPOINT = 'breakpoint'
+STOP_WATCH_READ = 'watch-read'
+STOP_WATCH_WRITE = 'watch-write'
+STOP_TRAP = 'trap'                  # opcode inválido
+# Limites de Simulator.execute() além dos ciclos
+STOP_INSTRUCTIONS = 'instructions'
+STOP_TIMEOUT = 'timeout'
+# Execução reversa (ver reverse.py)
+STOP_STEP = 'step'
+STOP_CYCLE = 'cycle'
+STOP_HISTORY_START = 'history-start'
+
+OP_LOAD = 0x10
+OP_STORE = 0x11
+
+
+class StopReason:
+    """Por que a execução parou (Simulator.run() ou ReverseDebugger)."""
+
+    def __init__(self, kind, pc, cycle, instructions, address=None,
+                 value=None, watchpoint=None):
+        self.kind = kind                  # STOP_*
+        self.pc = pc                      # próxima instrução a executar
+        self.cycle = cycle
+        self.instructions = instructions
+        self.address = address            # endereço acessado (watchpoints)
+        self.value = value                # palavra lida/escrita (watchpoints)
+        self.watchpoint = watchpoint      # (início, fim, tipo) atingido
+
+    def is_debug_stop(self):
+        """True se a parada foi causada por breakpoint ou watchpoint."""
+        return self.kind in (STOP_BREAKPOINT, STOP_WATCH_READ, STOP_WATCH_WRITE)
+
+    def describe(self):
+        """Descrição curta em texto."""
+        if self.kind == STOP_HALT:
+            return f"HALT (ciclo {self.cycle})"
+        if self.kind == STOP_LIMIT:
+            return f"limite de ciclos (ciclo {self.cycle}, PC {self.pc})"
+        if self.kind == STOP_TRAP:
+            return f"opcode inválido em PC {self.pc} (ciclo {self.cycle})"
+        if self.kind == STOP_INSTRUCTIONS:
+            return (f"limite de instruções ({self.instructions}, "
+                    f"ciclo {self.cycle}, PC {self.pc})")
+        if self.kind == STOP_TIMEOUT:
+            return f"limite de tempo (ciclo {self.cycle}, PC {self.pc})"
+        if self.kind == STOP_BREAKPOINT:
+            return f"breakpoint em PC {self.pc} (ciclo {self.cycle})"
+        if self.kind in (STOP_STEP, STOP_CYCLE):
+            return f"PC {self.pc} (ciclo {self.cycle})"
+        if self.kind == STOP_HISTORY_START:
+            return (f"início do histórico gravado (ciclo {self.cycle}, "
+                    f"PC {self.pc})")
+        access = 'leitura' if self.kind == STOP_WATCH_READ else 'escrita'
+        return (f"watchpoint de {access} em Memória[{self.address}] = "
+                f"0x{self.value:08x} (ciclo {self.cycle}, próximo PC {self.pc})")
+
+    def __repr__(self):
+        return f"StopReason({self.kind!r}, pc={self.pc}, cycle={self.cycle})"
+
+
+def parse_watch_kind(kind):
+    """Converte 'r', 'w' ou 'rw' nos bits de WATCH_*."""
+    if kind not in WATCH_KINDS:
+        raise ValueError(f"Tipo de watchpoint inválido: {kind} "
+                         f"(opções: {', '.join(WATCH_KINDS)})")
+    return WATCH_KINDS[kind]
+
+
+class WatchpointIndex:
+    """
+    Intervalos [início, fim] de endereços observados.
+
+    A lista ordenada por início responde qual watchpoint foi atingido;
+    o mapa (um byte por endereço, bits WATCH_*) é montado sob demanda
+    para a verificação no laço de execução.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.intervals = []  # (início, fim, bits), ordenados
+        self._map = None
+
+    def __len__(self):
+        return len(self.intervals)
+
+    def add(self, start, end=None, kind='rw'):
+        """Observa os endereços de start a end (inclusive)."""
+        end = start if end is None else end
+        if not 0 <= start <= end < self.size:
+            raise ValueError(f"Intervalo de watchpoint inválido: {start}..{end}")
+        self.intervals.append((start, end, parse_watch_kind(kind)))
+        self.intervals.sort()
+        self._map = None
+
+    def remove(self, start, end=None):
+        """Remove watchpoints com exatamente esse intervalo. Retorna True se havia."""
+        end = start if end is None else end
+        kept = [w for w in self.intervals if (w[0], w[1]) != (start, end)]
+        removed = len(kept) != len(self.intervals)
+        self.intervals = kept
+        self._map = None
+        return removed
+
+    def clear(self):
+        """Remove todos os watchpoints."""
+        self.intervals = []
+        self._map = None
+
+    def find(self, address, bits):
+        """Primeiro watchpoint com algum dos bits que contém address."""
+        intervals = self.intervals
+        for start, end, kind in intervals[:bisect_right(intervals, (address, self.size))]:
+            if start <= address <= end and kind & bits:
+                return (start, end, kind)
+        return None
+
+    def map(self):
+        """bytearray com os bits WATCH_* de cada endereço."""
+        if self._map is None:
+            table = bytearray(self.size)
+            # Varredura por fronteiras: segmentos disjuntos com bits combinados
+            bounds = sorted({s for s, _, _ in self.intervals} |
+                            {e + 1 for _, e, _ in self.intervals})
+            for low, high in zip(bounds, bounds[1:]):
+                bits = 0
+                for start, end, kind in self.intervals:
+                    if start <= low <= end:
+                        bits |= kind
+                if bits:
+                    table[low:high] = bytes([bits]) * (high - low)
+            self._map = table
+        return self._map
+
+
+# ==================== EXECUÇÃO ====================
+
+def run_with_stops(sim, last_full, skip_pc=None, execute=None):
+    """
+    Executa instruções completas (como o modo rápido) enquanto
+    cycle_counter <= last_full, parando antes de um PC com breakpoint ou
+    depois de um LOAD/STORE em endereço observado.
+
+    Args:
+        skip_pc: endereço cujo breakpoint é ignorado na primeira instrução
+                 (continuação após parar nele)
+        execute: executa uma instrução (padrão: sim.execute_instruction)
+
+    Retorna: StopReason do breakpoint/watchpoint, ou None
+    """
+    cpu = sim.cpu
+    mask = sim.address_mask
+    execute = execute or sim.execute_instruction
+    # Mapas cacheados: nada é montado por chamada (uma por trecho de execução)
+    breaks = sim.memory.breakpoint_map()
+    watches = sim.watchpoints.map() if sim.watchpoints else None
+
+    while sim.cycle_counter <= last_full:
+        pc = cpu.PC & mask
+        if breaks[pc] and pc != skip_pc:
+            return StopReason(STOP_BREAKPOINT, pc, sim.cycle_counter,
+                              sim.instruction_count)
+        skip_pc = None
+        if not execute():
+            break
+        if watches is None:
+            continue
+
+        opcode = sim.opcode
+        if opcode == OP_LOAD:
+            address = sim.val_a & mask
+            if watches[address] & WATCH_READ:
+                return _watch_stop(sim, STOP_WATCH_READ, address,
+                                   sim.mem_data, WATCH_READ)
+        elif opcode == OP_STORE:
+            address = sim.val_c & mask
+            if watches[address] & WATCH_WRITE:
+                return _watch_stop(sim, STOP_WATCH_WRITE, address,
+                                   sim.val_a, WATCH_WRITE)
+    return None
+
+
+def _watch_stop(sim, kind, address, value, bits):
+    """StopReason de um watchpoint atingido."""
+    return StopReason(kind, sim.cpu.PC & sim.address_mask, sim.cycle_counter,
+                      sim.instruction_count, address, value,
+                      sim.watchpoints.find(address, bits))
@@ -0,0 +1,320 @@
+"""
+cache.py - Hierarquia de Caches de Instruções e Dados
+
+Modelo de caches entre o simulador e a memória: L1I e L1D separadas e,
+opcionalmente, uma L2 unificada. Cada cache guarda apenas tags e estado
+das linhas (válida, suja, idade) em arrays; os dados continuam na Memory,
+portanto os resultados da simulação não mudam. A hierarquia mede acertos,
+faltas, substituições, write-backs e o tempo médio de acesso (AMAT).
+
+Parâmetros (tamanhos em palavras, potências de 2):
+    tamanho, linha, vias     capacidade, palavras por linha, associatividade
+    política                 lru, fifo ou random
+    escrita                  wb: write-back com alocação na escrita
+                             wt: write-through sem alocação na escrita
+                             (cada escrita é propagada ao nível seguinte)
+
+Especificação textual (CLI): TAMANHO:LINHA:VIAS[:POLÍTICA[:ESCRITA]],
+ex.: 1024:4:2:lru:wb
+"""
+
+import random
+from array import array
+
+POLICIES = ('lru', 'fifo', 'random')
+WRITE_POLICIES = ('wb', 'wt')
+
+# Latências em ciclos
+L1_HIT_LATENCY = 1
+L2_HIT_LATENCY = 10
+MEMORY_LATENCY = 100
+
+
+def _log2(value, what):
+    """Expoente de uma potência de 2 (ValueError caso contrário)."""
+    if value < 1 or value & (value - 1):
+        raise ValueError(f"{what} deve ser potência de 2: {value}")
+    return value.bit_length() - 1
+
+
+class Cache:
+    """Cache associativa por conjuntos (apenas tags)."""
+
+    def __init__(self, name, size, line_size=4, ways=1, policy='lru',
+                 write_policy='wb', hit_latency=L1_HIT_LATENCY,
+                 next_level=None, memory_latency=MEMORY_LATENCY, seed=0):
+        """
+        Args:
+            name: nome exibido nos relatórios (ex.: 'L1D')
+            size: capacidade em palavras
+            line_size: palavras por linha
+            ways: associatividade (vias por conjunto)
+            policy: substituição ('lru', 'fifo' ou 'random')
+            write_policy: 'wb' (write-back) ou 'wt' (write-through)
+            hit_latency: ciclos de um acerto
+            next_level: Cache seguinte (None: memória principal)
+            memory_latency: ciclos de um acesso à memória principal
+            seed: semente da política aleatória
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Política de substituição inválida: {policy}")
+        if write_policy not in WRITE_POLICIES:
+            raise ValueError(f"Política de escrita inválida: {write_policy}")
+        self.line_bits = _log2(line_size, "Tamanho da linha")
+        _log2(ways, "Associatividade")
+        _log2(size, "Tamanho da cache")
+        if size < line_size * ways:
+            raise ValueError(f"Cache {name} menor que um conjunto "
+                             f"({line_size} x {ways} palavras)")
+
+        self.name = name
+        self.size = size
+        self.line_size = line_size
+        self.ways = ways
+        self.policy = policy
+        self.write_policy = write_policy
+        self.write_back = write_policy == 'wb'
+        self.lru = policy == 'lru'
+        self.hit_latency = hit_latency
+        self.next_level = next_level
+        self.memory_latency = memory_latency
+
+        self.num_sets = size // (line_size * ways)
+        self.set_bits = self.num_sets.bit_length() - 1
+        self.set_mask = self.num_sets - 1
+
+        # Estado das linhas: slot = conjunto * vias + via
+        lines = self.num_sets * ways
+        self.tags = array('q', [-1]) * lines       # -1: linha inválida
+        self.dirty = array('B', bytes(lines))
+        self.stamps = array('Q', bytes(8 * lines))  # LRU: último uso; FIFO: carga
+        self.clock = 0
+        self.random = random.Random(seed)
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zera contadores de acesso."""
+        self.reads = 0
+        self.writes = 0
+        self.read_misses = 0
+        self.write_misses = 0
+        self.evictions = 0
+        self.writebacks = 0
+        self.cycles = 0
+
+    def invalidate_all(self):
+        """Invalida todas as linhas (sem write-back)."""
+        self.tags[:] = array('q', [-1]) * len(self.tags)
+        self.dirty[:] = array('B', bytes(len(self.dirty)))
+
+    # ==================== ACESSO ====================
+
+    def access(self, address, is_write=False):
+        """Registra acesso a uma palavra. Retorna a latência em ciclos."""
+        line = address >> self.line_bits
+        set_index = line & self.set_mask
+        tag = line >> self.set_bits
+        base = set_index * self.ways
+        tags = self.tags
+        self.clock += 1
+        latency = self.hit_latency
+        if is_write:
+            self.writes += 1
+        else:
+            self.reads += 1
+
+        for slot in range(base, base + self.ways):
+            if tags[slot] == tag:
+                if self.lru:
+                    self.stamps[slot] = self.clock
+                if is_write:
+                    if self.write_back:
+                        self.dirty[slot] = 1
+                    else:
+                        latency += self._next_access(address, True)
+                self.cycles += latency
+                return latency
+
+        # Falta
+        if is_write:
+            self.write_misses += 1
+            if not self.write_back:
+                latency += self._next_access(address, True)
+                self.cycles += latency
+                return latency
+        else:
+            self.read_misses += 1
+
+        slot = self._victim(base)
+        if tags[slot] >= 0:
+            self.evictions += 1
+            if self.dirty[slot]:
+                self.writebacks += 1
+                victim = ((tags[slot] << self.set_bits) | set_index) << self.line_bits
+                latency += self._next_access(victim, True)
+        latency += self._next_access(address, False)
+        tags[slot] = tag
+        self.dirty[slot] = 1 if is_write else 0
+        self.stamps[slot] = self.clock
+        self.cycles += latency
+        return latency
+
+    def _next_access(self, address, is_write):
+        """Acesso ao nível seguinte (cache ou memória principal)."""
+        if self.next_level is None:
+            return self.memory_latency
+        return self.next_level.access(address, is_write)
+
+    def _victim(self, base):
+        """Escolhe a via a substituir no conjunto que começa em base."""
+        tags = self.tags
+        end = base + self.ways
+        for slot in range(base, end):
+            if tags[slot] < 0:
+                return slot
+        if self.policy == 'random':
+            return base + self.random.randrange(self.ways)
+        stamps = self.stamps
+        victim = base
+        for slot in range(base + 1, end):
+            if stamps[slot] < stamps[victim]:
+                victim = slot
+        return victim
+
+    # ==================== ESTATÍSTICAS ====================
+
+    def get_stats(self):
+        """Retorna contadores, taxa de faltas e AMAT."""
+        accesses = self.reads + self.writes
+        misses = self.read_misses + self.write_misses
+        return {
+            'name': self.name,
+            'config': f"{self.size}:{self.line_size}:{self.ways}:"
+                      f"{self.policy}:{self.write_policy}",
+            'reads': self.reads,
+            'writes': self.writes,
+            'hits': accesses - misses,
+            'misses': misses,
+            'read_misses': self.read_misses,
+            'write_misses': self.write_misses,
+            'evictions': self.evictions,
+            'writebacks': self.writebacks,
+            'miss_rate': (misses / accesses) if accesses else 0.0,
+            'amat': (self.cycles / accesses) if accesses else 0.0
+        }
+
+
+class CachePort:
+    """
+    Porta de acesso à memória através de uma cache.
+
+    Tem a interface de leitura/escrita da Memory: registra o acesso na
+    cache (latência em last_latency) e delega os dados à memória.
+    """
+
+    def __init__(self, memory, cache):
+        self.memory = memory
+        self.cache = cache
+        self.address_mask = memory.address_mask
+        self.last_latency = 0
+
+    def read(self, address):
+        """Lê palavra, contabilizando o acesso na cache."""
+        self.last_latency = self.cache.access(address & self.address_mask)
+        return self.memory.read(address)
+
+    def write(self, address, value):
+        """Escreve palavra, contabilizando o acesso na cache."""
+        self.last_latency = self.cache.access(address & self.address_mask, True)
+        self.memory.write(address, value)
+
+
+class CacheHierarchy:
+    """L1I e L1D separadas e L2 unificada opcional."""
+
+    def __init__(self, l1i=None, l1d=None, l2=None,
+                 memory_latency=MEMORY_LATENCY):
+        """
+        Args:
+            l1i, l1d, l2: instâncias de Cache (qualquer uma pode ser None)
+            memory_latency: ciclos de acesso à memória principal
+        """
+        self.l1i = l1i
+        self.l1d = l1d
+        self.l2 = l2
+        for cache in (l1i, l1d):
+            if cache is not None:
+                cache.next_level = l2
+        for cache in self.caches():
+            cache.memory_latency = memory_latency
+        self.memory_latency = memory_latency
+
+    def caches(self):
+        """Caches presentes, do nível mais próximo ao mais distante."""
+        return [c for c in (self.l1i, self.l1d, self.l2) if c is not None]
+
+    def instruction_cache(self):
+        """Primeiro nível visto pela busca de instruções (ou None)."""
+        return self.l1i or self.l2
+
+    def data_cache(self):
+        """Primeiro nível visto por LOAD/STORE (ou None)."""
+        return self.l1d or self.l2
+
+    def reset_stats(self):
+        """Zera contadores de todas as caches."""
+        for cache in self.caches():
+            cache.reset_stats()
+
+    def get_stats(self):
+        """Retorna {nome: estatísticas} de cada cache."""
+        return {cache.name: cache.get_stats() for cache in self.caches()}
+
+    def print_stats(self):
+        """Imprime tabela de acertos, faltas, substituições e AMAT."""
+        print(f"Hierarquia de caches (memória: {self.memory_latency} ciclos)")
+        print(f"  {'Cache':<5} {'Config':<20} {'Acessos':>9} {'Acertos':>9} "
+              f"{'Faltas':>8} {'Taxa':>7} {'Substit.':>8} {'WB':>6} {'AMAT':>7}")
+        for stats in self.get_stats().values():
+            accesses = stats['reads'] + stats['writes']
+            print(f"  {stats['name']:<5} {stats['config']:<20} {accesses:9d} "
+                  f"{stats['hits']:9d} {stats['misses']:8d} "
+                  f"{100 * stats['miss_rate']:6.2f}% {stats['evictions']:8d} "
+                  f"{stats['writebacks']:6d} {stats['amat']:7.2f}")
+
+
+# ==================== CONFIGURAÇÃO ====================
+
+def parse_cache_spec(text):
+    """
+    Converte 'TAMANHO:LINHA:VIAS[:POLÍTICA[:ESCRITA]]' em argumentos de
+    Cache (dicionário). ValueError se a especificação for inválida.
+    """
+    fields = text.split(':')
+    if not 1 <= len(fields) <= 5:
+        raise ValueError(f"Especificação de cache inválida: {text}")
+    try:
+        numbers = [int(field, 0) for field in fields[:3]]
+    except ValueError:
+        raise ValueError(f"Especificação de cache inválida: {text}")
+    spec = dict(zip(('size', 'line_size', 'ways'), numbers))
+    if len(fields) > 3:
+        spec['policy'] = fields[3].lower()
+    if len(fields) > 4:
+        spec['write_policy'] = fields[4].lower()
+    return spec
+
+
+def build_hierarchy(icache=None, dcache=None, l2=None,
+                    memory_latency=MEMORY_LATENCY):
+    """
+    Monta CacheHierarchy a partir de especificações textuais (ver
+    parse_cache_spec). Retorna None se nenhuma cache for pedida.
+    """
+    if not (icache or dcache or l2):
+        return None
+    l1i = Cache('L1I', **parse_cache_spec(icache)) if icache else None
+    l1d = Cache('L1D', **parse_cache_spec(dcache)) if dcache else None
+    l2_cache = (Cache('L2', hit_latency=L2_HIT_LATENCY, **parse_cache_spec(l2))
+                if l2 else None)
+    return CacheHierarchy(l1i, l1d, l2_cache, memory_latency)
@@ -0,0 +1,244 @@
+"""
+checkpoint.py - Checkpoint e Restauração do Estado da Máquina
+
+Salva o estado completo de um Simulator (registradores, PC, IR, flags,
+contadores, trap, registradores de estágio do pipeline, memória e
+breakpoints)
+num arquivo compacto e o restaura por cópia em bloco, sem reexecução.
+
+Formato:
+    Cabeçalho (8 bytes)
+        magic      4 bytes  b'URCK'
+        versão     u16      CHECKPOINT_VERSION
+        codec      u16      0: nenhum, 1: zlib, 2: lzma, 3: bz2
+    Carga (comprimida com o codec)
+        estado     campos de STATE (big-endian)
+        registradores, breakpoints
+        memória    apenas blocos não-zero de até CHUNK_WORDS palavras
+                   (endereço, tamanho, palavras); blocos zerados são omitidos
+"""
+
+import bz2
+import lzma
+import struct
+import zlib
+
+from utils import FLAGS_SUB, NUM_REGISTERS
+
+CHECKPOINT_MAGIC = b'URCK'
+CHECKPOINT_VERSION = 3
+
+HEADER = struct.Struct('>4sHH')
+
+# Estado escalar (big-endian)
+STATE = struct.Struct(
+    '>BQQ'     # bits de endereço da memória, cycle_counter, instruction_count
+    'BBBII'    # estágio atual, stage_counter, halted, PC, IR
+    '?IIQ'     # trap presente, endereço e instrução do trap, zero_divisions
+    'Bqqq'     # flags da CPU (estado preguiçoso, ver utils.evaluate_flags)
+    'BqqqI'    # flags da ALU e last_result
+    'IBBBB'    # fetch_address, opcode, ra, rb, rc
+    'III'      # const16, address, branch_offset
+    'IIII'     # val_a, val_b, val_c, alu_result
+    '?I?'      # write_enable, mem_data, is_halt_instruction
+)
+
+# Memória em blocos; blocos inteiramente zerados não são gravados
+CHUNK_WORDS = 256
+CHUNK = struct.Struct('>II')  # endereço, nº de palavras
+
+CODECS = {
+    'none': (0, None, None),
+    'zlib': (1, zlib.compress, zlib.decompress),
+    'lzma': (2, lzma.compress, lzma.decompress),
+    'bz2': (3, bz2.compress, bz2.decompress),
+}
+_CODEC_BY_ID = {codec_id: name for name, (codec_id, _, _) in CODECS.items()}
+
+STAGES = ('IF', 'ID', 'EX_MEM', 'WB')
+
+
+class CheckpointError(Exception):
+    """Exceção para checkpoints inválidos ou corrompidos."""
+    pass
+
+
+# ==================== GRAVAÇÃO ====================
+
+def encode_checkpoint(sim, codec='zlib'):
+    """Serializa o estado do simulador. Retorna bytes do checkpoint."""
+    if codec not in CODECS:
+        raise ValueError(f"Codec desconhecido: {codec}")
+    codec_id, compress, _ = CODECS[codec]
+
+    cpu = sim.cpu
+    alu = sim.alu
+    memory = sim.memory
+    state = STATE.pack(
+        memory.address_bits, sim.cycle_counter, sim.instruction_count,
+        STAGES.index(sim.current_stage), sim.stage_counter & 0xFF,
+        1 if sim.halted else 0, cpu.PC & 0xFFFFFFFF, cpu.IR,
+        sim.trap is not None, *(sim.trap or (0, 0)), alu.zero_divisions,
+        *cpu.flag_state,
+        *alu.flag_state, alu.last_result & 0xFFFFFFFF,
+        sim.fetch_address,
+        sim.opcode, sim.ra, sim.rb, sim.rc,
+        sim.const16, sim.address, sim.branch_offset,
+        sim.val_a, sim.val_b, sim.val_c, sim.alu_result,
+        bool(sim.write_enable), sim.mem_data, bool(sim.is_halt_instruction))
+
+    breakpoints = sorted(memory.breakpoints)
+    parts = [state,
+             struct.pack(f'>{NUM_REGISTERS}I', *cpu.regs),
+             struct.pack(f'>I{len(breakpoints)}I',
+                         len(breakpoints), *breakpoints)]
+
+    chunks = []
+    for start, block in memory.allocated_blocks():
+        for offset in range(0, len(block), CHUNK_WORDS):
+            words = block[offset:offset + CHUNK_WORDS]
+            if words.count(0) != len(words):
+                chunks.append(CHUNK.pack(start + offset, len(words)) +
+                              memory.to_bytes(start + offset, len(words)))
+    parts.append(struct.pack('>I', len(chunks)))
+    parts.extend(chunks)
+
+    payload = b''.join(parts)
+    if compress is not None:
+        payload = compress(payload)
+    return HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, codec_id) + payload
+
+
+def save_checkpoint(sim, filename, codec='zlib'):
+    """Grava checkpoint em arquivo. Retorna tamanho em bytes."""
+    data = encode_checkpoint(sim, codec)
+    with open(filename, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+# ==================== RESTAURAÇÃO ====================
+
+def is_checkpoint(filename):
+    """Verifica (pelo magic) se o arquivo é um checkpoint."""
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(CHECKPOINT_MAGIC)) == CHECKPOINT_MAGIC
+    except OSError:
+        return False
+
+
+def restore_checkpoint(sim, data):
+    """Restaura estado do simulador a partir dos bytes de um checkpoint."""
+    if len(data) < HEADER.size:
+        raise CheckpointError("Arquivo menor que o cabeçalho do checkpoint")
+    magic, version, codec_id = HEADER.unpack_from(data, 0)
+    if magic != CHECKPOINT_MAGIC:
+        raise CheckpointError("Magic inválido (não é checkpoint UFLA-RISC)")
+    if version != CHECKPOINT_VERSION:
+        raise CheckpointError(f"Versão de checkpoint não suportada: {version}")
+    if codec_id not in _CODEC_BY_ID:
+        raise CheckpointError(f"Codec desconhecido: {codec_id}")
+
+    payload = data[HEADER.size:]
+    decompress = CODECS[_CODEC_BY_ID[codec_id]][2]
+    try:
+        if decompress is not None:
+            payload = decompress(payload)
+        _restore_payload(sim, memoryview(payload))
+    except (struct.error, zlib.error, lzma.LZMAError, OSError, ValueError) as e:
+        raise CheckpointError(f"Checkpoint corrompido: {e}")
+
+
+def _restore_payload(sim, payload):
+    """
+    Aplica a carga descomprimida ao simulador. Tudo é lido e validado
+    antes da primeira alteração: um checkpoint inválido não deixa o
+    simulador meio sobrescrito.
+    """
+    (address_bits, cycles, instructions, stage, stage_counter, halted, pc, ir,
+     trapped, trap_address, trap_instruction, zero_divisions,
+     cpu_kind, cpu_x, cpu_y, cpu_z, alu_kind, alu_x, alu_y, alu_z, last_result,
+     fetch_address, opcode, ra, rb, rc,
+     const16, address, branch_offset,
+     val_a, val_b, val_c, alu_result,
+     write_enable, mem_data, is_halt) = STATE.unpack_from(payload, 0)
+    pos = STATE.size
+
+    regs = list(struct.unpack_from(f'>{NUM_REGISTERS}I', payload, pos))
+    pos += 4 * NUM_REGISTERS
+    (count,) = struct.unpack_from('>I', payload, pos)
+    breakpoints = struct.unpack_from(f'>{count}I', payload, pos + 4)
+    pos += 4 + 4 * count
+
+    memory = sim.memory
+    if address_bits != memory.address_bits:
+        raise CheckpointError(
+            f"Checkpoint de memória com {address_bits} bits de endereço "
+            f"(simulador: {memory.address_bits})")
+    if stage >= len(STAGES):
+        raise CheckpointError(f"Estágio inválido: {stage}")
+    if halted > 1:
+        raise CheckpointError(f"Indicador de parada inválido: {halted}")
+    if trapped and not halted:
+        raise CheckpointError("Trap registrado sem simulação parada")
+    if cpu_kind > FLAGS_SUB or alu_kind > FLAGS_SUB:
+        raise CheckpointError("Estado de flags inválido")
+    if any(b >= memory.size for b in breakpoints):
+        raise CheckpointError("Breakpoint fora da memória")
+
+    # Memória: valida todos os blocos antes de zerar e copiar
+    (count,) = struct.unpack_from('>I', payload, pos)
+    pos += 4
+    chunks = []
+    for _ in range(count):
+        start, length = CHUNK.unpack_from(payload, pos)
+        pos += CHUNK.size
+        if pos + 4 * length > len(payload):
+            raise CheckpointError("Memória truncada")
+        if start + length > memory.size:
+            raise CheckpointError(
+                f"Bloco de memória fora do espaço de endereços: {start:#x}")
+        chunks.append((start, payload[pos:pos + 4 * length]))
+        pos += 4 * length
+    if pos != len(payload):
+        raise CheckpointError("Dados extras após a memória")
+
+    memory.reset()
+    for start, raw in chunks:
+        memory.load_bytes(start, raw)
+    memory.set_breakpoints(breakpoints)
+
+    cpu = sim.cpu
+    cpu.regs[:] = regs
+    cpu.PC = pc
+    cpu.IR = ir
+    cpu.flag_state = (cpu_kind, cpu_x, cpu_y, cpu_z)
+
+    alu = sim.alu
+    alu.flag_state = (alu_kind, alu_x, alu_y, alu_z)
+    alu.last_result = last_result
+    alu.zero_divisions = zero_divisions
+
+    sim.cycle_counter = cycles
+    sim.instruction_count = instructions
+    sim.current_stage = STAGES[stage]
+    sim.stage_counter = stage_counter
+    sim.halted = bool(halted)
+    sim.trap = (trap_address, trap_instruction) if trapped else None
+    sim.fetch_address = fetch_address
+    sim.decoded = (sim.decoder.decode_compact(ir)
+                   if sim.current_stage in ('EX_MEM', 'WB') else None)
+    sim.opcode, sim.ra, sim.rb, sim.rc = opcode, ra, rb, rc
+    sim.const16, sim.address, sim.branch_offset = const16, address, branch_offset
+    sim.val_a, sim.val_b, sim.val_c = val_a, val_b, val_c
+    sim.alu_result = alu_result
+    sim.write_enable = write_enable
+    sim.mem_data = mem_data
+    sim.is_halt_instruction = is_halt
+
+
+def load_checkpoint(sim, filename):
+    """Restaura checkpoint de arquivo."""
+    with open(filename, 'rb') as f:
+        restore_checkpoint(sim, f.read())
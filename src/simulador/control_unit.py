@@ -5,10 +5,17 @@ Implementa instruções de controle de fluxo (desvios e saltos)
 
 """
 
+from utils import MASK32
+
 
 class ControlUnit:
-    def __init__(self, cpu):
+    def __init__(self, cpu, address_mask=0xFFFF, predictor=None):
         self.cpu = cpu  # Recebe instância CPUState para atualizar PC/r31
+        self.address_mask = address_mask  # Máscara do espaço de endereços
+        self.predictor = predictor  # Preditor de desvios (opcional)
+        self.last_branch_taken = None
+        # Previsão já usada pela busca do pipeline (None: prever na resolução)
+        self.prediction = None
 
     def beq(self, val_a, val_b, target_addr):
         """
@@ -27,10 +34,11 @@ class ControlUnit:
         # Validar endereço de branch (0-255)
         target_addr = target_addr & 0xFF
 
-        if val_a == val_b:
+        taken = val_a == val_b
+        self.resolve_branch(taken, target_addr)
+        if taken:
             self.cpu.set_pc(target_addr)
-            return True
-        return False
+        return taken
 
     def bne(self, val_a, val_b, target_addr):
         """
@@ -49,10 +57,11 @@ class ControlUnit:
         # Validar endereço de branch (0-255)
         target_addr = target_addr & 0xFF
 
-        if val_a != val_b:
+        taken = val_a != val_b
+        self.resolve_branch(taken, target_addr)
+        if taken:
             self.cpu.set_pc(target_addr)
-            return True
-        return False
+        return taken
 
     def jal(self, target_addr):
         """
@@ -88,8 +97,8 @@ class ControlUnit:
         Exemplo:
             JR R31  → PC = R31 (retorno de procedimento)
         """
-        # Extrair apenas os bits válidos de endereço (16 bits)
-        target_addr = reg_value & 0xFFFF
+        # Extrair apenas os bits válidos de endereço (16 bits por padrão)
+        target_addr = reg_value & self.address_mask
         self.cpu.set_pc(target_addr)
 
     def j(self, target_addr):
@@ -107,9 +116,29 @@ class ControlUnit:
         target_addr = target_addr & 0xFFFFFF
         self.cpu.set_pc(target_addr)
 
+    def resolve_branch(self, taken, target_addr, pc=None):
+        """
+        Registra o resultado de um desvio condicional e treina o preditor.
+
+        Args:
+            taken: True se o desvio foi tomado
+            target_addr: Endereço de destino do desvio
+            pc: Endereço do desvio (padrão: PC atual - 1, após o IF)
+        """
+        self.last_branch_taken = taken
+        if self.predictor is not None:
+            if pc is None:
+                pc = (self.cpu.PC - 1) & MASK32
+            if self.prediction is None:
+                # Execução funcional: previsão processada em lote
+                self.predictor.record(pc, taken, target_addr)
+            else:
+                self.predictor.update(pc, taken, target_addr, self.prediction)
+                self.prediction = None
+
     def get_branch_taken(self):
         """
         Retorna True se o último branch foi tomado.
         Útil para estatísticas de branch prediction.
         """
-        pass
+        return self.last_branch_taken
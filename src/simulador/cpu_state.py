@@ -5,8 +5,11 @@ Encapsula o estado interno da CPU (registradores, flags, PC, IR)
 e fornece operações para leitura/escrita segura.
 """
 
-from utils import (MASK32, NUM_REGISTERS, clamp_register, create_flags_dict,
-                   flags_to_string, is_valid_register, to_s32, to_u32)
+from utils import (FLAGS_CLEAR, MASK32, NUM_REGISTERS, clamp_register,
+                   create_flags_dict, evaluate_flags, flags_to_string,
+                   is_valid_register, lazy_flag_property, to_s32, to_u32)
+
+from journal import KIND_FLAGS, KIND_IR, KIND_PC, KIND_REG
 
 
 class CPUState:
@@ -17,10 +20,13 @@ class CPUState:
         self.regs = [0] * NUM_REGISTERS
         self.PC = 0
         self.IR = 0
-        self.neg = 0
-        self.zero = 0
-        self.carry = 0
-        self.overflow = 0
+        # Flags avaliados sob demanda: flag_state guarda a última operação
+        # (ver utils.evaluate_flags) e neg/zero/carry/overflow a materializam
+        self.flag_state = FLAGS_CLEAR
+        self._evaluated_state = None
+        self._flag_values = (0, 0, 0, 0)
+        # Diário de alterações (opcional, ver journal.ChangeJournal)
+        self.journal = None
 
     # ==================== REGISTRADORES ====================
 
@@ -35,6 +41,8 @@ class CPUState:
         value = to_u32(value)
 
         if reg_idx != 0:  # R0 é sempre 0
+            if self.journal is not None:
+                self.journal.record(KIND_REG, reg_idx, self.regs[reg_idx], value)
             self.regs[reg_idx] = value
 
     def read_register_signed(self, reg_idx):
@@ -45,11 +53,14 @@ class CPUState:
 
     def increment_pc(self):
         """Incrementa PC (sem carry para memória)."""
-        self.PC = to_u32(self.PC + 1)
+        self.set_pc(self.PC + 1)
 
     def set_pc(self, value):
         """Define novo valor para PC."""
-        self.PC = to_u32(value)
+        value = to_u32(value)
+        if self.journal is not None:
+            self.journal.record(KIND_PC, 0, self.PC, value)
+        self.PC = value
 
     def get_pc(self):
         """Retorna valor atual de PC."""
@@ -59,7 +70,10 @@ class CPUState:
 
     def set_ir(self, instruction):
         """Define nova instrução em IR."""
-        self.IR = to_u32(instruction)
+        instruction = to_u32(instruction)
+        if self.journal is not None:
+            self.journal.record(KIND_IR, 0, self.IR, instruction)
+        self.IR = instruction
 
     def get_ir(self):
         """Retorna instrução atual em IR."""
@@ -67,6 +81,25 @@ class CPUState:
 
     # ==================== FLAGS ====================
 
+    neg = lazy_flag_property(0, "Flag N (materializado sob demanda).")
+    zero = lazy_flag_property(1, "Flag Z (materializado sob demanda).")
+    carry = lazy_flag_property(2, "Flag C (materializado sob demanda).")
+    overflow = lazy_flag_property(3, "Flag V (materializado sob demanda).")
+
+    def get_flag_values(self):
+        """Retorna tupla (neg, zero, carry, overflow), calculando se preciso."""
+        state = self.flag_state
+        if state is not self._evaluated_state:
+            self._flag_values = evaluate_flags(state)
+            self._evaluated_state = state
+        return self._flag_values
+
+    def set_flag_state(self, state):
+        """Registra estado de flags preguiçoso (ex.: copiado da ALU)."""
+        if self.journal is not None:
+            self.journal.record(KIND_FLAGS, 0, self.flag_state, state)
+        self.flag_state = state
+
     def set_flags(self, neg=None, zero=None, carry=None, overflow=None):
         """Atualiza flags seletivamente."""
         if neg is not None:
@@ -80,11 +113,11 @@ class CPUState:
 
     def clear_flags(self):
         """Zera todos os flags."""
-        self.neg = self.zero = self.carry = self.overflow = 0
+        self.set_flag_state(FLAGS_CLEAR)
 
     def get_flags_dict(self):
         """Retorna flags como dicionário."""
-        return create_flags_dict(self.neg, self.zero, self.carry, self.overflow)
+        return create_flags_dict(*self.get_flag_values())
 
     def get_flags_string(self):
         """Retorna flags como string legível."""
@@ -101,10 +134,18 @@ class CPUState:
             'flags': self.get_flags_dict()
         }
 
+    def changes_since(self, mark=0):
+        """
+        Retorna diferenças registradas no diário desde mark, no formato de
+        compare_with, em O(alterações). Requer diário ativo.
+        """
+        return self.journal.summarize(mark)
+
     def compare_with(self, other_snapshot):
         """
         Compara estado atual com snapshot anterior.
         Retorna dicionário com diferenças.
+        Com diário ativo, prefira changes_since (não varre todo o estado).
         """
         changes = {
             'registers': [],
@@ -147,9 +188,13 @@ class CPUState:
 
     def reset(self):
         """Reseta CPU para estado inicial."""
+        if self.journal is not None:
+            for i in range(NUM_REGISTERS):
+                if self.regs[i] != 0:
+                    self.journal.record(KIND_REG, i, self.regs[i], 0)
         self.regs = [0] * NUM_REGISTERS
-        self.PC = 0
-        self.IR = 0
+        self.set_pc(0)
+        self.set_ir(0)
         self.clear_flags()
 
     # ==================== EXIBIÇÃO ====================
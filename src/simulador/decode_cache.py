@@ -0,0 +1,67 @@
+"""
+decode_cache.py - Cache de Pré-decodificação
+
+Guarda, por endereço de memória, a forma compacta de cada instrução já
+decodificada. A memória notifica o cache a cada escrita, de modo que
+código auto-modificável continua correto.
+"""
+
+from utils import MEMORY_SIZE
+
+
+class DecodeCache:
+    """Cache de instruções pré-decodificadas indexado por endereço."""
+
+    def __init__(self, decoder, size=MEMORY_SIZE):
+        """Inicializa cache vazio (size: nº de palavras da memória)."""
+        self.decoder = decoder
+        self.size = size
+        self.entries = {}
+        self.misses = 0
+        self.invalidations = 0
+
+    # ==================== CONSULTA ====================
+
+    def lookup(self, address, instruction):
+        """
+        Retorna a instrução decodificada do endereço.
+        Decodifica e armazena apenas na primeira busca.
+        """
+        entry = self.entries.get(address)
+        if entry is None:
+            entry = self.decoder.decode_compact(instruction)
+            self.entries[address] = entry
+            self.misses += 1
+        return entry
+
+    # ==================== INVALIDAÇÃO ====================
+
+    def invalidate(self, address):
+        """Descarta entrada de um endereço escrito."""
+        if self.entries.pop(address, None) is not None:
+            self.invalidations += 1
+
+    def invalidate_range(self, start_address, count):
+        """Descarta entradas de um bloco de endereços (com wrap-around)."""
+        if count >= len(self.entries):
+            stale = [addr for addr in self.entries
+                     if (addr - start_address) % self.size < count]
+        else:
+            stale = [(start_address + i) % self.size for i in range(count)]
+        for addr in stale:
+            self.invalidate(addr)
+
+    def invalidate_all(self):
+        """Descarta todo o cache."""
+        self.invalidations += len(self.entries)
+        self.entries.clear()
+
+    # ==================== ESTATÍSTICAS ====================
+
+    def get_stats(self):
+        """Retorna estatísticas do cache."""
+        return {
+            'entries': len(self.entries),
+            'misses': self.misses,
+            'invalidations': self.invalidations
+        }
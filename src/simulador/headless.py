@@ -0,0 +1,208 @@
+"""
+headless.py - Execução Embutida (sem Console)
+
+API para usar o simulador a partir de outros programas Python: carrega um
+programa de um caminho ou de bytes (texto com instruções binárias ou
+imagem empacotada), executa com limites de ciclos, instruções e tempo e
+devolve um RunResult. Nada é impresso: avisos de carga e divisões por
+zero ficam no resultado.
+
+    from headless import run_program
+    result = run_program('binarios/fatorial.bin', registers={1: 10},
+                         max_instructions=10**6, timeout=2.0)
+    result.stop.kind, result.registers[2], result.memory[0x100:0x110]
+"""
+
+import time
+
+from breakpoints import STOP_HALT
+from memory import Memory
+from paged_memory import PagedMemory
+from program_image import IMAGE_MAGIC, load_image_buffer
+from simulador import Simulator
+from text_loader import ParsedImageCache, parse_text_program
+from utils import ADDRESS_BITS, MASK32, MAX_ADDRESS_BITS
+
+
+class ProgramError(ValueError):
+    """Programa vazio ou em formato inválido."""
+    pass
+
+
+# ==================== CARGA ====================
+
+def load_program(memory, program, use_cache=False):
+    """
+    Carrega programa na memória.
+
+    Args:
+        program: caminho do arquivo ou conteúdo (bytes); imagens
+                 empacotadas são reconhecidas pelo magic
+        use_cache: reaproveita o texto já analisado de um caminho (ver
+                   text_loader.ParsedImageCache)
+
+    Retorna: (palavras carregadas, entrada ou None, avisos)
+        avisos: lista de (número_da_linha, mensagem) do formato texto
+    """
+    cache = None
+    if isinstance(program, (bytes, bytearray, memoryview)):
+        content = bytes(program)
+    else:
+        with open(program, 'rb') as f:
+            content = f.read()
+        if use_cache:
+            cache = ParsedImageCache()
+
+    if content[:len(IMAGE_MAGIC)] == IMAGE_MAGIC:
+        try:
+            info = load_image_buffer(memory, content)
+        except Exception as e:
+            raise ProgramError(f"Imagem inválida: {e}") from e
+        return info.words, info.entry, []
+
+    cached = cache.lookup(program, content) if cache else None
+    if cached is not None:
+        return load_image_buffer(memory, cached).words, None, []
+    try:
+        text = content.decode('utf-8')
+    except UnicodeDecodeError as e:
+        raise ProgramError("Programa não é texto nem imagem empacotada") from e
+    segments, warnings = parse_text_program(text)
+    count = 0
+    for address, words in segments:
+        memory.write_block(address, words)
+        count += len(words)
+    # Apenas arquivos sem avisos vão para o cache (avisos reaparecem)
+    if cache and not warnings:
+        cache.store(program, content, segments)
+    return count, None, warnings
+
+
+def create_simulator(program, mode=Simulator.MODE_FAST, address_bits=None,
+                     paged=False, registers=None, memory_words=None,
+                     **options):
+    """
+    Cria Simulator com o programa carregado e o estado inicial aplicado.
+
+    Args:
+        program: ver load_program(); None não carrega nada (ex.: para
+                 restaurar um checkpoint)
+        mode: modo de execução (ver Simulator.MODES; padrão: 'fast')
+        address_bits: bits de endereço (padrão: 16; 24 com paged)
+        paged: usa PagedMemory (espaço esparso)
+        registers: {registrador: valor} iniciais
+        memory_words: {endereço: valor} escritos após a carga
+        options: demais argumentos de Simulator (verbose, predictor,
+                 caches, profile, trace...)
+
+    Retorna: (Simulator, avisos de carga)
+    """
+    if paged:
+        memory = PagedMemory(address_bits or MAX_ADDRESS_BITS)
+    else:
+        memory = Memory(address_bits or ADDRESS_BITS)
+    sim = Simulator(mode=mode, memory=memory, **options)
+
+    warnings = []
+    if program is not None:
+        count, entry, warnings = load_program(memory, program)
+        if count == 0:
+            raise ProgramError("Nenhuma instrução carregada")
+        if entry is not None:
+            sim.cpu.set_pc(entry)
+    for reg, value in (registers or {}).items():
+        if not 0 < reg < 32:
+            raise ValueError(f"Registrador inválido: R{reg}")
+        sim.cpu.write_register(reg, value & MASK32)
+    for address, value in (memory_words or {}).items():
+        memory.write(address, value & MASK32)
+    return sim, warnings
+
+
+# ==================== RESULTADO ====================
+
+class MemoryReader:
+    """Acesso somente leitura à memória final: reader[a] ou reader[a:b]."""
+
+    def __init__(self, memory):
+        self._memory = memory
+        self.size = memory.size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.size)
+            if step != 1:
+                return [self._memory.read(a) for a in range(start, stop, step)]
+            return list(self._memory.read_block(start, max(0, stop - start)))
+        if not 0 <= key < self.size:
+            raise IndexError(f"Endereço fora da memória: {key}")
+        return self._memory.read(key)
+
+    def non_zero(self):
+        """Lista de (endereço, valor) das posições não-zero."""
+        return [(start + i, value)
+                for start, block in self._memory.allocated_blocks()
+                for i, value in enumerate(block) if value]
+
+
+class RunResult:
+    """Resultado de run(): motivo de parada, contadores e estado final."""
+
+    def __init__(self, sim, stop, elapsed, warnings=()):
+        self.simulator = sim
+        self.stop = stop                      # StopReason (breakpoints.py)
+        self.cycles = sim.cycle_counter
+        self.instructions = sim.instruction_count
+        self.elapsed = elapsed                # segundos de relógio
+        self.pc = sim.cpu.PC & sim.address_mask
+        self.registers = list(sim.cpu.regs)
+        self.flags = sim.cpu.get_flags_dict()
+        self.memory = MemoryReader(sim.memory)
+        self.trap = sim.trap                  # (endereço, instrução) ou None
+        self.zero_divisions = sim.alu.zero_divisions
+        self.warnings = list(warnings)        # (linha, mensagem) da carga
+
+    @property
+    def halted(self):
+        """True se o programa terminou por HALT."""
+        return self.stop.kind == STOP_HALT
+
+    def __repr__(self):
+        return (f"RunResult({self.stop.kind!r}, cycles={self.cycles}, "
+                f"instructions={self.instructions})")
+
+
+# ==================== EXECUÇÃO ====================
+
+def run(sim, max_cycles=100000, max_instructions=None, timeout=None,
+        resume=False, warnings=()):
+    """
+    Executa um Simulator já preparado (ver Simulator.execute) e devolve
+    RunResult. Com resume=True continua de onde parou.
+    """
+    start = time.perf_counter()
+    stop = sim.execute(max_cycles, resume, max_instructions, timeout)
+    return RunResult(sim, stop, time.perf_counter() - start, warnings)
+
+
+def run_program(program, max_cycles=100000, max_instructions=None,
+                timeout=None, mode=Simulator.MODE_FAST, address_bits=None,
+                paged=False, registers=None, memory_words=None):
+    """
+    Carrega e executa um programa (caminho ou bytes) sem imprimir nada.
+
+    Args:
+        max_cycles: limite de ciclos (None: sem limite)
+        max_instructions: limite de instruções (None: sem limite)
+        timeout: limite de tempo de relógio em segundos (None: sem limite)
+        demais: ver create_simulator()
+
+    Retorna: RunResult
+    """
+    sim, warnings = create_simulator(program, mode, address_bits, paged,
+                                     registers, memory_words)
+    return run(sim, max_cycles, max_instructions, timeout,
+               warnings=warnings)
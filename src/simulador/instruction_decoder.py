@@ -5,8 +5,16 @@ Extrai e interpreta campos de instruções UFLA-RISC.
 Define mapeamento de opcodes e tipos de instrução.
 """
 
+from collections import namedtuple
+
 from utils import MASK8, MASK16, to_u32
 
+# Forma compacta de uma instrução decodificada (sem mnemônico/tipo)
+DecodedInstruction = namedtuple(
+    'DecodedInstruction',
+    ['raw', 'opcode', 'ra', 'rb', 'rc', 'const16', 'address', 'branch_offset']
+)
+
 
 class InstructionDecoder:
     """Decodificador de instruções UFLA-RISC."""
@@ -118,6 +126,23 @@ class InstructionDecoder:
             'mnemonic': self.get_mnemonic(opcode)
         }
 
+    def decode_compact(self, instruction):
+        """
+        Decodifica instrução para a forma compacta (DecodedInstruction).
+        Usada pelo cache de pré-decodificação.
+        """
+        instruction = to_u32(instruction)
+        return DecodedInstruction(
+            instruction,
+            (instruction >> 24) & MASK8,
+            (instruction >> 16) & MASK8,
+            (instruction >> 8) & MASK8,
+            instruction & MASK8,
+            (instruction >> 8) & MASK16,
+            instruction & 0xFFFFFF,
+            instruction & 0xFF
+        )
+
     # ==================== EXTRAÇÃO DE CAMPOS ====================
 
     def extract_opcode(self, instruction):
@@ -199,6 +224,9 @@ class InstructionDecoder:
 
     def format_instruction(self, decoded_instr):
         """Formata instrução decodificada para exibição."""
+        if isinstance(decoded_instr, DecodedInstruction):
+            decoded_instr = self.decode(decoded_instr.raw)
+
         op = decoded_instr['opcode']
         ra = decoded_instr['ra']
         rb = decoded_instr['rb']
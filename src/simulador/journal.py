@@ -0,0 +1,131 @@
+"""
+journal.py - Diário de Alterações de Estado
+
+Registra escritas em registradores, PC, IR, flags e memória como entradas
+compactas (tipo, índice, valor antigo, valor novo) num buffer reutilizável.
+Diferenças por ciclo ou por instrução custam O(alterações), sem snapshots.
+"""
+
+from utils import evaluate_flags
+
+# Tipos de entrada
+KIND_REG = 0     # índice = registrador
+KIND_PC = 1
+KIND_IR = 2
+KIND_FLAGS = 3   # valores = estados de flags (ver utils.evaluate_flags)
+KIND_MEM = 4     # índice = endereço
+
+KIND_NAMES = {
+    KIND_REG: 'reg', KIND_PC: 'pc', KIND_IR: 'ir',
+    KIND_FLAGS: 'flags', KIND_MEM: 'mem'
+}
+
+FLAG_NAMES = ('neg', 'zero', 'carry', 'overflow')
+
+# Campos por entrada no buffer plano
+ENTRY_SIZE = 4
+
+
+class ChangeJournal:
+    """Buffer plano de alterações de estado."""
+
+    def __init__(self):
+        """Inicializa diário vazio."""
+        self.buffer = []
+
+    # ==================== REGISTRO ====================
+
+    def record(self, kind, index, old, new):
+        """Acrescenta uma alteração ao diário."""
+        self.buffer += (kind, index, old, new)
+
+    def mark(self):
+        """Retorna posição atual (para consultar alterações posteriores)."""
+        return len(self.buffer)
+
+    def clear(self):
+        """Esvazia o diário mantendo o mesmo buffer."""
+        del self.buffer[:]
+
+    def truncate(self, mark):
+        """Descarta alterações registradas depois de mark."""
+        del self.buffer[mark:]
+
+    def __len__(self):
+        """Número de entradas registradas."""
+        return len(self.buffer) // ENTRY_SIZE
+
+    # ==================== CONSULTA ====================
+
+    def entries(self, start=0):
+        """Itera entradas (tipo, índice, antigo, novo) a partir de start."""
+        buf = self.buffer
+        for pos in range(start, len(buf), ENTRY_SIZE):
+            yield buf[pos], buf[pos + 1], buf[pos + 2], buf[pos + 3]
+
+    def entries_of(self, kind, start=0):
+        """Itera entradas de um único tipo a partir de start."""
+        buf = self.buffer
+        for pos in range(start, len(buf), ENTRY_SIZE):
+            if buf[pos] == kind:
+                yield buf[pos + 1], buf[pos + 2], buf[pos + 3]
+
+    def summarize(self, start=0):
+        """
+        Resume alterações a partir de start no mesmo formato de
+        CPUState.compare_with, acrescido da chave 'memory'.
+        Várias escritas no mesmo destino são combinadas (primeiro valor
+        antigo, último valor novo); destinos sem mudança líquida são omitidos.
+        """
+        regs = {}
+        mem = {}
+        pc = ir = flags = None
+
+        for kind, index, old, new in self.entries(start):
+            if kind == KIND_REG:
+                regs[index] = (regs[index][0] if index in regs else old, new)
+            elif kind == KIND_MEM:
+                mem[index] = (mem[index][0] if index in mem else old, new)
+            elif kind == KIND_PC:
+                pc = (pc[0] if pc else old, new)
+            elif kind == KIND_IR:
+                ir = (ir[0] if ir else old, new)
+            elif kind == KIND_FLAGS:
+                flags = (flags[0] if flags else old, new)
+
+        changes = {
+            'registers': [],
+            'pc_changed': False,
+            'ir_changed': False,
+            'flags_changed': {},
+            'memory': []
+        }
+
+        for index in sorted(regs):
+            old, new = regs[index]
+            if old != new:
+                changes['registers'].append(
+                    {'index': index, 'old': old, 'new': new})
+
+        for address in sorted(mem):
+            old, new = mem[address]
+            if old != new:
+                changes['memory'].append(
+                    {'address': address, 'old': old, 'new': new})
+
+        if pc and pc[0] != pc[1]:
+            changes['pc_changed'] = True
+            changes['pc_old'], changes['pc_new'] = pc
+
+        if ir and ir[0] != ir[1]:
+            changes['ir_changed'] = True
+            changes['ir_old'], changes['ir_new'] = ir
+
+        if flags:
+            old_values = evaluate_flags(flags[0])
+            new_values = evaluate_flags(flags[1])
+            for name, old, new in zip(FLAG_NAMES, old_values, new_values):
+                if old != new:
+                    changes['flags_changed'][name] = {'old': old, 'new': new}
+
+        return changes
@@ -3,9 +3,25 @@ main.py - Interface de linha de comando OTIMIZADA
 
 """
 
+import os
 import sys
 
-from simulator import Simulator
+from breakpoints import STOP_INSTRUCTIONS, STOP_TIMEOUT
+from branch_predictor import DEFAULT_INDEX_BITS, PREDICTORS, create_predictor
+from cache import MEMORY_LATENCY, build_hierarchy
+from checkpoint import CheckpointError, is_checkpoint
+from headless import ProgramError, create_simulator, load_program, run
+from reverse import DEFAULT_BUDGET, DEFAULT_INTERVAL
+from simulador import Simulator
+from text_loader import ParsedImageCache
+
+
+def get_option(names, default=None):
+    """Retorna o valor que segue uma das opções em sys.argv."""
+    for i, arg in enumerate(sys.argv[:-1]):
+        if arg in names:
+            return sys.argv[i + 1]
+    return default
 
 
 def main():
@@ -14,32 +30,186 @@ def main():
         print("=" * 70)
         print("SIMULADOR UFLA-RISC")
         print("=" * 70)
-        print("Uso: python main.py <arquivo_binario> [--verbose]")
+        print("Uso: python main.py <arquivo_binario> [--verbose] [--fast | --translate]")
         print("\nExemplos:")
         print("  python main.py binarios/programa.bin")
         print("  python main.py binarios/programa.bin --verbose")
         print("\nOpções:")
         print("  --verbose, -v : Mostra todos os ciclos (padrão: apenas resumo)")
+        print("  --fast, -f    : Executa uma instrução por iteração (modo silencioso)")
+        print("  --translate, -t : Traduz blocos básicos quentes para Python (modo silencioso)")
+        print("  --pipeline, -p  : Pipeline sobreposto com hazards (CPI realista)")
+        print("  --no-forwarding : Desativa forwarding no modo --pipeline")
+        print(f"  --predictor NOME: Preditor de desvios ({', '.join(PREDICTORS)})")
+        print(f"  --predictor-bits N: Bits do PC nas tabelas do preditor (padrão: {DEFAULT_INDEX_BITS})")
+        print("  --icache ESPEC  : Cache L1 de instruções (TAMANHO:LINHA:VIAS[:lru|fifo|random[:wb|wt]])")
+        print("  --dcache ESPEC  : Cache L1 de dados (mesmo formato)")
+        print("  --l2 ESPEC      : Cache L2 unificada (mesmo formato)")
+        print(f"  --mem-latency N : Ciclos de acesso à memória principal (padrão: {MEMORY_LATENCY})")
+        print("  --max-cycles N  : Limite de ciclos desta execução (padrão: 100000; 0: sem limite)")
+        print("  --max-instructions N: Limite de instruções desta execução")
+        print("  --timeout S     : Limite de tempo de relógio em segundos")
+        print("  --profile       : Perfil por PC, opcode, bloco básico e função")
+        print("  --flamegraph ARQ: Grava pilhas colapsadas do perfil (implica --profile)")
+        print("  --trace ARQ     : Grava rastro binário por instrução (ver ferramentas/rastro.py)")
+        print("  --break ENDS    : Para antes do(s) PC(s) (ex.: 12,0x40)")
+        print("  --watch INTERV  : Para após LOAD/STORE no intervalo (INICIO[:FIM][/r|w|rw], vírgulas)")
+        print("  --history       : Grava histórico para execução reversa")
+        print(f"  --history-interval N: Instruções entre checkpoints do histórico (padrão: {DEFAULT_INTERVAL})")
+        print(f"  --history-mb N  : Orçamento de memória do histórico em MB (padrão: {DEFAULT_BUDGET >> 20})")
+        print("  --reverse-steps N: Após parar, volta N instruções (implica --history)")
+        print("  --reverse-continue: Após parar, volta até o breakpoint/escrita observada anterior")
+        print("  --run-to-cycle K: Após parar, vai ao ciclo K (para trás ou para frente)")
+        print("  --checkpoint ARQ: Salva o estado da máquina ao final")
+        print("  --paged         : Memória paginada esparsa (padrão: 24 bits de endereço)")
+        print("  --address-bits N: Bits de endereço de palavra (1 a 24; padrão: 16)")
+        print(f"  --text-cache    : Guarda o formato texto já analisado em disco (ou ${ParsedImageCache.ENV_DIR})")
+        print("\nUm checkpoint salvo pode ser passado no lugar do binário para")
+        print("continuar a simulação de onde parou.")
         print("=" * 70)
         exit(1)
 
     # Processar argumentos
     input_file = sys.argv[1]
     verbose = '--verbose' in sys.argv or '-v' in sys.argv
+    fast = '--fast' in sys.argv or '-f' in sys.argv
+    translate = '--translate' in sys.argv or '-t' in sys.argv
+    pipeline = '--pipeline' in sys.argv or '-p' in sys.argv
+    forwarding = '--no-forwarding' not in sys.argv
+    max_cycles = int(get_option(('--max-cycles',), 100000)) or None
+    max_instructions = get_option(('--max-instructions',))
+    if max_instructions is not None:
+        max_instructions = int(max_instructions)
+    timeout = get_option(('--timeout',))
+    if timeout is not None:
+        timeout = float(timeout)
+    checkpoint_file = get_option(('--checkpoint',))
+    paged = '--paged' in sys.argv
+    text_cache = ('--text-cache' in sys.argv or
+                  ParsedImageCache.ENV_DIR in os.environ)
+    address_bits = get_option(('--address-bits',))
+    predictor_name = get_option(('--predictor',))
+    predictor_bits = int(get_option(('--predictor-bits',), DEFAULT_INDEX_BITS))
+    icache = get_option(('--icache',))
+    dcache = get_option(('--dcache',))
+    l2 = get_option(('--l2',))
+    memory_latency = int(get_option(('--mem-latency',), MEMORY_LATENCY))
+    flamegraph_file = get_option(('--flamegraph',))
+    profile = '--profile' in sys.argv or flamegraph_file is not None
+    trace_file = get_option(('--trace',))
+    breakpoints = get_option(('--break',))
+    watchpoints = get_option(('--watch',))
+    reverse_steps = get_option(('--reverse-steps',))
+    reverse_continue = '--reverse-continue' in sys.argv
+    run_to_cycle = get_option(('--run-to-cycle',))
+    history = ('--history' in sys.argv or reverse_steps is not None or
+               reverse_continue or run_to_cycle is not None)
 
-    # Criar simulador com modo verboso
-    sim = Simulator(verbose=verbose)
+    # Criar simulador (ver headless.py)
+    mode = Simulator.MODE_STAGED
+    if pipeline:
+        mode = Simulator.MODE_PIPELINE
+    elif translate:
+        mode = Simulator.MODE_TRANSLATE
+    elif fast:
+        mode = Simulator.MODE_FAST
+    try:
+        predictor = None
+        if predictor_name:
+            predictor = create_predictor(predictor_name, predictor_bits)
+        caches = build_hierarchy(icache, dcache, l2, memory_latency)
+        sim, _ = create_simulator(
+            None, mode, int(address_bits) if address_bits else None, paged,
+            verbose=verbose, forwarding=forwarding, predictor=predictor,
+            caches=caches, profile=profile, trace=trace_file)
+        for address in (breakpoints.split(',') if breakpoints else []):
+            sim.add_breakpoint(int(address, 0))
+        for spec in (watchpoints.split(',') if watchpoints else []):
+            interval, _, kind = spec.partition('/')
+            start, _, end = interval.partition(':')
+            sim.add_watchpoint(int(start, 0), int(end, 0) if end else None,
+                               kind or 'rw')
+        if history:
+            sim.enable_reverse(
+                int(get_option(('--history-interval',), DEFAULT_INTERVAL)),
+                int(get_option(('--history-mb',), DEFAULT_BUDGET >> 20)) << 20)
+    except (ValueError, OSError) as e:
+        print(f"❌ {e}")
+        exit(1)
 
-    # Carregar programa
+    # Carregar programa (imagem empacotada e checkpoint pelo magic)
     print(f"Carregando programa: {input_file}")
-    instr_count = sim.memory.load_program_from_text(input_file)
+    resume = is_checkpoint(input_file)
+    warnings = []
+    if resume:
+        try:
+            sim.restore_checkpoint(input_file)
+        except CheckpointError as e:
+            print(f"❌ Erro ao restaurar checkpoint: {e}")
+            exit(1)
+        print(f"✓ Checkpoint restaurado: ciclo {sim.cycle_counter}, "
+              f"{sim.instruction_count} instruções")
+        if max_cycles is not None:
+            max_cycles += sim.cycle_counter
+        if max_instructions is not None:
+            max_instructions += sim.instruction_count
+    else:
+        try:
+            count, entry, warnings = load_program(sim.memory, input_file,
+                                                  use_cache=text_cache)
+        except FileNotFoundError:
+            print(f"❌ Erro: Arquivo '{input_file}' não encontrado")
+            exit(1)
+        except (ProgramError, OSError) as e:
+            print(f"❌ {e}")
+            exit(1)
+        for line_num, message in warnings:
+            print(f"⚠️  Linha {line_num}: {message}")
+        if count == 0:
+            print("❌ Nenhuma instrução carregada. Encerrando.")
+            exit(1)
+        if entry is not None:
+            sim.cpu.set_pc(entry)
+        print(f"✓ Programa carregado: {count} instruções")
 
-    if instr_count == 0:
-        print("❌ Nenhuma instrução carregada. Encerrando.")
+    # Executar simulação
+    sim.print_header()
+    zero_divisions = sim.alu.zero_divisions
+    try:
+        result = run(sim, max_cycles, max_instructions, timeout, resume,
+                     warnings)
+    except ValueError as e:
+        print(f"❌ {e}")
         exit(1)
+    sim.print_summary(result.zero_divisions - zero_divisions)
+    stop = result.stop
+    if stop.is_debug_stop() or stop.kind in (STOP_INSTRUCTIONS, STOP_TIMEOUT):
+        print(f"\n⏸️  Parada: {stop.describe()}")
 
-    # Executar simulação
-    sim.run()
+    # Execução reversa a partir do ponto de parada
+    if sim.reverse is not None:
+        reverse = sim.reverse
+        if reverse_steps is not None:
+            stop = reverse.reverse_step(int(reverse_steps))
+            print(f"⏪ Voltou {reverse_steps} instrução(ões): {stop.describe()}")
+        if reverse_continue:
+            stop = reverse.reverse_continue()
+            print(f"⏪ Execução reversa: {stop.describe()}")
+        if run_to_cycle is not None:
+            stop = reverse.run_to_cycle(int(run_to_cycle))
+            print(f"⏩ Ciclo {run_to_cycle}: {stop.describe()}")
+        reverse.print_stats()
+
+    if sim.tracer is not None:
+        sim.tracer.close()
+
+    if flamegraph_file:
+        lines = sim.profiler.write_collapsed(flamegraph_file)
+        print(f"✓ Pilhas colapsadas salvas: {flamegraph_file} ({lines} pilhas)")
+
+    if checkpoint_file:
+        size = sim.save_checkpoint(checkpoint_file)
+        print(f"✓ Checkpoint salvo: {checkpoint_file} ({size} bytes)")
 
     # Mostrar estado final
     print("\n" + "="*70)
@@ -58,5 +228,45 @@ def main():
 
 # Modo debug completo
 # python main.py binarios/teste.bin --verbose
+
+# Modo rápido (lotes)
+# python main.py binarios/teste.bin --fast
+
+# Estimar desempenho com pipeline sobreposto (com e sem forwarding)
+# python main.py binarios/teste.bin --pipeline
+# python main.py binarios/teste.bin --pipeline --no-forwarding
+
+# Comparar preditores de desvio (acurácia, MPKI, desvios com mais erros)
+# python main.py binarios/teste.bin --pipeline --predictor gshare
+
+# Caches L1 separadas (256 palavras, linhas de 4, 2 vias) e L2 unificada
+# python main.py binarios/teste.bin --pipeline --icache 256:4:2 --dcache 256:4:2:lru:wb --l2 4096:8:4
+
+# Onde o programa gasta ciclos (pontos quentes, blocos, funções) e
+# pilhas para flamegraph.pl / speedscope
+# python main.py binarios/teste.bin --fast --profile
+# python main.py binarios/teste.bin --fast --flamegraph pilhas.txt
+
+# Rastro binário (~20-30% acima de --fast) e leitura offline
+# python main.py binarios/teste.bin --fast --trace execucao.trace
+# python ../ferramentas/rastro.py execucao.trace --opcode store --limit 20
+
+# Parar no PC 12 ou após escrita em 0x100..0x1ff (salvar e continuar depois)
+# python main.py binarios/teste.bin --fast --break 12 --watch 0x100:0x1ff/w --checkpoint parada.ckpt
+
+# Voltar no tempo: parar no breakpoint, recuar 3 instruções e ir ao ciclo 400
+# python main.py binarios/teste.bin --fast --break 12 --reverse-steps 3
+# python main.py binarios/teste.bin --fast --history --run-to-cycle 400
+# python main.py binarios/teste.bin --fast --break 12 --watch 0x100/w --reverse-continue
+
+# Limitar instruções e tempo de relógio (útil em programas que não terminam)
+# python main.py binarios/teste.bin --fast --max-cycles 0 --max-instructions 1000000 --timeout 5
+
+# Pular aquecimento: salvar após 50000 ciclos e continuar depois
+# python main.py binarios/teste.bin --max-cycles 50000 --checkpoint estado.ckpt
+# python main.py estado.ckpt
+
+# Espaço de 24 bits (alcance de JAL/J) com memória paginada
+# python main.py binarios/teste.bin --paged
 if __name__ == '__main__':
     main()
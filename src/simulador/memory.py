@@ -5,28 +5,110 @@ Abstração completa da memória do processador UFLA-RISC.
 Fornece leitura/escrita, carregamento de programas e validação.
 """
 
-from utils import MEMORY_SIZE, to_u32, clamp_address, is_valid_address
+import sys
+from array import array
+
+from journal import KIND_MEM
+from program_image import load_image_buffer, load_image_file
+from text_loader import ParsedImageCache, parse_text_program
+from utils import ADDRESS_BITS, MASK32, MAX_ADDRESS_BITS, to_u32
+
+# Typecode de array para palavras de 32 bits sem sinal
+WORD_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+
+def new_word_array(count):
+    """Cria array de palavras de 32 bits zeradas."""
+    return array(WORD_TYPECODE, bytes(4 * count))
+
+
+def words_from_bytes(raw, byteorder='big'):
+    """
+    Converte bytes em array de palavras de 32 bits, sem laço por palavra.
+    O tamanho deve ser múltiplo de 4.
+    """
+    if len(raw) % 4:
+        raise ValueError(f"Tamanho não múltiplo de 4 bytes: {len(raw)}")
+    words = array(WORD_TYPECODE)
+    words.frombytes(raw)
+    if byteorder != sys.byteorder:
+        words.byteswap()
+    return words
+
+
+def words_from_buffer(obj):
+    """
+    Converte objeto com protocolo de buffer (array, NumPy uint32/int32...)
+    em array de palavras de 32 bits na ordem de bytes nativa.
+    """
+    view = memoryview(obj)
+    if view.itemsize != 4:
+        raise ValueError(
+            f"Buffer deve ter itens de 4 bytes (recebido: {view.itemsize})")
+    words = array(WORD_TYPECODE)
+    words.frombytes(view.cast('B') if view.c_contiguous else view.tobytes())
+    return words
 
 
 class Memory:
-    """Gerencia memória do processador UFLA-RISC (64K palavras)."""
+    """Gerencia memória do processador UFLA-RISC (64K palavras por padrão)."""
     
-    def __init__(self):
-        """Inicializa memória com 64K palavras zeradas."""
-        self.data = [0] * MEMORY_SIZE
+    def __init__(self, address_bits=ADDRESS_BITS):
+        """
+        Inicializa memória zerada (array de 32 bits).
+        
+        Args:
+            address_bits: bits de endereço de palavra (1 a 24); padrão 16
+                          (64K palavras)
+        """
+        if not 1 <= address_bits <= MAX_ADDRESS_BITS:
+            raise ValueError(f"Espaço de endereçamento inválido: {address_bits} "
+                             f"bits (máximo {MAX_ADDRESS_BITS})")
+        self.address_bits = address_bits
+        self.size = 1 << address_bits
+        self.address_mask = self.size - 1
+        self._init_storage()
         self.breakpoints = set()
+        self._breakpoint_map = None  # bytearray por endereço, sob demanda
+        # Observadores notificados a cada escrita (ex.: cache de decodificação)
+        self.observers = []
+        # Diário de alterações (opcional, ver journal.ChangeJournal)
+        self.journal = None
+    
+    def _init_storage(self):
+        """Aloca o armazenamento (array contíguo com todas as palavras)."""
+        self.data = new_word_array(self.size)
+    
+    # ==================== OBSERVADORES ====================
+    
+    def add_observer(self, observer):
+        """
+        Registra observador de escritas.
+        Deve implementar invalidate, invalidate_range e invalidate_all.
+        """
+        if observer not in self.observers:
+            self.observers.append(observer)
+    
+    def remove_observer(self, observer):
+        """Remove observador de escritas."""
+        if observer in self.observers:
+            self.observers.remove(observer)
     
     # ==================== LEITURA E ESCRITA ====================
     
     def read(self, address):
         """Lê palavra na memória."""
-        address = clamp_address(address) & 0xFFFF
-        return self.data[address]
+        return self.data[address & self.address_mask]
     
     def write(self, address, value):
         """Escreve palavra na memória."""
-        address = clamp_address(address) & 0xFFFF
-        self.data[address] = to_u32(value)
+        address &= self.address_mask
+        value = to_u32(value)
+        if self.journal is not None:
+            self.journal.record(KIND_MEM, address, self.data[address], value)
+        self.data[address] = value
+        for observer in self.observers:
+            observer.invalidate(address)
     
     def read_word(self, address):
         """Alias para read (mais explícito)."""
@@ -38,25 +120,116 @@ class Memory:
     
     # ==================== OPERAÇÕES EM BLOCO ====================
     
+    def _spans(self, start_address, count):
+        """
+        Divide um bloco em trechos contíguos (wrap-around no fim da
+        memória). Gera tuplas (endereço, deslocamento no bloco, tamanho).
+        """
+        offset = 0
+        while offset < count:
+            addr = (start_address + offset) & self.address_mask
+            size = min(count - offset, self.size - addr)
+            yield addr, offset, size
+            offset += size
+    
+    def _clip_words(self, start_address, words):
+        """
+        Limita bloco ao tamanho da memória: em escritas sequenciais apenas
+        as últimas palavras sobrevivem. Retorna (endereço, palavras).
+        """
+        if len(words) > self.size:
+            skip = len(words) - self.size
+            return (start_address + skip) & self.address_mask, words[skip:]
+        return start_address, words
+    
+    def _store_words(self, start_address, words):
+        """Copia array de palavras para a memória por fatias."""
+        start_address, words = self._clip_words(start_address, words)
+        count = len(words)
+        
+        data = self.data
+        for addr, offset, size in self._spans(start_address, count):
+            if self.journal is not None:
+                for i in range(size):
+                    old, new = data[addr + i], words[offset + i]
+                    if old != new:
+                        self.journal.record(KIND_MEM, addr + i, old, new)
+            data[addr:addr + size] = words[offset:offset + size]
+        
+        for observer in self.observers:
+            observer.invalidate_range(start_address, count)
+        return count
+    
+    def _read_words(self, start_address, count):
+        """Lê bloco de palavras consecutivas como array."""
+        start_address &= self.address_mask
+        if start_address + count <= self.size:
+            return self.data[start_address:start_address + count]
+        words = array(WORD_TYPECODE)
+        for addr, _, size in self._spans(start_address, count):
+            words.extend(self.data[addr:addr + size])
+        return words
+    
     def read_block(self, start_address, count):
         """Lê bloco de palavras consecutivas."""
-        start_address = clamp_address(start_address) & 0xFFFF
-        result = []
-        for i in range(count):
-            addr = (start_address + i) & 0xFFFF
-            result.append(self.data[addr])
-        return result
+        return self._read_words(start_address, count).tolist()
     
     def write_block(self, start_address, values):
         """Escreve bloco de palavras consecutivas."""
-        start_address = clamp_address(start_address) & 0xFFFF
-        for i, value in enumerate(values):
-            addr = (start_address + i) & 0xFFFF
-            self.data[addr] = to_u32(value)
+        start_address &= self.address_mask
+        if not (isinstance(values, array) and values.typecode == WORD_TYPECODE):
+            values = array(WORD_TYPECODE, [value & MASK32 for value in values])
+        self._store_words(start_address, values)
+    
+    def fill(self, start_address, count, value=0):
+        """Preenche bloco de palavras com o mesmo valor."""
+        start_address &= self.address_mask
+        count = min(count, self.size)
+        self._store_words(start_address,
+                          array(WORD_TYPECODE, [to_u32(value)]) * count)
+    
+    def view(self, start_address, count):
+        """
+        Retorna memoryview (sem cópia) de um bloco contíguo.
+        Destinado a leituras e dumps; escritas pela visão não notificam
+        observadores nem o diário.
+        """
+        start_address &= self.address_mask
+        if start_address + count > self.size:
+            raise ValueError("Bloco ultrapassa o fim da memória")
+        return memoryview(self.data)[start_address:start_address + count]
+    
+    def load_bytes(self, start_address, raw, byteorder='big'):
+        """
+        Carrega palavras de 32 bits a partir de bytes (big-endian por
+        padrão) sem laço por palavra. Retorna número de palavras escritas.
+        """
+        start_address &= self.address_mask
+        return self._store_words(start_address, words_from_bytes(raw, byteorder))
+    
+    def load_buffer(self, start_address, obj):
+        """
+        Carrega palavras de um objeto com protocolo de buffer de itens de
+        4 bytes (ex.: array NumPy uint32). Retorna número de palavras.
+        """
+        start_address &= self.address_mask
+        return self._store_words(start_address, words_from_buffer(obj))
+    
+    def to_bytes(self, start_address=0, count=None, byteorder='big'):
+        """
+        Exporta bloco de memória como bytes (big-endian por padrão).
+        Sem count, exporta a memória inteira.
+        """
+        if count is None:
+            count = self.size
+        words = self._read_words(start_address, count)
+        if byteorder != sys.byteorder:
+            words.byteswap()
+        return words.tobytes()
     
     # ==================== CARREGAMENTO DE PROGRAMAS ====================
     
-    def load_program_from_text(self, filename):
+    def load_program_from_text(self, filename, use_cache=False):
         """
         Carrega programa de arquivo texto com instruções binárias.
         
@@ -66,39 +239,36 @@ class Memory:
             <instrução_binária_32bits>
             ...
         
+        O arquivo é analisado numa única passagem e copiado para a memória
+        segmento a segmento. Com use_cache (CLI: --text-cache), a imagem
+        analisada é guardada em disco (ver text_loader.ParsedImageCache) e
+        reaproveitada enquanto o arquivo não mudar.
+        
         Retorna número de instruções carregadas.
         """
-        current_address = 0
-        instruction_count = 0
-        
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                for line_num, line in enumerate(f, 1):
-                    line = line.strip()
-                    
-                    # Ignorar linhas vazias e comentários
-                    if not line or line.startswith('#'):
-                        continue
-                    
-                    # Processar diretiva "address"
-                    if line.lower().startswith('address'):
-                        parts = line.split()
-                        if len(parts) >= 2:
-                            try:
-                                current_address = int(parts[1], 2)
-                            except ValueError:
-                                print(f"⚠️  Linha {line_num}: endereço inválido em {parts[1]}")
-                        continue
-                    
-                    # Processar instrução (32 bits em binário)
-                    if len(line) == 32 and all(c in '01' for c in line):
-                        instruction = int(line, 2)
-                        self.write(current_address, instruction)
-                        current_address = (current_address + 1) & 0xFFFF
-                        instruction_count += 1
-                    else:
-                        if line and not line.startswith('address'):
-                            print(f"⚠️  Linha {line_num}: instrução inválida: {line}")
+            with open(filename, 'rb') as f:
+                content = f.read()
+            
+            cache = ParsedImageCache() if use_cache else None
+            cached = cache.lookup(filename, content) if cache else None
+            if cached is not None:
+                info = load_image_buffer(self, cached)
+                print(f"✓ Programa carregado: {info.words} instruções (cache)")
+                return info.words
+            
+            segments, warnings = parse_text_program(content.decode('utf-8'))
+            for line_num, message in warnings:
+                print(f"⚠️  Linha {line_num}: {message}")
+            
+            instruction_count = 0
+            for address, words in segments:
+                self.write_block(address, words)
+                instruction_count += len(words)
+            
+            # Apenas arquivos sem avisos vão para o cache (avisos reaparecem)
+            if cache and not warnings:
+                cache.store(filename, content, segments)
             
             print(f"✓ Programa carregado: {instruction_count} instruções")
             return instruction_count
@@ -113,27 +283,19 @@ class Memory:
     def load_program_from_binary(self, filename):
         """
         Carrega programa de arquivo binário.
-        Cada instrução é um inteiro de 32 bits.
+        Cada instrução é um inteiro de 32 bits (big-endian), a partir do
+        endereço 0. O arquivo é lido e copiado para a memória em bloco.
         """
-        instruction_count = 0
-        current_address = 0
-        
         try:
             with open(filename, 'rb') as f:
-                while True:
-                    data = f.read(4)
-                    if not data:
-                        break
-                    
-                    if len(data) < 4:
-                        print(f"⚠️  Instrução incompleta na posição {current_address}")
-                        break
-                    
-                    # Converter bytes para inteiro (big-endian)
-                    instruction = int.from_bytes(data, byteorder='big')
-                    self.write(current_address, instruction)
-                    current_address = (current_address + 1) & 0xFFFF
-                    instruction_count += 1
+                raw = f.read()
+            
+            complete = len(raw) - len(raw) % 4
+            self.load_bytes(0, raw[:complete])
+            instruction_count = complete // 4
+            if complete < len(raw):
+                print(f"⚠️  Instrução incompleta na posição "
+                      f"{instruction_count & self.address_mask}")
             
             print(f"✓ Programa binário carregado: {instruction_count} instruções")
             return instruction_count
@@ -145,58 +307,102 @@ class Memory:
             print(f"❌ Erro ao carregar programa binário: {e}")
             return 0
     
+    def load_program_image(self, filename):
+        """
+        Carrega imagem empacotada (ver program_image.py) via mmap,
+        copiando cada segmento em bloco.
+        
+        Retorna ImageInfo (entrada, segmentos, palavras) ou None em erro.
+        """
+        try:
+            info = load_image_file(self, filename)
+            print(f"✓ Imagem carregada: {info.words} palavras em "
+                  f"{len(info.segments)} segmento(s)")
+            return info
+            
+        except FileNotFoundError:
+            print(f"❌ Erro: Arquivo '{filename}' não encontrado")
+            return None
+        except Exception as e:
+            print(f"❌ Erro ao carregar imagem: {e}")
+            return None
+    
     # ==================== BREAKPOINTS ====================
     
     def add_breakpoint(self, address):
         """Adiciona breakpoint em endereço."""
-        address = clamp_address(address) & 0xFFFF
+        address &= self.address_mask
         self.breakpoints.add(address)
+        if self._breakpoint_map is not None:
+            self._breakpoint_map[address] = 1
     
     def remove_breakpoint(self, address):
         """Remove breakpoint de endereço."""
-        address = clamp_address(address) & 0xFFFF
+        address &= self.address_mask
         self.breakpoints.discard(address)
+        if self._breakpoint_map is not None:
+            self._breakpoint_map[address] = 0
     
     def has_breakpoint(self, address):
         """Verifica se há breakpoint em endereço."""
-        address = clamp_address(address) & 0xFFFF
-        return address in self.breakpoints
+        return (address & self.address_mask) in self.breakpoints
     
     def clear_breakpoints(self):
         """Remove todos os breakpoints."""
         self.breakpoints.clear()
+        self._breakpoint_map = None
+
+    def set_breakpoints(self, addresses):
+        """Substitui o conjunto de breakpoints (checkpoints, execução reversa)."""
+        self.breakpoints = {address & self.address_mask for address in addresses}
+        self._breakpoint_map = None
+
+    def breakpoint_map(self):
+        """
+        bytearray com 1 nos endereços com breakpoint. Montado uma vez e
+        mantido por add/remove_breakpoint; clear/set_breakpoints descartam.
+        """
+        if self._breakpoint_map is None:
+            table = bytearray(self.size)
+            for address in self.breakpoints:
+                table[address] = 1
+            self._breakpoint_map = table
+        return self._breakpoint_map
     
     # ==================== LIMPEZA E RESET ====================
     
     def reset(self):
-        """Zera toda a memória."""
-        self.data = [0] * MEMORY_SIZE
-        self.breakpoints.clear()
+        """Zera toda a memória (no próprio buffer; visões continuam válidas)."""
+        self.fill(0, self.size, 0)
+        self.clear_breakpoints()
+        for observer in self.observers:
+            observer.invalidate_all()
     
     def clear_range(self, start_address, end_address):
-        """Zera intervalo de endereços."""
-        start_address = clamp_address(start_address) & 0xFFFF
-        end_address = clamp_address(end_address) & 0xFFFF
-        
-        if start_address <= end_address:
-            for addr in range(start_address, end_address + 1):
-                self.data[addr] = 0
-        else:
-            # Wrap-around
-            for addr in range(start_address, MEMORY_SIZE):
-                self.data[addr] = 0
-            for addr in range(0, end_address + 1):
-                self.data[addr] = 0
+        """Zera intervalo de endereços (inclusive, com wrap-around)."""
+        start_address &= self.address_mask
+        end_address &= self.address_mask
+        count = ((end_address - start_address) & self.address_mask) + 1
+        self.fill(start_address, count, 0)
     
     # ==================== ESTATÍSTICAS ====================
     
+    def allocated_blocks(self):
+        """
+        Retorna lista de (endereço inicial, array de palavras) com as
+        regiões que podem conter dados não-zero, em ordem de endereço.
+        """
+        return [(0, self.data)]
+    
     def get_non_zero_words(self):
         """Retorna lista de endereços com valores não-zero."""
-        return [i for i, val in enumerate(self.data) if val != 0]
+        return [start + i for start, block in self.allocated_blocks()
+                for i, val in enumerate(block) if val != 0]
     
     def count_non_zero(self):
         """Conta palavras não-zero na memória."""
-        return sum(1 for val in self.data if val != 0)
+        return sum(len(block) - block.count(0)
+                   for _, block in self.allocated_blocks())
     
     def print_non_zero(self, limit=20):
         """Imprime palavras não-zero até o limite."""
@@ -205,41 +411,42 @@ class Memory:
         print("=" * 70)
         
         count = 0
-        for addr, val in enumerate(self.data):
-            if val != 0:
-                print(f"Mem[{addr:5d}]: 0x{val:08x} (decimal: {val})")
-                count += 1
-                if count >= limit:
-                    remaining = self.count_non_zero() - count
-                    if remaining > 0:
-                        print(f"... ({remaining} posições omitidas)")
-                    break
+        for start, block in self.allocated_blocks():
+            for offset, val in enumerate(block):
+                if val != 0:
+                    print(f"Mem[{start + offset:5d}]: 0x{val:08x} (decimal: {val})")
+                    count += 1
+                    if count >= limit:
+                        remaining = self.count_non_zero() - count
+                        if remaining > 0:
+                            print(f"... ({remaining} posições omitidas)")
+                        return
     
     def dump_memory(self, start=0, count=10):
         """Faz dump de intervalo de memória."""
-        start = clamp_address(start) & 0xFFFF
+        start &= self.address_mask
         
         print("=" * 70)
         print(f"DUMP DE MEMÓRIA (de 0x{start:04x})")
         print("=" * 70)
         
         for i in range(count):
-            addr = (start + i) & 0xFFFF
-            val = self.data[addr]
+            addr = (start + i) & self.address_mask
+            val = self.read(addr)
             print(f"0x{addr:04x}: 0x{val:08x}")
     
     # ==================== DEBUG ====================
     
     def verify_size(self):
         """Verifica integridade da memória."""
-        return len(self.data) == MEMORY_SIZE
+        return len(self.data) == self.size
     
     def get_stats(self):
         """Retorna estatísticas da memória."""
         non_zero = self.count_non_zero()
         return {
-            'total_words': MEMORY_SIZE,
+            'total_words': self.size,
             'non_zero_words': non_zero,
-            'zero_words': MEMORY_SIZE - non_zero,
+            'zero_words': self.size - non_zero,
             'breakpoints': len(self.breakpoints)
         }
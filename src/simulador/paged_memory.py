@@ -0,0 +1,181 @@
+"""
+paged_memory.py - Memória Paginada Esparsa
+
+Alternativa a Memory para espaços de endereçamento grandes (até 24 bits,
+o alcance de JAL/J): a memória é dividida em páginas alocadas na primeira
+escrita, de modo que o custo acompanha apenas o que o programa toca.
+
+O reset é O(1): um contador de geração invalida todas as páginas de uma
+vez; páginas de gerações anteriores são reaproveitadas (zeradas) quando
+voltam a ser escritas. Estatísticas e dumps percorrem só as páginas vivas.
+"""
+
+from array import array
+
+from journal import KIND_MEM
+from memory import WORD_TYPECODE, Memory, new_word_array
+from utils import MASK32, MAX_ADDRESS_BITS
+
+
+class PagedMemory(Memory):
+    """Memória UFLA-RISC paginada, alocada sob demanda."""
+
+    # Palavras por página (2^PAGE_BITS)
+    PAGE_BITS = 10
+
+    def __init__(self, address_bits=MAX_ADDRESS_BITS, page_bits=PAGE_BITS):
+        """
+        Inicializa memória sem páginas alocadas.
+
+        Args:
+            address_bits: bits de endereço de palavra (1 a 24); padrão 24
+            page_bits: bits de deslocamento dentro da página
+        """
+        self.page_bits = min(page_bits, address_bits)
+        super().__init__(address_bits)
+
+    def _init_storage(self):
+        """Cria tabela de páginas vazia."""
+        self.page_size = 1 << self.page_bits
+        self.page_mask = self.page_size - 1
+        self.num_pages = self.size >> self.page_bits
+        self.pages = [None] * self.num_pages
+        # Página i é válida se page_generation[i] == generation
+        self.page_generation = [0] * self.num_pages
+        self.generation = 1
+        self.live = []  # índices das páginas vivas (geração atual)
+        self._zero_page = new_word_array(self.page_size)
+
+    # ==================== PÁGINAS ====================
+
+    def _is_live(self, index):
+        """Verifica se a página pertence à geração atual."""
+        return self.page_generation[index] == self.generation
+
+    def _page(self, index):
+        """Retorna página viva, alocando (ou reaproveitando zerada) se preciso."""
+        page = self.pages[index]
+        if self.page_generation[index] != self.generation:
+            if page is None:
+                page = self.pages[index] = new_word_array(self.page_size)
+            else:
+                page[:] = self._zero_page
+            self.page_generation[index] = self.generation
+            self.live.append(index)
+        return page
+
+    def _page_spans(self, start_address, count):
+        """
+        Divide um bloco em trechos que não atravessam páginas.
+        Gera tuplas (endereço, deslocamento no bloco, tamanho).
+        """
+        for addr, offset, size in self._spans(start_address, count):
+            end = addr + size
+            while addr < end:
+                chunk = min(end - addr, self.page_size - (addr & self.page_mask))
+                yield addr, offset, chunk
+                addr += chunk
+                offset += chunk
+
+    # ==================== LEITURA E ESCRITA ====================
+
+    def read(self, address):
+        """Lê palavra na memória (0 em páginas não alocadas)."""
+        address &= self.address_mask
+        index = address >> self.page_bits
+        if self.page_generation[index] != self.generation:
+            return 0
+        return self.pages[index][address & self.page_mask]
+
+    def write(self, address, value):
+        """Escreve palavra na memória, alocando a página se preciso."""
+        address &= self.address_mask
+        value &= MASK32
+        page = self._page(address >> self.page_bits)
+        offset = address & self.page_mask
+        if self.journal is not None:
+            self.journal.record(KIND_MEM, address, page[offset], value)
+        page[offset] = value
+        for observer in self.observers:
+            observer.invalidate(address)
+
+    # ==================== OPERAÇÕES EM BLOCO ====================
+
+    def _store_words(self, start_address, words):
+        """
+        Copia array de palavras para a memória página a página.
+        Trechos zerados em páginas não alocadas não alocam páginas.
+        """
+        start_address, words = self._clip_words(start_address, words)
+        count = len(words)
+
+        for addr, offset, size in self._page_spans(start_address, count):
+            index = addr >> self.page_bits
+            chunk = words[offset:offset + size]
+            if not self._is_live(index) and chunk.count(0) == size:
+                continue
+            page = self._page(index)
+            pos = addr & self.page_mask
+            if self.journal is not None:
+                for i in range(size):
+                    old, new = page[pos + i], chunk[i]
+                    if old != new:
+                        self.journal.record(KIND_MEM, addr + i, old, new)
+            page[pos:pos + size] = chunk
+
+        for observer in self.observers:
+            observer.invalidate_range(start_address, count)
+        return count
+
+    def _read_words(self, start_address, count):
+        """Lê bloco de palavras consecutivas como array."""
+        words = array(WORD_TYPECODE)
+        for addr, _, size in self._page_spans(start_address & self.address_mask,
+                                              count):
+            index = addr >> self.page_bits
+            if self._is_live(index):
+                pos = addr & self.page_mask
+                words.extend(self.pages[index][pos:pos + size])
+            else:
+                words.extend(self._zero_page[:size])
+        return words
+
+    def view(self, start_address, count):
+        """
+        Retorna memoryview (sem cópia) de um bloco dentro de uma página.
+        A página é alocada se ainda não existir.
+        """
+        start_address &= self.address_mask
+        pos = start_address & self.page_mask
+        if pos + count > self.page_size:
+            raise ValueError("Bloco atravessa o limite de uma página")
+        page = self._page(start_address >> self.page_bits)
+        return memoryview(page)[pos:pos + count]
+
+    # ==================== LIMPEZA E RESET ====================
+
+    def reset(self):
+        """Zera toda a memória em O(1) (nova geração de páginas)."""
+        self.generation += 1
+        self.live = []
+        self.clear_breakpoints()
+        for observer in self.observers:
+            observer.invalidate_all()
+
+    # ==================== ESTATÍSTICAS ====================
+
+    def allocated_blocks(self):
+        """Retorna (endereço inicial, página) das páginas vivas, em ordem."""
+        return [(index << self.page_bits, self.pages[index])
+                for index in sorted(self.live)]
+
+    def verify_size(self):
+        """Verifica integridade da tabela de páginas."""
+        return self.num_pages * self.page_size == self.size
+
+    def get_stats(self):
+        """Retorna estatísticas da memória (inclui páginas alocadas)."""
+        stats = super().get_stats()
+        stats['page_words'] = self.page_size
+        stats['pages'] = len(self.live)
+        return stats
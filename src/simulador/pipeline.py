@@ -0,0 +1,372 @@
+"""
+pipeline.py - Pipeline Sobreposto de 4 Estágios
+
+Modelo de temporização em que IF, ID, EX/MEM e WB trabalham ao mesmo
+tempo em instruções diferentes, separados pelos registradores de estágio
+IF/ID, ID/EX e EX/WB. Cada ciclo processa os estágios de trás para frente
+(WB, EX/MEM, ID, IF), de modo que a escrita no banco de registradores
+acontece antes da leitura do ID (meio ciclo de escrita / meio de leitura).
+
+Hazards:
+    RAW       o ID compara os registradores-fonte da instrução com o
+              destino da instrução que acabou de passar pelo EX/MEM. Sem
+              forwarding, a instrução espera 1 ciclo (stall); com
+              forwarding, o valor é repassado do EX/WB para o EX/MEM.
+    Controle  J e JAL têm o destino no próprio código e desviam a busca
+              já no ID (1 ciclo perdido). JR, BEQ e BNE são resolvidos no
+              EX/MEM; se o fluxo real diferir do buscado, IF/ID é
+              descartado (2 ciclos). Sem preditor, desvios são previstos
+              como não tomados; com preditor (branch_predictor.py), um
+              desvio previsto tomado desvia a busca no ID (1 ciclo) ou,
+              com BTB, já no IF (sem perda).
+    Código    STORE sobre a instrução já buscada em IF/ID descarta a busca
+    auto-mod. e a refaz com o conteúdo novo.
+    Memória   com hierarquia de caches (cache.py), a latência além do
+              acerto na L1 de uma busca ou de um LOAD/STORE congela o
+              pipeline (caches bloqueantes).
+
+A execução funcional reaproveita os handlers do Simulator, portanto
+registradores, memória e flags finais são idênticos aos dos outros modos;
+apenas a contagem de ciclos muda.
+"""
+
+from utils import MASK32
+
+# Opcodes com tratamento especial no pipeline
+OP_LOAD = 0x10
+OP_STORE = 0x11
+OP_JAL = 0x12
+OP_BEQ = 0x14
+OP_BNE = 0x15
+OP_J = 0x16
+
+# Campos lidos por opcode (índices na DecodedInstruction: 2=ra, 3=rb, 4=rc)
+_RA, _RB, _RC = 2, 3, 4
+SOURCE_FIELDS = [()] * 256
+for _opcode in (0x01, 0x02, 0x04, 0x05, 0x07, 0x08, 0x09, 0x0A, 0x0B,
+                0x14, 0x15, 0x17, 0x18, 0x19, 0x1A):
+    SOURCE_FIELDS[_opcode] = (_RA, _RB)
+for _opcode in (0x06, 0x0C, 0x10, 0x1B, 0x1C, 0x1D):
+    SOURCE_FIELDS[_opcode] = (_RA,)
+for _opcode in (0x0E, 0x0F, 0x13):  # LCH/LCL alteram parte de RC; JR lê RC
+    SOURCE_FIELDS[_opcode] = (_RC,)
+SOURCE_FIELDS[OP_STORE] = (_RA, _RC)
+
+
+class InFlight:
+    """Instrução em trânsito (conteúdo de um registrador de estágio)."""
+
+    __slots__ = ('pc', 'raw', 'next_pc', 'predicted', 'decoded', 'forward',
+                 'val_a', 'val_b', 'val_c', 'dest', 'value', 'is_halt')
+
+    def __init__(self, pc, raw):
+        self.pc = pc
+        self.raw = raw
+        self.next_pc = (pc + 1) & MASK32  # caminho assumido pela busca
+        self.predicted = None  # previsão do preditor de desvios
+        self.decoded = None
+        self.forward = False
+        self.val_a = self.val_b = self.val_c = 0
+        self.dest = 0        # registrador escrito no WB (0: nenhum)
+        self.value = 0
+        self.is_halt = False
+
+
+class PipelineEngine:
+    """Executa o programa de um Simulator com os estágios sobrepostos."""
+
+    def __init__(self, sim, forwarding=True):
+        """
+        Args:
+            sim: Simulator cujos CPU, memória e handlers são usados
+            forwarding: se True, repassa resultados do EX/WB ao EX/MEM
+        """
+        self.sim = sim
+        self.forwarding = forwarding
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Zera contadores de hazards."""
+        self.stall_cycles = 0
+        self.raw_hazards = 0
+        self.forwards = 0
+        self.flushes = 0
+        self.flush_cycles = 0
+        self.smc_flushes = 0
+        self.memory_stall_cycles = 0
+
+    # ==================== EXECUÇÃO ====================
+
+    def run(self, max_cycles):
+        """
+        Executa ciclos até HALT, opcode inválido ou max_cycles.
+
+        Ao parar pelo limite, a instrução que já passou pelo EX/MEM é
+        concluída e o PC passa a apontar para a mais antiga não executada,
+        deixando o estado arquitetural consistente (ex.: para checkpoint).
+        """
+        sim = self.sim
+        cpu = sim.cpu
+        fetch_port = sim.fetch_port
+        data_port = sim.data_port
+        fetch_cached = fetch_port is not sim.memory
+        data_cached = data_port is not sim.memory
+        lookup = sim.decode_cache.lookup
+        exec_table = sim.exec_table
+        read_register = cpu.read_register
+        address_mask = sim.address_mask
+        forwarding = self.forwarding
+        verbose = sim.verbose
+        journal = sim.journal
+        control = sim.control
+        predictor = control.predictor
+        fetch_predictor = decode_predictor = None
+        if predictor is not None:
+            predictor.sync()
+            if predictor.PREDICTS_AT_FETCH:
+                fetch_predictor = predictor
+            else:
+                decode_predictor = predictor
+
+        # Registradores de estágio IF/ID, ID/EX e EX/WB (None: bolha)
+        if_id = id_ex = ex_wb = None
+        fetch_pc = cpu.PC
+
+        while sim.cycle_counter < max_cycles and not sim.halted:
+            sim.cycle_counter += 1
+            if verbose:
+                journal.clear()
+                labels = ['-', '-', '-', '-']
+
+            # ---------- WB ----------
+            if ex_wb is not None:
+                retired = ex_wb
+                ex_wb = None
+                if retired.dest:
+                    cpu.write_register(retired.dest, retired.value)
+                sim.instruction_count += 1
+                if verbose:
+                    labels[3] = self._label(retired)
+                if retired.is_halt:
+                    sim.halted = True
+                    cpu.PC = (retired.pc + 1) & MASK32
+                    cpu.IR = retired.raw
+                    if verbose:
+                        self._print_cycle(labels, '')
+                    break
+
+            # ---------- EX/MEM ----------
+            redirect = None
+            if id_ex is not None:
+                slot = id_ex
+                id_ex = None
+                decoded = sim.decoded = slot.decoded
+                (_, sim.opcode, sim.ra, sim.rb, sim.rc,
+                 sim.const16, sim.address, sim.branch_offset) = decoded
+                if slot.forward:
+                    # Operando produzido pela instrução que acabou de
+                    # passar pelo WB: caminho EX/WB -> EX/MEM
+                    sim.val_a = read_register(sim.ra)
+                    sim.val_b = read_register(sim.rb)
+                    sim.val_c = read_register(sim.rc)
+                else:
+                    sim.val_a, sim.val_b, sim.val_c = (
+                        slot.val_a, slot.val_b, slot.val_c)
+                cpu.IR = slot.raw
+                cpu.PC = (slot.pc + 1) & MASK32  # PC arquitetural
+                if slot.predicted is not None and (sim.opcode == OP_BEQ or
+                                                   sim.opcode == OP_BNE):
+                    control.prediction = slot.predicted
+                sim.write_enable = False
+                sim.alu_result = 0
+                sim.is_halt_instruction = False
+                exec_table[sim.opcode](sim)
+                if verbose:
+                    labels[2] = self._label(slot)
+                if sim.halted:  # opcode inválido
+                    if verbose:
+                        self._print_cycle(labels, '')
+                    break
+                if data_cached and (sim.opcode == OP_LOAD or
+                                    sim.opcode == OP_STORE):
+                    self._memory_stall(data_port)
+
+                if sim.write_enable and sim.rc != 0:
+                    slot.dest = sim.rc if sim.rc < 32 else 31
+                    slot.value = (sim.mem_data if sim.opcode == OP_LOAD
+                                  else sim.alu_result)
+                slot.is_halt = sim.is_halt_instruction
+                ex_wb = slot
+
+                if cpu.PC != slot.next_pc:
+                    # Desvio resolvido diferente do caminho buscado
+                    redirect = cpu.PC
+                elif (sim.opcode == OP_STORE and if_id is not None and
+                      (if_id.pc & address_mask) ==
+                      (sim.val_c & address_mask)):
+                    # Escrita sobre instrução já buscada: refaz a busca
+                    redirect = if_id.pc
+                    self.smc_flushes += 1
+
+            if redirect is not None:
+                # Descarta IF/ID e a busca deste ciclo
+                self.flushes += 1
+                self.flush_cycles += 2
+                if verbose:
+                    labels[1] = self._label(if_id, 'flush')
+                    labels[0] = 'flush'
+                if_id = None
+                fetch_pc = redirect
+                if verbose:
+                    self._print_cycle(labels, 'flush')
+                continue
+
+            # ---------- ID ----------
+            stalled = False
+            skip_fetch = False
+            if if_id is not None:
+                slot = if_id
+                decoded = lookup(slot.pc & address_mask, slot.raw)
+                opcode = decoded[1]
+                producer = ex_wb
+                if producer is not None and producer.dest:
+                    for field in SOURCE_FIELDS[opcode]:
+                        reg = decoded[field]
+                        if (reg if reg < 32 else 31) == producer.dest:
+                            self.raw_hazards += 1
+                            if forwarding:
+                                slot.forward = True
+                                self.forwards += 1
+                            else:
+                                stalled = True
+                                self.stall_cycles += 1
+                            break
+                if verbose:
+                    labels[1] = self._label(slot, 'stall' if stalled else '')
+
+                if not stalled:
+                    slot.decoded = decoded
+                    slot.val_a = read_register(decoded[2])
+                    slot.val_b = read_register(decoded[3])
+                    slot.val_c = read_register(decoded[4])
+                    sim.fetch_address = slot.pc & address_mask
+                    id_ex = slot
+                    if_id = None
+                    if opcode == OP_J or opcode == OP_JAL:
+                        # Destino conhecido no ID: descarta a busca do ciclo
+                        slot.next_pc = decoded[6]
+                        fetch_pc = slot.next_pc
+                        skip_fetch = True
+                        self.flushes += 1
+                        self.flush_cycles += 1
+                    elif decode_predictor is not None and (
+                            opcode == OP_BEQ or opcode == OP_BNE):
+                        # Previsão no ID: o destino está no próprio código
+                        slot.predicted = decode_predictor.predict(
+                            slot.pc, decoded[7])
+                        if slot.predicted:
+                            slot.next_pc = decoded[7]
+                            fetch_pc = slot.next_pc
+                            skip_fetch = True
+                            self.flushes += 1
+                            self.flush_cycles += 1
+
+            # ---------- IF ----------
+            if not stalled and not skip_fetch:
+                if_id = InFlight(fetch_pc, fetch_port.read(fetch_pc))
+                if fetch_cached:
+                    self._memory_stall(fetch_port)
+                if fetch_predictor is not None:
+                    # BTB: destino previsto antes mesmo da decodificação
+                    target = fetch_predictor.fetch_target(fetch_pc)
+                    if_id.predicted = target is not None
+                    if target is not None:
+                        if_id.next_pc = target
+                fetch_pc = if_id.next_pc
+                if verbose:
+                    labels[0] = f"{if_id.pc}"
+            elif verbose and skip_fetch:
+                labels[0] = 'flush'
+
+            if verbose:
+                self._print_cycle(labels, 'stall' if stalled else '')
+
+        # Parada pelo limite: conclui o que já executou e alinha o PC
+        if not sim.halted:
+            if ex_wb is not None:
+                if ex_wb.dest:
+                    cpu.write_register(ex_wb.dest, ex_wb.value)
+                sim.instruction_count += 1
+                cpu.IR = ex_wb.raw
+                if ex_wb.is_halt:
+                    sim.halted = True
+                ex_wb = None
+            oldest = id_ex or if_id
+            cpu.PC = oldest.pc if oldest is not None else fetch_pc
+
+        return not sim.halted
+
+    def _memory_stall(self, port):
+        """Contabiliza ciclos de espera do último acesso de uma CachePort."""
+        stall = port.last_latency - port.cache.hit_latency
+        if stall > 0:
+            self.sim.cycle_counter += stall
+            self.memory_stall_cycles += stall
+
+    # ==================== RELATÓRIO ====================
+
+    def _label(self, slot, note=''):
+        """Rótulo curto de uma instrução para o modo verboso."""
+        if slot is None:
+            return '-'
+        if slot.decoded is not None:
+            name = self.sim.decoder.get_mnemonic(slot.decoded[1])
+        else:
+            name = self.sim.decoder.get_mnemonic((slot.raw >> 24) & 0xFF)
+        text = f"{slot.pc}:{name}"
+        return f"{text} ({note})" if note else text
+
+    def _print_cycle(self, labels, event):
+        """Imprime ocupação dos estágios no ciclo (MODO VERBOSO)."""
+        line = (f"Ciclo {self.sim.cycle_counter:6d} | IF {labels[0]:<14} "
+                f"| ID {labels[1]:<20} | EX/MEM {labels[2]:<14} "
+                f"| WB {labels[3]:<14}")
+        if event:
+            line += f" [{event}]"
+        print(line.rstrip())
+
+    def get_stats(self):
+        """Retorna estatísticas de temporização do pipeline."""
+        sim = self.sim
+        instructions = sim.instruction_count
+        return {
+            'cycles': sim.cycle_counter,
+            'instructions': instructions,
+            'cpi': (sim.cycle_counter / instructions) if instructions else 0.0,
+            'forwarding': self.forwarding,
+            'raw_hazards': self.raw_hazards,
+            'forwards': self.forwards,
+            'stall_cycles': self.stall_cycles,
+            'flushes': self.flushes,
+            'flush_cycles': self.flush_cycles,
+            'smc_flushes': self.smc_flushes,
+            'memory_stall_cycles': self.memory_stall_cycles
+        }
+
+    def print_stats(self):
+        """Imprime CPI e decomposição dos ciclos perdidos."""
+        stats = self.get_stats()
+        mode = "com" if self.forwarding else "sem"
+        print(f"Pipeline sobreposto ({mode} forwarding)")
+        print(f"  Hazards RAW: {stats['raw_hazards']} "
+              f"(forwarding: {stats['forwards']})")
+        print(f"  Ciclos de stall: {stats['stall_cycles']}")
+        print(f"  Flushes: {stats['flushes']} "
+              f"({stats['flush_cycles']} ciclos perdidos)")
+        if stats['memory_stall_cycles']:
+            print(f"  Ciclos de espera por memória: "
+                  f"{stats['memory_stall_cycles']}")
+        if stats['smc_flushes']:
+            print(f"  Flushes por código auto-modificável: "
+                  f"{stats['smc_flushes']}")
+        print(f"  CPI ideal: 1.00 | Real: {stats['cpi']:.2f}")
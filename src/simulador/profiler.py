@@ -0,0 +1,281 @@
+"""
+profiler.py - Perfil de Execução por PC
+
+Conta execuções e ciclos por PC, por opcode e por bloco básico, e
+reconstrói o grafo de chamadas a partir de JAL (retorno em R31) e de
+JR R31. Os contadores ficam em páginas de arrays planos, indexadas pelo
+endereço da instrução e alocadas na primeira execução de uma instrução
+da página (como em PagedMemory): o custo acompanha o código executado,
+não o espaço de endereçamento. A pilha de chamadas só é consultada nas
+instruções de controle de fluxo. Como quase toda instrução gasta os 4
+ciclos do modelo sequencial, o laço conta apenas execuções e registra à
+parte a diferença de ciclos das exceções (ex.: opcode inválido):
+ciclos = execuções * 4 + diferença.
+
+Saídas:
+    print_report()     pontos quentes com desmontagem, opcodes, blocos
+                       básicos e funções (ciclos exclusivos/inclusivos)
+    write_collapsed()  pilhas colapsadas ("f1;f2;f3 ciclos") para
+                       ferramentas de flamegraph
+"""
+
+from array import array
+
+OP_JAL = 0x12
+OP_JR = 0x13
+
+# Instruções por página de contadores (2^PAGE_BITS)
+PAGE_BITS = 10
+
+# Opcodes que encerram um bloco básico
+_CONTROL = bytearray(256)
+for _opcode in (0x12, 0x13, 0x14, 0x15, 0x16, 0xFF):
+    _CONTROL[_opcode] = 1
+
+
+def _counter_array(count):
+    """Array de contadores de 64 bits zerados."""
+    return array('Q', bytes(8 * count))
+
+
+def function_name(address):
+    """Nome de uma função pelo endereço de entrada."""
+    return f"func_{address:04x}"
+
+
+class Profiler:
+    """Perfil por PC, opcode, bloco básico e função de um Simulator."""
+
+    def __init__(self, sim):
+        self.sim = sim
+        self.page_bits = min(PAGE_BITS, sim.memory.address_bits)
+        self.page_mask = (1 << self.page_bits) - 1
+        self.reset()
+
+    def reset(self):
+        """Zera todos os contadores e a pilha de chamadas."""
+        # nº da página -> (execuções, ciclos além de 4/execução, líderes)
+        self.pages = {}
+        self.opcode_counts = _counter_array(256)
+        self.opcode_extra = array('q', bytes(8 * 256))
+        self.calls = {}   # (chamador, chamado) -> nº de chamadas
+        self.stacks = {}  # pilha (tupla de funções) -> ciclos
+        self.stack = None
+
+    # ==================== PÁGINAS ====================
+
+    def _page(self, number):
+        """Contadores de uma página, alocados no primeiro uso."""
+        page = self.pages.get(number)
+        if page is None:
+            size = 1 << self.page_bits
+            page = self.pages[number] = (_counter_array(size),
+                                         array('q', bytes(8 * size)),
+                                         bytearray(size))
+        return page
+
+    def _mark_leader(self, pc):
+        """Marca pc como início de bloco básico."""
+        self._page(pc >> self.page_bits)[2][pc & self.page_mask] = 1
+
+    def count(self, pc):
+        """Execuções da instrução em pc."""
+        page = self.pages.get(pc >> self.page_bits)
+        return page[0][pc & self.page_mask] if page else 0
+
+    def is_leader(self, pc):
+        """True se pc inicia um bloco básico."""
+        page = self.pages.get(pc >> self.page_bits)
+        return bool(page and page[2][pc & self.page_mask])
+
+    # ==================== EXECUÇÃO ====================
+
+    def run(self, last_full):
+        """
+        Executa instruções completas (como o modo rápido) enquanto
+        cycle_counter <= last_full, contabilizando cada uma.
+        """
+        sim = self.sim
+        cpu = sim.cpu
+        mask = sim.address_mask
+        execute = sim.execute_instruction
+        stages = sim.STAGES_PER_INSTRUCTION
+        bits = self.page_bits
+        offset_mask = self.page_mask
+        opcode_counts = self.opcode_counts
+        stacks = self.stacks
+        page_number = -1
+        counts = None
+
+        if self.stack is None:
+            entry = cpu.PC & mask
+            self.stack = [entry]
+            self._mark_leader(entry)
+        stack = self.stack
+        current = tuple(stack)
+        cycle = mark = sim.cycle_counter  # mark: início da pilha atual
+
+        while cycle <= last_full:
+            pc = cpu.PC
+            if not execute():
+                break
+            index = pc & mask
+            if index >> bits != page_number:
+                page_number = index >> bits
+                counts = self._page(page_number)[0]
+            counts[index & offset_mask] += 1
+            opcode = sim.opcode
+            opcode_counts[opcode] += 1
+            now = sim.cycle_counter
+            if now - cycle != stages:
+                self._page(page_number)[1][index & offset_mask] += \
+                    now - cycle - stages
+                self.opcode_extra[opcode] += now - cycle - stages
+            cycle = now
+
+            if _CONTROL[opcode]:
+                next_pc = cpu.PC & mask
+                self._mark_leader((pc + 1) & mask)
+                self._mark_leader(next_pc)
+                if opcode == OP_JAL:
+                    stacks[current] = stacks.get(current, 0) + now - mark
+                    mark = now
+                    key = (stack[-1], next_pc)
+                    self.calls[key] = self.calls.get(key, 0) + 1
+                    stack.append(next_pc)
+                    current = tuple(stack)
+                elif opcode == OP_JR and min(sim.rc, 31) == 31 and len(stack) > 1:
+                    stacks[current] = stacks.get(current, 0) + now - mark
+                    mark = now
+                    stack.pop()
+                    current = tuple(stack)
+
+        if cycle > mark:
+            stacks[current] = stacks.get(current, 0) + cycle - mark
+
+    # ==================== AGREGAÇÃO ====================
+
+    def pc_cycles(self, pc):
+        """Ciclos gastos pela instrução em pc."""
+        page = self.pages.get(pc >> self.page_bits)
+        if page is None:
+            return 0
+        offset = pc & self.page_mask
+        return page[0][offset] * self.sim.STAGES_PER_INSTRUCTION + page[1][offset]
+
+    def opcode_cycles(self, opcode):
+        """Ciclos gastos pelas instruções de um opcode."""
+        return (self.opcode_counts[opcode] * self.sim.STAGES_PER_INSTRUCTION +
+                self.opcode_extra[opcode])
+
+    def executed_pcs(self):
+        """Endereços executados ao menos uma vez, em ordem."""
+        pcs = []
+        for number in sorted(self.pages):
+            base = number << self.page_bits
+            pcs.extend(base + offset
+                       for offset, count in enumerate(self.pages[number][0])
+                       if count)
+        return pcs
+
+    def basic_blocks(self):
+        """
+        Lista de blocos básicos executados:
+        (início, nº de instruções, execuções, ciclos).
+        """
+        memory = self.sim.memory
+        blocks = []
+        block = None
+        for pc in self.executed_pcs():
+            if (block is None or self.is_leader(pc) or
+                    pc != block[0] + block[1]):
+                block = [pc, 0, self.count(pc), 0]
+                blocks.append(block)
+            block[1] += 1
+            block[3] += self.pc_cycles(pc)
+            if _CONTROL[(memory.read(pc) >> 24) & 0xFF]:
+                block = None
+        return [tuple(b) for b in blocks]
+
+    def function_cycles(self):
+        """Retorna {função: [ciclos exclusivos, ciclos inclusivos]}."""
+        table = {}
+        for stack, spent in self.stacks.items():
+            table.setdefault(stack[-1], [0, 0])[0] += spent
+            for func in set(stack):
+                table.setdefault(func, [0, 0])[1] += spent
+        return table
+
+    def get_stats(self):
+        """Resumo numérico do perfil."""
+        return {
+            'instructions': sum(self.opcode_counts),
+            'cycles': sum(map(self.opcode_cycles, range(256))),
+            'pcs': len(self.executed_pcs()),
+            'functions': len(self.function_cycles()),
+            'calls': sum(self.calls.values())
+        }
+
+    # ==================== RELATÓRIOS ====================
+
+    def print_report(self, limit=15):
+        """Imprime pontos quentes, opcodes, blocos básicos e funções."""
+        decoder = self.sim.decoder
+        memory = self.sim.memory
+        total = sum(map(self.opcode_cycles, range(256))) or 1
+
+        print("\n" + "=" * 70)
+        print("PERFIL DE EXECUÇÃO")
+        print("=" * 70)
+
+        hot = sorted(self.executed_pcs(),
+                     key=lambda pc: (-self.pc_cycles(pc), pc))[:limit]
+        print(f"\nPontos quentes (top {len(hot)} por ciclos):")
+        print(f"  {'PC':>8} {'Execuções':>10} {'Ciclos':>10} {'%':>6}  Instrução")
+        for pc in hot:
+            text = decoder.format_instruction(decoder.decode(memory.read(pc))).rstrip()
+            spent = self.pc_cycles(pc)
+            print(f"  {pc:8d} {self.count(pc):10d} {spent:10d} "
+                  f"{100 * spent / total:5.1f}%  {text}")
+
+        opcodes = sorted((op for op in range(256) if self.opcode_counts[op]),
+                         key=lambda op: -self.opcode_cycles(op))
+        print("\nPor opcode:")
+        print(f"  {'Opcode':<8} {'Execuções':>10} {'Ciclos':>10} {'%':>6}")
+        for op in opcodes:
+            spent = self.opcode_cycles(op)
+            print(f"  {decoder.get_mnemonic(op):<8} {self.opcode_counts[op]:10d} "
+                  f"{spent:10d} {100 * spent / total:5.1f}%")
+
+        blocks = sorted(self.basic_blocks(), key=lambda b: (-b[3], b[0]))[:limit]
+        print(f"\nBlocos básicos (top {len(blocks)} por ciclos):")
+        print(f"  {'Início':>8} {'Instr.':>6} {'Execuções':>10} {'Ciclos':>10} {'%':>6}")
+        for start, length, executions, spent in blocks:
+            print(f"  {start:8d} {length:6d} {executions:10d} {spent:10d} "
+                  f"{100 * spent / total:5.1f}%")
+
+        functions = sorted(self.function_cycles().items(),
+                           key=lambda item: (-item[1][1], item[0]))[:limit]
+        print("\nFunções (JAL/JR R31):")
+        print(f"  {'Função':<12} {'Exclusivos':>10} {'Inclusivos':>10} {'%':>6}")
+        for func, (own, inclusive) in functions:
+            print(f"  {function_name(func):<12} {own:10d} {inclusive:10d} "
+                  f"{100 * inclusive / total:5.1f}%")
+
+        if self.calls:
+            print("\nChamadas:")
+            for (caller, callee), count in sorted(self.calls.items(),
+                                                   key=lambda item: -item[1]):
+                print(f"  {function_name(caller)} -> {function_name(callee)}: "
+                      f"{count}")
+
+    def write_collapsed(self, filename):
+        """
+        Grava pilhas colapsadas (uma linha 'f1;f2;f3 ciclos' por pilha).
+        Retorna o número de linhas.
+        """
+        lines = [';'.join(function_name(func) for func in stack) + f" {spent}"
+                 for stack, spent in sorted(self.stacks.items()) if spent]
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + ('\n' if lines else ''))
+        return len(lines)
@@ -0,0 +1,142 @@
+"""
+program_image.py - Imagem Binária Empacotada de Programas
+
+Formato (todos os campos big-endian):
+
+    Cabeçalho (16 bytes)
+        magic      4 bytes  b'URIS'
+        versão     u16      1
+        flags      u16      bit 0: possui ponto de entrada
+        entrada    u32      PC inicial (válido se flag bit 0)
+        segmentos  u32      número de segmentos
+    Tabela de segmentos (12 bytes cada)
+        endereço   u32      endereço de carga (palavra)
+        tamanho    u32      número de palavras
+        offset     u32      posição dos dados no arquivo (bytes)
+    Dados
+        palavras de 32 bits de cada segmento
+
+Cada palavra ocupa 4 bytes (contra 33 no formato texto). O carregamento
+mapeia o arquivo com mmap e copia cada segmento inteiro para a memória.
+O assembler grava imagens por este módulo (interpretador/image_writer.py).
+"""
+
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+IMAGE_MAGIC = b'URIS'
+IMAGE_VERSION = 1
+FLAG_HAS_ENTRY = 0x0001
+
+HEADER = struct.Struct('>4sHHII')
+SEGMENT = struct.Struct('>III')
+
+# Resumo de uma imagem carregada
+ImageInfo = namedtuple('ImageInfo', ['entry', 'segments', 'words'])
+
+
+class ImageFormatError(Exception):
+    """Exceção para imagens inválidas ou corrompidas."""
+    pass
+
+
+# ==================== ESCRITA ====================
+
+def encode_image(segments, entry=None):
+    """
+    Gera imagem empacotada.
+
+    Args:
+        segments: lista de (endereço, palavras); palavras pode ser lista de
+                  inteiros ou array de 32 bits
+        entry: ponto de entrada opcional
+
+    Retorna: bytes da imagem
+    """
+    flags = FLAG_HAS_ENTRY if entry is not None else 0
+    header = HEADER.pack(IMAGE_MAGIC, IMAGE_VERSION, flags,
+                         entry or 0, len(segments))
+
+    table = []
+    data = []
+    offset = HEADER.size + SEGMENT.size * len(segments)
+    for address, words in segments:
+        table.append(SEGMENT.pack(address, len(words), offset))
+        data.append(struct.pack(f'>{len(words)}I', *words))
+        offset += 4 * len(words)
+
+    return header + b''.join(table) + b''.join(data)
+
+
+def write_image_file(filename, segments, entry=None):
+    """Grava imagem empacotada em arquivo. Retorna tamanho em bytes."""
+    image = encode_image(segments, entry)
+    with open(filename, 'wb') as f:
+        f.write(image)
+    return len(image)
+
+
+# ==================== LEITURA ====================
+
+def is_packed_image(filename):
+    """Verifica (pelo magic) se o arquivo é uma imagem empacotada."""
+    try:
+        with open(filename, 'rb') as f:
+            return f.read(len(IMAGE_MAGIC)) == IMAGE_MAGIC
+    except OSError:
+        return False
+
+
+def parse_image(buffer):
+    """
+    Valida cabeçalho e tabela de segmentos.
+
+    Retorna: (entrada ou None, lista de (endereço, tamanho, offset))
+    """
+    if len(buffer) < HEADER.size:
+        raise ImageFormatError("Arquivo menor que o cabeçalho da imagem")
+
+    magic, version, flags, entry, count = HEADER.unpack_from(buffer, 0)
+    if magic != IMAGE_MAGIC:
+        raise ImageFormatError("Magic inválido (não é imagem UFLA-RISC)")
+    if version != IMAGE_VERSION:
+        raise ImageFormatError(f"Versão de imagem não suportada: {version}")
+
+    table_end = HEADER.size + SEGMENT.size * count
+    if len(buffer) < table_end:
+        raise ImageFormatError("Tabela de segmentos truncada")
+
+    segments = []
+    for i in range(count):
+        address, length, offset = SEGMENT.unpack_from(
+            buffer, HEADER.size + SEGMENT.size * i)
+        if offset < table_end or offset + 4 * length > len(buffer):
+            raise ImageFormatError(f"Segmento {i} fora dos limites do arquivo")
+        segments.append((address, length, offset))
+
+    return (entry if flags & FLAG_HAS_ENTRY else None), segments
+
+
+def load_image_buffer(memory, buffer):
+    """
+    Copia os segmentos de uma imagem (bytes, mmap...) para a memória.
+    Retorna ImageInfo.
+    """
+    entry, segments = parse_image(buffer)
+    words = 0
+    with memoryview(buffer) as view:
+        for address, length, offset in segments:
+            memory.load_bytes(address, view[offset:offset + 4 * length])
+            words += length
+    return ImageInfo(entry, [(a, n) for a, n, _ in segments], words)
+
+
+def load_image_file(memory, filename):
+    """Carrega imagem de arquivo via mmap. Retorna ImageInfo."""
+    with open(filename, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ImageFormatError("Arquivo vazio")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return load_image_buffer(memory, mapped)
@@ -0,0 +1,406 @@
+"""
+reverse.py - Execução Reversa
+
+Grava a execução instrução a instrução com o diário de alterações
+(journal.py), que guarda o valor antigo de cada escrita em registrador,
+PC, IR, flags e memória. O histórico é dividido em segmentos de N
+instruções; cada segmento começa com um checkpoint completo em memória
+(checkpoint.encode_checkpoint) e guarda seu trecho do diário e, por
+instrução, a posição no diário, o PC, o ciclo e o nº de instruções.
+
+Voltar dentro de um segmento desfaz entradas do diário, em O(alterações).
+Quando o histórico passa do orçamento de memória, descartam-se primeiro
+os diários dos segmentos mais antigos (o checkpoint permite reconstruí-los
+por reexecução, já que a simulação é determinística) e depois os
+próprios segmentos mais antigos.
+
+Uso:
+    debugger = sim.enable_reverse(interval=10000, budget=64 << 20)
+    debugger.run(max_cycles)            # grava enquanto executa
+    debugger.reverse_step()             # volta uma instrução
+    debugger.reverse_continue()         # volta até breakpoint/watchpoint
+    debugger.run_to_cycle(12345)        # para frente ou para trás
+
+Todas as operações devolvem um StopReason (ver breakpoints.py).
+"""
+
+from array import array
+from bisect import bisect_right
+
+from breakpoints import (STOP_BREAKPOINT, STOP_CYCLE, STOP_HALT,
+                         STOP_HISTORY_START, STOP_LIMIT, STOP_STEP, STOP_TRAP,
+                         STOP_WATCH_WRITE, WATCH_WRITE, StopReason,
+                         run_with_stops)
+from checkpoint import encode_checkpoint, restore_checkpoint
+from journal import ENTRY_SIZE, KIND_FLAGS, KIND_IR, KIND_MEM, KIND_PC, KIND_REG
+from memory import new_word_array
+
+DEFAULT_INTERVAL = 10000          # instruções por segmento
+DEFAULT_BUDGET = 64 * 1024 * 1024  # bytes
+
+# Estimativas de memória do histórico
+ENTRY_BYTES = 120       # entrada do diário (4 itens de lista + inteiros)
+INSTRUCTION_BYTES = 28  # posição, ciclo, nº de instruções e PC
+
+
+class Segment:
+    """Trecho do histórico que começa num checkpoint."""
+
+    def __init__(self, start, cycle, snapshot):
+        self.start = start         # posição da primeira instrução
+        self.end = start           # posição depois da última gravada
+        self.cycle = cycle         # cycle_counter em start
+        self.snapshot = snapshot   # checkpoint do estado em start
+        self.has_log = True
+        self.clear_log()
+
+    def clear_log(self):
+        """Esvazia o diário e os dados por instrução."""
+        self.entries = []              # diário plano (ver journal.py)
+        self.marks = array('Q')        # posição no diário antes da instrução
+        self.cycles = array('Q')       # cycle_counter antes da instrução
+        self.counts = array('Q')       # instruction_count antes da instrução
+        self.pcs = new_word_array(0)   # PC da instrução
+
+    def drop_log(self):
+        """Descarta o diário (o segmento passa a exigir reexecução)."""
+        self.clear_log()
+        self.has_log = False
+
+    def memory_size(self):
+        """Estimativa de bytes usados pelo segmento."""
+        return (len(self.snapshot) + ENTRY_BYTES * len(self.entries) // ENTRY_SIZE +
+                INSTRUCTION_BYTES * len(self.marks))
+
+
+class ReverseDebugger:
+    """Gravação e navegação no histórico de execução de um Simulator."""
+
+    def __init__(self, sim, interval=DEFAULT_INTERVAL, budget=DEFAULT_BUDGET):
+        """
+        Args:
+            interval: instruções entre checkpoints completos
+            budget: bytes aproximados para checkpoints e diários
+        """
+        if interval < 1:
+            raise ValueError(f"Intervalo de checkpoints inválido: {interval}")
+        self.sim = sim
+        self.interval = interval
+        self.budget = budget
+        self.journal = sim.enable_journal()
+        self.reset()
+
+    def reset(self):
+        """Descarta o histórico; o estado atual passa a ser o início."""
+        self.segments = []
+        self.dropped_segments = 0
+        self._new_segment()
+
+    @property
+    def position(self):
+        """Nº de instruções gravadas desde o início do histórico."""
+        return self.segments[-1].end
+
+    @property
+    def history_start(self):
+        """Posição mais antiga ainda alcançável."""
+        return self.segments[0].start
+
+    # ==================== GRAVAÇÃO ====================
+
+    def _new_segment(self):
+        """Abre segmento com checkpoint do estado atual."""
+        start = self.segments[-1].end if self.segments else 0
+        segment = Segment(start, self.sim.cycle_counter,
+                          encode_checkpoint(self.sim))
+        self.segments.append(segment)
+        self.journal.buffer = segment.entries
+        self._enforce_budget()
+        return segment
+
+    def step_forward(self):
+        """
+        Executa e grava uma instrução. Retorna False se a CPU estiver
+        parada (mesma convenção de Simulator.execute_instruction).
+        """
+        sim = self.sim
+        if sim.halted:
+            return False
+        segment = self.segments[-1]
+        if segment.end - segment.start >= self.interval:
+            segment = self._new_segment()
+        segment.marks.append(len(segment.entries))
+        segment.cycles.append(sim.cycle_counter)
+        segment.counts.append(sim.instruction_count)
+        segment.pcs.append(sim.cpu.PC & sim.address_mask)
+        sim.execute_instruction()
+        segment.end += 1
+        return True
+
+    def run(self, max_cycles=100000):
+        """
+        Executa gravando até HALT, breakpoint, watchpoint ou max_cycles
+        (total acumulado). O breakpoint no PC atual é ignorado.
+        """
+        sim = self.sim
+        stop = run_with_stops(sim, max_cycles - sim.STAGES_PER_INSTRUCTION,
+                              sim.cpu.PC & sim.address_mask, self.step_forward)
+        if stop is None:
+            stop = self._end_stop(STOP_LIMIT)
+        sim.stop_reason = stop
+        return stop
+
+    def _enforce_budget(self):
+        """Descarta o histórico mais antigo até caber no orçamento."""
+        segments = self.segments
+        total = sum(segment.memory_size() for segment in segments)
+        for segment in segments[:-1]:
+            if total <= self.budget:
+                return
+            if segment.has_log:
+                total -= segment.memory_size()
+                segment.drop_log()
+                total += segment.memory_size()
+        while total > self.budget and len(segments) > 1:
+            total -= segments.pop(0).memory_size()
+            self.dropped_segments += 1
+
+    def memory_size(self):
+        """Estimativa de bytes usados pelo histórico."""
+        return sum(segment.memory_size() for segment in self.segments)
+
+    def get_stats(self):
+        """Alcance e custo do histórico."""
+        return {
+            'position': self.position,
+            'history_start': self.history_start,
+            'segments': len(self.segments),
+            'dropped_segments': self.dropped_segments,
+            'bytes': self.memory_size(),
+            'budget': self.budget
+        }
+
+    def print_stats(self):
+        """Imprime resumo do histórico gravado."""
+        stats = self.get_stats()
+        print(f"Histórico reverso: instruções {stats['history_start']}.."
+              f"{stats['position']} alcançáveis, {stats['segments']} "
+              f"checkpoints, {stats['bytes'] / 1024:.1f} KB de "
+              f"{stats['budget'] / 1024:.0f} KB")
+        if stats['dropped_segments']:
+            print(f"  {stats['dropped_segments']} checkpoints antigos "
+                  f"descartados pelo orçamento")
+
+    # ==================== NAVEGAÇÃO ====================
+
+    def goto(self, position):
+        """
+        Leva a máquina ao estado antes da instrução de nº position.
+        Posições futuras são alcançadas executando (e gravando).
+        Retorna a posição alcançada.
+        """
+        position = max(position, self.history_start)
+        while self.position < position:
+            if not self.step_forward():
+                return self.position
+        if position == self.position:
+            return position
+
+        segments = self.segments
+        index = bisect_right([segment.start for segment in segments],
+                             position) - 1
+        segment = segments[index]
+        if index == len(segments) - 1:
+            self._undo(segment, position)
+        elif segment.has_log:
+            # O checkpoint do segmento seguinte é o estado no fim deste
+            self._restore(segments[index + 1].snapshot)
+            del segments[index + 1:]
+            self.journal.buffer = segment.entries
+            self._undo(segment, position)
+        else:
+            del segments[index + 1:]
+            self._replay(segment, position)
+        return self.position
+
+    def _replay(self, segment, position):
+        """
+        Reconstrói o diário do último segmento (sem diário) a partir do
+        checkpoint, reexecutando até position.
+        """
+        self._restore(segment.snapshot)
+        segment.clear_log()
+        segment.has_log = True
+        segment.end = segment.start
+        self.journal.buffer = segment.entries
+        while self.position < position:
+            if not self.step_forward():
+                break
+
+    def _retreat(self):
+        """
+        No início do último segmento, descarta-o e torna o anterior o
+        último (com diário). O estado não muda.
+        """
+        segment = self.segments.pop()
+        previous = self.segments[-1]
+        if previous.has_log:
+            self.journal.buffer = previous.entries
+        else:
+            self._replay(previous, segment.start)
+
+    def _restore(self, snapshot):
+        """Restaura checkpoint mantendo os breakpoints atuais."""
+        memory = self.sim.memory
+        breakpoints = set(memory.breakpoints)
+        restore_checkpoint(self.sim, snapshot)
+        memory.set_breakpoints(breakpoints)
+        self._clear_stop()
+
+    def _undo(self, segment, position):
+        """Desfaz as instruções do último segmento a partir de position."""
+        sim = self.sim
+        cpu = sim.cpu
+        memory = sim.memory
+        entries = segment.entries
+        offset = position - segment.start
+        mark = segment.marks[offset]
+
+        memory.journal = None
+        for pos in range(len(entries) - ENTRY_SIZE, mark - 1, -ENTRY_SIZE):
+            kind, index, old = entries[pos], entries[pos + 1], entries[pos + 2]
+            if kind == KIND_REG:
+                cpu.regs[index] = old
+            elif kind == KIND_MEM:
+                memory.write(index, old)
+            elif kind == KIND_PC:
+                cpu.PC = old
+            elif kind == KIND_IR:
+                cpu.IR = old
+            elif kind == KIND_FLAGS:
+                cpu.flag_state = old
+        memory.journal = self.journal
+        del entries[mark:]
+
+        sim.alu.flag_state = cpu.flag_state
+        sim.cycle_counter = segment.cycles[offset]
+        sim.instruction_count = segment.counts[offset]
+        sim.halted = False
+        sim.current_stage = 'IF'
+        self._clear_stop()
+        for column in (segment.marks, segment.cycles, segment.counts,
+                       segment.pcs):
+            del column[offset:]
+        segment.end = position
+
+    def _clear_stop(self):
+        """Esquece HALT/trap e a última parada ao voltar para antes deles."""
+        sim = self.sim
+        if not sim.halted:
+            sim.trap = None
+        sim.stop_reason = None
+
+    def _end_stop(self, kind):
+        """StopReason de opcode inválido ou HALT, se a CPU parou; senão kind."""
+        sim = self.sim
+        if sim.trap is not None:
+            return StopReason(STOP_TRAP, sim.trap[0], sim.cycle_counter,
+                              sim.instruction_count)
+        if sim.halted:
+            return self._stop(STOP_HALT)
+        return self._stop(kind)
+
+    def _stop(self, kind, **details):
+        """StopReason do estado atual."""
+        sim = self.sim
+        return StopReason(kind, sim.cpu.PC & sim.address_mask,
+                          sim.cycle_counter, sim.instruction_count, **details)
+
+    # ==================== OPERAÇÕES REVERSAS ====================
+
+    def reverse_step(self, count=1):
+        """Volta count instruções."""
+        target = self.position - count
+        self.goto(target)
+        if target < self.history_start:
+            return self._stop(STOP_HISTORY_START)
+        return self._stop(STOP_STEP)
+
+    def reverse_continue(self):
+        """
+        Volta até a parada anterior mais recente: antes de uma instrução
+        em PC com breakpoint ou logo depois de um STORE em endereço com
+        watchpoint de escrita. Sem nenhuma, para no início do histórico.
+        """
+        breaks = self.sim.memory.breakpoint_map()
+        watchpoints = self.sim.watchpoints
+        watches = watchpoints.map() if watchpoints else None
+        origin = self.position
+
+        # Segmento a segmento, do mais recente ao mais antigo (o último
+        # segmento sempre tem diário)
+        while True:
+            segment = self.segments[-1]
+            hit = self._find_stop(segment, origin, breaks, watches)
+            if hit is not None:
+                position, kind, address, value = hit
+                self.goto(position)
+                if kind == STOP_BREAKPOINT:
+                    return self._stop(kind)
+                return self._stop(kind, address=address, value=value,
+                                  watchpoint=watchpoints.find(address,
+                                                              WATCH_WRITE))
+            self.goto(segment.start)
+            if len(self.segments) == 1:
+                return self._stop(STOP_HISTORY_START)
+            self._retreat()
+
+    def _find_stop(self, segment, origin, breaks, watches):
+        """
+        Parada mais recente do segmento antes da posição origin:
+        (posição, tipo, endereço, valor) ou None.
+        """
+        entries = segment.entries
+        marks = segment.marks
+        pcs = segment.pcs
+        for offset in range(segment.end - 1 - segment.start, -1, -1):
+            position = segment.start + offset
+            # Escrita observada: para depois da instrução
+            if watches is not None and position + 1 < origin:
+                end = marks[offset + 1] if offset + 1 < len(marks) else len(entries)
+                for pos in range(end - ENTRY_SIZE, marks[offset] - 1, -ENTRY_SIZE):
+                    if (entries[pos] == KIND_MEM and
+                            watches[entries[pos + 1]] & WATCH_WRITE):
+                        return (position + 1, STOP_WATCH_WRITE,
+                                entries[pos + 1], entries[pos + 3])
+            if breaks[pcs[offset]]:
+                return (position, STOP_BREAKPOINT, None, None)
+        return None
+
+    def run_to_cycle(self, cycle):
+        """
+        Leva a máquina à última fronteira de instrução com
+        cycle_counter <= cycle (para frente ou para trás).
+        """
+        sim = self.sim
+        if cycle >= sim.cycle_counter:
+            while sim.cycle_counter + sim.STAGES_PER_INSTRUCTION <= cycle:
+                if not self.step_forward():
+                    break
+            return self._end_stop(STOP_CYCLE)
+
+        segments = self.segments
+        index = bisect_right([segment.cycle for segment in segments], cycle) - 1
+        if index < 0:
+            self.goto(self.history_start)
+            return self._stop(STOP_HISTORY_START)
+        segment = segments[index]
+        if segment.has_log:
+            offset = max(bisect_right(segment.cycles, cycle) - 1, 0)
+            self.goto(segment.start + offset)
+        else:
+            self.goto(segment.start)
+            while sim.cycle_counter + sim.STAGES_PER_INSTRUCTION <= cycle:
+                if not self.step_forward():
+                    break
+        return self._end_stop(STOP_CYCLE)
@@ -3,36 +3,131 @@ simulator.py - Simulador com Pipeline de 4 Estágios
 
 """
 
+import math
+import time
+
 from alu import ALU
+from binary_trace import TraceWriter
+from breakpoints import (STOP_HALT, STOP_INSTRUCTIONS, STOP_LIMIT,
+                         STOP_TIMEOUT, STOP_TRAP, StopReason, WatchpointIndex,
+                         run_with_stops)
+from cache import CachePort
+from checkpoint import load_checkpoint, save_checkpoint
 from control_unit import ControlUnit
 from cpu_state import CPUState
+from decode_cache import DecodeCache
 from instruction_decoder import InstructionDecoder
+from journal import KIND_IR, KIND_MEM, KIND_PC, KIND_REG, ChangeJournal
 from memory import Memory
+from pipeline import PipelineEngine
+from profiler import Profiler
+from reverse import DEFAULT_BUDGET, DEFAULT_INTERVAL, ReverseDebugger
+from translator import BlockTranslator
+from utils import MASK32
 
 
 class Simulator:
-    def __init__(self, verbose=False):
+    # Modos de execução
+    MODE_STAGED = 'staged'  # Um estágio por chamada (didático)
+    MODE_FAST = 'fast'      # Uma instrução completa por iteração
+    MODE_TRANSLATE = 'translate'  # Blocos básicos traduzidos para Python
+    MODE_PIPELINE = 'pipeline'    # Estágios sobrepostos (temporização)
+    MODES = (MODE_STAGED, MODE_FAST, MODE_TRANSLATE, MODE_PIPELINE)
+
+    # Ciclos por instrução no modelo sequencial de 4 estágios
+    STAGES_PER_INSTRUCTION = 4
+
+    # Com limite de tempo, instruções entre consultas ao relógio
+    TIMEOUT_SLICE = 4096
+
+    def __init__(self, verbose=False, mode=MODE_STAGED, memory=None,
+                 forwarding=True, predictor=None, caches=None, profile=False,
+                 trace=None):
         """
         Inicializa simulador.
 
         Args:
             verbose: Se True, imprime cada ciclo. Se False, apenas resumo.
+            mode: 'staged' (estágio a estágio), 'fast' (instrução a
+                  instrução), 'translate' (blocos básicos traduzidos) ou
+                  'pipeline' (estágios sobrepostos, ver pipeline.py).
+                  O modo verboso usa 'staged', exceto com 'pipeline'.
+            memory: memória a usar (ex.: PagedMemory com espaço de 24
+                    bits); padrão: Memory() de 64K palavras.
+            forwarding: no modo 'pipeline', ativa os caminhos de
+                        forwarding (sem eles, hazards RAW geram stalls).
+            predictor: preditor de desvios (ver branch_predictor.py);
+                       no modo 'pipeline' também guia a busca.
+            caches: CacheHierarchy (ver cache.py) entre os estágios e a
+                    memória; no modo 'pipeline' as faltas geram stalls.
+            profile: contabiliza execuções e ciclos por PC, opcode, bloco
+                     básico e função (ver profiler.py); executa instrução
+                     a instrução, como o modo 'fast'.
+            trace: arquivo de rastro binário (ver binary_trace.py); um
+                   evento por instrução, executando como o modo 'fast'.
         """
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de execução inválido: {mode}")
+        if profile and (mode == self.MODE_PIPELINE or verbose):
+            raise ValueError("Perfil de execução indisponível nos modos "
+                             "pipeline e verboso")
+        if trace is not None and (mode == self.MODE_PIPELINE or verbose or
+                                  profile):
+            raise ValueError("Rastro binário indisponível nos modos pipeline "
+                             "e verboso e junto com o perfil")
+
         self.cpu = CPUState()
-        self.memory = Memory()
-        self.alu = ALU()
+        self.memory = memory if memory is not None else Memory()
+        self.address_mask = self.memory.address_mask
+        # Divisão por zero só é avisada na hora no modo verboso; nos demais
+        # run() informa o total (alu.zero_divisions)
+        self.alu = ALU(warnings=verbose)
         self.decoder = InstructionDecoder()
-        self.control = ControlUnit(self.cpu)
+        self.predictor = predictor
+        self.control = ControlUnit(self.cpu, self.address_mask, predictor)
+        self.decode_cache = DecodeCache(self.decoder, self.memory.size)
+        self.exec_table = list(self.EXEC_TABLE)
+        self.translator = None
+        if mode == self.MODE_TRANSLATE:
+            self.translator = BlockTranslator(self.memory, self.decoder)
+            self.memory.add_observer(self.translator)
+        self.memory.add_observer(self.decode_cache)
+
+        # Portas de acesso da busca e de LOAD/STORE (a própria memória ou
+        # uma CachePort, que contabiliza o acesso na hierarquia de caches)
+        self.caches = caches
+        self.fetch_port = self.data_port = self.memory
+        if caches is not None:
+            if caches.instruction_cache() is not None:
+                self.fetch_port = CachePort(self.memory,
+                                            caches.instruction_cache())
+            if caches.data_cache() is not None:
+                self.data_port = CachePort(self.memory, caches.data_cache())
+
+        self.pipeline = None
+        if mode == self.MODE_PIPELINE:
+            self.pipeline = PipelineEngine(self, forwarding)
+        self.profiler = Profiler(self) if profile else None
+        self.tracer = None
+        # Breakpoints ficam em memory.breakpoints; watchpoints aqui
+        self.watchpoints = WatchpointIndex(self.memory.size)
+        self.stop_reason = None
+        self._stop_points = False
+        self._skip_pc = None
+        self.reverse = None
         self.halted = False
+        self.trap = None  # (endereço, instrução) do opcode inválido
         self.cycle_counter = 0
         self.instruction_count = 0
         self.verbose = verbose
+        self.mode = mode
 
         # Controle de pipeline
         self.current_stage = 'IF'
         self.stage_counter = 0
 
         # Registradores de estágio
+        self.fetch_address = 0
         self.decoded = None
         self.opcode = 0
         self.ra = self.rb = self.rc = 0
@@ -44,16 +139,90 @@ class Simulator:
         self.mem_data = 0
         self.is_halt_instruction = False
 
-        # Snapshot para detectar mudanças
-        self.previous_state = None
+        # Diário de alterações (substitui snapshots por ciclo)
+        self.journal = None
+        if verbose:
+            self.enable_journal()
+
+        if trace is not None:
+            self.tracer = TraceWriter(self, trace)
+
+    def enable_journal(self):
+        """Ativa diário de alterações na CPU e na memória."""
+        if self.journal is None:
+            self.journal = ChangeJournal()
+        self.cpu.journal = self.journal
+        self.memory.journal = self.journal
+        return self.journal
+
+    def disable_journal(self):
+        """Desativa diário de alterações."""
+        self.journal = None
+        self.cpu.journal = None
+        self.memory.journal = None
+
+    def last_changes(self):
+        """Retorna alterações registradas no diário (ver ChangeJournal.summarize)."""
+        return self.journal.summarize() if self.journal is not None else None
+
+    # ==================== BREAKPOINTS E WATCHPOINTS ====================
+
+    def add_breakpoint(self, address):
+        """Para antes de executar a instrução em address."""
+        self.memory.add_breakpoint(address)
+
+    def remove_breakpoint(self, address):
+        """Remove breakpoint de address."""
+        self.memory.remove_breakpoint(address)
+
+    def add_watchpoint(self, start, end=None, kind='rw'):
+        """
+        Para depois de um LOAD ('r'), STORE ('w') ou ambos ('rw') em
+        endereço de start a end (inclusive).
+        """
+        self.watchpoints.add(start, end, kind)
+
+    def remove_watchpoint(self, start, end=None):
+        """Remove watchpoint com exatamente esse intervalo."""
+        return self.watchpoints.remove(start, end)
+
+    def has_stop_points(self):
+        """True se houver algum breakpoint ou watchpoint definido."""
+        return bool(self.memory.breakpoints) or bool(self.watchpoints)
+
+    # ==================== EXECUÇÃO REVERSA ====================
+
+    def enable_reverse(self, interval=DEFAULT_INTERVAL, budget=DEFAULT_BUDGET):
+        """
+        Passa a gravar o histórico de execução (ver reverse.py) e retorna
+        o ReverseDebugger (reverse_step, reverse_continue, run_to_cycle).
+        """
+        if (self.mode == self.MODE_PIPELINE or self.verbose or
+                self.profiler is not None or self.tracer is not None):
+            raise ValueError("Execução reversa indisponível nos modos "
+                             "pipeline e verboso e com perfil ou rastro")
+        if self.reverse is None:
+            self.reverse = ReverseDebugger(self, interval, budget)
+        return self.reverse
+
+    # ==================== CHECKPOINT ====================
+
+    def save_checkpoint(self, filename, codec='zlib'):
+        """Grava estado completo da máquina (ver checkpoint.py)."""
+        return save_checkpoint(self, filename, codec)
+
+    def restore_checkpoint(self, filename):
+        """Restaura estado completo da máquina; continuar com run(resume=True)."""
+        load_checkpoint(self, filename)
 
     def execute_cycle(self):
         """Executa UM ciclo de clock (um estágio)"""
         if self.halted:
             return False
 
-        # Capturar estado antes do ciclo
-        self.previous_state = self.cpu.snapshot()
+        # Diário do ciclo (apenas para exibição)
+        if self.verbose:
+            self.journal.clear()
 
         # Executar estágio apropriado
         if self.current_stage == 'IF':
@@ -84,16 +253,101 @@ class Simulator:
         self.cycle_counter += 1
         return True
 
+    def execute_instruction(self):
+        """
+        Executa UMA instrução completa (modo rápido).
+
+        Equivale a quatro chamadas de execute_cycle a partir do estágio IF,
+        sem controle por estágio: os ciclos são contabilizados
+        aritmeticamente (4 por instrução; 3 se o opcode for inválido, pois
+        a simulação para no EX/MEM).
+        """
+        if self.halted:
+            return False
+
+        # IF
+        cpu = self.cpu
+        pc = cpu.PC
+        self.fetch_address = pc & self.address_mask
+        if cpu.journal is None:
+            cpu.IR = self.fetch_port.read(pc)
+            cpu.PC = (pc + 1) & MASK32
+        else:
+            cpu.set_ir(self.fetch_port.read(pc))
+            cpu.set_pc(pc + 1)
+
+        # ID + EX/MEM
+        self.stage_id()
+        self.stage_ex_mem()
+        if self.halted:
+            self.current_stage = 'WB'
+            self.cycle_counter += self.STAGES_PER_INSTRUCTION - 1
+            return True
+
+        # WB
+        if self.write_enable and self.rc != 0:
+            if self.opcode == 0x10:
+                cpu.write_register(self.rc, self.mem_data)
+            else:
+                cpu.write_register(self.rc, self.alu_result)
+        if self.is_halt_instruction:
+            self.halted = True
+
+        self.cycle_counter += self.STAGES_PER_INSTRUCTION
+        self.instruction_count += 1
+        return True
+
+    def execute_block(self, max_cycles):
+        """
+        Executa o bloco básico traduzido que começa no PC atual.
+
+        Se não houver bloco (código ainda frio ou não traduzível), se o
+        bloco ultrapassar max_cycles ou se houver diário ativo (blocos
+        escrevem direto nos registradores), executa uma única instrução.
+        Retorna False se a CPU já estiver parada.
+        """
+        if self.halted:
+            return False
+
+        cpu = self.cpu
+        if cpu.journal is not None:
+            return self.execute_instruction()
+        block = self.translator.lookup(cpu.PC)
+        if block is None or (self.cycle_counter +
+                             block.length * self.STAGES_PER_INSTRUCTION
+                             > max_cycles):
+            return self.execute_instruction()
+
+        if self.fetch_port is not self.memory:
+            pc = cpu.PC
+            for i in range(block.length):
+                self.fetch_port.read(pc + i)
+        if block.function(cpu.regs, cpu, self.alu, self.data_port):
+            self.halted = True
+        if block.branch is not None:
+            pc, is_beq, ra, rb, target = block.branch
+            taken = (cpu.regs[ra] == cpu.regs[rb]) == is_beq
+            self.control.resolve_branch(taken, target, pc)
+        self.cycle_counter += block.length * self.STAGES_PER_INSTRUCTION
+        self.instruction_count += block.length
+        return True
+
     def print_cycle_changes(self, stage_name):
-        """Imprime modificações ocorridas no ciclo (MODO VERBOSO)"""
+        """
+        Imprime modificações ocorridas no ciclo (MODO VERBOSO).
+        Escritas em PC, IR, memória e registradores vêm do diário do ciclo.
+        """
+        journal = self.journal
         print(f"\n{'='*70}")
         print(f"CICLO {self.cycle_counter + 1} - Estágio: {stage_name}")
         print(f"Instrução #{self.instruction_count + 1}")
         print(f"{'='*70}")
 
         if stage_name == 'IF':
-            print(f"IR <- 0x{self.cpu.get_ir():08x}")
-            print(f"PC <- {self.cpu.get_pc()} (0x{self.cpu.get_pc():04x})")
+            for _, _, new in journal.entries_of(KIND_IR):
+                print(f"IR <- 0x{new:08x}")
+            for _, _, new in journal.entries_of(KIND_PC):
+                print(f"PC <- {new} (0x{new:04x})")
             if self.decoded:
                 print(
                     f"Instrução: {self.decoder.format_instruction(self.decoded)}")
@@ -111,14 +365,17 @@ class Simulator:
 
         elif stage_name == 'EX_MEM':
             print("Execução da instrução")
-            if self.opcode == 0x11:
-                addr = self.val_c & 0xFFFF
-                print(f"Memória[{addr}] <- 0x{self.val_a:08x}")
-            elif self.opcode == 0x10:
-                addr = self.val_a & 0xFFFF
+            for addr, _, new in journal.entries_of(KIND_MEM):
+                print(f"Memória[{addr}] <- 0x{new:08x}")
+            if self.opcode == 0x10:
+                addr = self.val_a & self.address_mask
                 print(f"Leitura: Memória[{addr}] = 0x{self.mem_data:08x}")
             elif self.write_enable:
                 print(f"Resultado ALU: 0x{self.alu_result:08x}")
+            for _, _, new in journal.entries_of(KIND_PC):
+                print(f"PC <- {new} (0x{new:04x}) (desvio)")
+            for reg, _, new in journal.entries_of(KIND_REG):
+                print(f"R{reg} <- 0x{new:08x} (link)")
 
             if self.decoder.affects_flags(self.opcode):
                 flags = self.cpu.get_flags_dict()
@@ -126,12 +383,11 @@ class Simulator:
                     f"Flags (CPU): N={flags['neg']} Z={flags['zero']} C={flags['carry']} V={flags['overflow']}")
 
         elif stage_name == 'WB':
-            if self.write_enable and self.rc != 0:
-                if self.opcode == 0x10:
-                    print(f"R{self.rc} <- 0x{self.mem_data:08x} (Write-Back)")
-                else:
-                    print(f"R{self.rc} <- 0x{self.alu_result:08x} (Write-Back)")
-            else:
+            written = False
+            for reg, _, new in journal.entries_of(KIND_REG):
+                print(f"R{reg} <- 0x{new:08x} (Write-Back)")
+                written = True
+            if not written:
                 print("(Sem write-back)")
 
     def stage_if(self):
@@ -139,20 +395,17 @@ class Simulator:
         if self.halted:
             return
         pc = self.cpu.get_pc()
-        instruction = self.memory.read(pc)
+        self.fetch_address = pc & self.address_mask
+        instruction = self.fetch_port.read(pc)
         self.cpu.set_ir(instruction)
         self.cpu.increment_pc()
 
     def stage_id(self):
-        """ID: Decodifica instrução e lê registradores"""
-        self.decoded = self.decoder.decode(self.cpu.get_ir())
-        self.opcode = self.decoded['opcode']
-        self.ra = self.decoded['ra']
-        self.rb = self.decoded['rb']
-        self.rc = self.decoded['rc']
-        self.const16 = self.decoded['const16']
-        self.address = self.decoded['address']
-        self.branch_offset = self.decoded['branch_offset']
+        """ID: Decodifica instrução (via cache) e lê registradores"""
+        self.decoded = self.decode_cache.lookup(
+            self.fetch_address, self.cpu.get_ir())
+        (_, self.opcode, self.ra, self.rb, self.rc,
+         self.const16, self.address, self.branch_offset) = self.decoded
         self.val_a = self.cpu.read_register(self.ra)
         self.val_b = self.cpu.read_register(self.rb)
         self.val_c = self.cpu.read_register(self.rc)
@@ -160,144 +413,169 @@ class Simulator:
     def stage_ex_mem(self):
         """
         EX/MEM: Executa operação e acessa memória
+
+        Despacho em tempo constante pela tabela de 256 entradas
+        (exec_table), indexada pelo opcode.
         """
         self.write_enable = False
         self.alu_result = 0
         self.is_halt_instruction = False
-        op = self.opcode
-
-        # ALU Operations
-        if op == 0x01:  # ADD
-            self.alu_result = self.alu.add(self.val_a, self.val_b)
-            self.write_enable = True
-
-        elif op == 0x02:  # SUB
-            self.alu_result = self.alu.sub(self.val_a, self.val_b)
-            self.write_enable = True
-
-        elif op == 0x03:  # ZEROS
-            self.alu_result = self.alu.zeros()
-            self.write_enable = True
-
-        elif op == 0x04:  # XOR
-            self.alu_result = self.alu.xor(self.val_a, self.val_b)
-            self.write_enable = True
-
-        elif op == 0x05:  # OR
-            self.alu_result = self.alu.or_op(self.val_a, self.val_b)
-            self.write_enable = True
-
-        elif op == 0x06:  # NOT
-            self.alu_result = self.alu.not_op(self.val_a)
-            self.write_enable = True
-
-        elif op == 0x07:  # AND
-            self.alu_result = self.alu.and_op(self.val_a, self.val_b)
-            self.write_enable = True
-
-        elif op in (0x08, 0x09, 0x0A, 0x0B):  # Shifts
-            shift = self.val_b & 0x1F
-            if op == 0x08:
-                self.alu_result = self.alu.asl(self.val_a, shift)
-            elif op == 0x09:
-                self.alu_result = self.alu.asr(self.val_a, shift)
-            elif op == 0x0A:
-                self.alu_result = self.alu.lsl(self.val_a, shift)
-            elif op == 0x0B:
-                self.alu_result = self.alu.lsr(self.val_a, shift)
-            self.write_enable = True
-
-        elif op == 0x0C:  # PASSA
-            self.alu_result = self.alu.copy(self.val_a)
-            self.write_enable = True
-
-        elif op == 0x0E:  # LCH
-            self.alu_result = self.alu.load_const_high(
-                self.val_c, self.const16)
-            self.write_enable = True
-
-        elif op == 0x0F:  # LCL
-            self.alu_result = self.alu.load_const_low(self.val_c, self.const16)
-            self.write_enable = True
-
-        # Memory Operations
-        elif op == 0x10:  # LOAD
-            addr = self.val_a & 0xFFFF
-            self.mem_data = self.memory.read(addr)
-            self.write_enable = True
-
-        elif op == 0x11:  # STORE
-            addr = self.val_c & 0xFFFF
-            self.memory.write(addr, self.val_a)
-
-        # Control Flow
-        elif op == 0x12:  # JAL
-            self.control.jal(self.address)
-
-        elif op == 0x13:  # JR
-            self.control.jr(self.val_c)
-
-        elif op == 0x14:  # BEQ
-            target = self.branch_offset & 0xFF
-            self.control.beq(self.val_a, self.val_b, target)
-
-        elif op == 0x15:  # BNE
-            target = self.branch_offset & 0xFF
-            self.control.bne(self.val_a, self.val_b, target)
-
-        elif op == 0x16:  # J
-            self.control.j(self.address)
-
-        # Additional Instructions
-        elif op == 0x17:  # SLT
-            self.alu_result = self.alu.slt(self.val_a, self.val_b)
-            self.write_enable = True
-
-        elif op == 0x18:  # MUL
-            self.alu_result = self.alu.mul(self.val_a, self.val_b)
-            self.write_enable = True
-
-        elif op == 0x19:  # DIV
-            self.alu_result = self.alu.div(self.val_a, self.val_b)
-            self.write_enable = True
-
-        elif op == 0x1A:  # MOD
-            self.alu_result = self.alu.mod(self.val_a, self.val_b)
-            self.write_enable = True
-
-        elif op == 0x1B:  # NEG
-            self.alu_result = self.alu.neg(self.val_a)
-            self.write_enable = True
-
-        elif op == 0x1C:  # INC
-            self.alu_result = self.alu.inc(self.val_a)
-            self.write_enable = True
-
-        elif op == 0x1D:  # DEC
-            self.alu_result = self.alu.dec(self.val_a)
-            self.write_enable = True
-
-        elif op == 0x1E:  # NOP
-            pass
+        self.exec_table[self.opcode](self)
 
-        elif op == 0xFF:  # HALT
-            self.is_halt_instruction = True
+    # ==================== TABELA DE EXECUÇÃO ====================
+    # Cada handler lê os operandos dos registradores de estágio, seleciona
+    # o write-back e, quando for o caso, atualiza os flags da CPU.
 
+    def _commit_flags(self):
+        """Copia flags da ALU para a CPU (sem materializá-los)."""
+        cpu = self.cpu
+        if cpu.journal is None:
+            cpu.flag_state = self.alu.flag_state
         else:
-            print(f"\n⚠️  ERRO: Opcode inválido 0x{op:02x} detectado!")
-            print(f"Instrução: 0x{self.cpu.get_ir():08x}")
-            print(f"PC: {self.cpu.get_pc() - 1}")
-            print("Encerrando simulação...")
-            self.halted = True
-
-        if self.decoder.affects_flags(self.opcode):
-            alu_flags = self.alu.get_flags()
-            self.cpu.set_flags(
-                neg=alu_flags['neg'],
-                zero=alu_flags['zero'],
-                carry=alu_flags['carry'],
-                overflow=alu_flags['overflow']
-            )
+            cpu.set_flag_state(self.alu.flag_state)
+
+    # ALU Operations
+    def _exec_add(self):
+        self.alu_result = self.alu.add(self.val_a, self.val_b)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_sub(self):
+        self.alu_result = self.alu.sub(self.val_a, self.val_b)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_zeros(self):
+        self.alu_result = self.alu.zeros()
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_xor(self):
+        self.alu_result = self.alu.xor(self.val_a, self.val_b)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_or(self):
+        self.alu_result = self.alu.or_op(self.val_a, self.val_b)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_not(self):
+        self.alu_result = self.alu.not_op(self.val_a)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_and(self):
+        self.alu_result = self.alu.and_op(self.val_a, self.val_b)
+        self.write_enable = True
+        self._commit_flags()
+
+    # Shifts
+    def _exec_asl(self):
+        self.alu_result = self.alu.asl(self.val_a, self.val_b & 0x1F)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_asr(self):
+        self.alu_result = self.alu.asr(self.val_a, self.val_b & 0x1F)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_lsl(self):
+        self.alu_result = self.alu.lsl(self.val_a, self.val_b & 0x1F)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_lsr(self):
+        self.alu_result = self.alu.lsr(self.val_a, self.val_b & 0x1F)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_passa(self):
+        self.alu_result = self.alu.copy(self.val_a)
+        self.write_enable = True
+        self._commit_flags()
+
+    # Constantes
+    def _exec_lch(self):
+        self.alu_result = self.alu.load_const_high(self.val_c, self.const16)
+        self.write_enable = True
+
+    def _exec_lcl(self):
+        self.alu_result = self.alu.load_const_low(self.val_c, self.const16)
+        self.write_enable = True
+
+    # Memory Operations
+    def _exec_load(self):
+        self.mem_data = self.data_port.read(self.val_a & self.address_mask)
+        self.write_enable = True
+
+    def _exec_store(self):
+        self.data_port.write(self.val_c & self.address_mask, self.val_a)
+
+    # Control Flow
+    def _exec_jal(self):
+        self.control.jal(self.address)
+
+    def _exec_jr(self):
+        self.control.jr(self.val_c)
+
+    def _exec_beq(self):
+        self.control.beq(self.val_a, self.val_b, self.branch_offset & 0xFF)
+
+    def _exec_bne(self):
+        self.control.bne(self.val_a, self.val_b, self.branch_offset & 0xFF)
+
+    def _exec_j(self):
+        self.control.j(self.address)
+
+    # Additional Instructions
+    def _exec_slt(self):
+        self.alu_result = self.alu.slt(self.val_a, self.val_b)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_mul(self):
+        self.alu_result = self.alu.mul(self.val_a, self.val_b)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_div(self):
+        self.alu_result = self.alu.div(self.val_a, self.val_b)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_mod(self):
+        self.alu_result = self.alu.mod(self.val_a, self.val_b)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_neg(self):
+        self.alu_result = self.alu.neg(self.val_a)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_inc(self):
+        self.alu_result = self.alu.inc(self.val_a)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_dec(self):
+        self.alu_result = self.alu.dec(self.val_a)
+        self.write_enable = True
+        self._commit_flags()
+
+    def _exec_nop(self):
+        pass
+
+    def _exec_halt(self):
+        self.is_halt_instruction = True
+
+    def _exec_trap(self):
+        """Opcode inválido: encerra a simulação (run() informa)."""
+        self.trap = ((self.cpu.get_pc() - 1) & self.address_mask,
+                     self.cpu.get_ir())
+        self.halted = True
 
     def stage_wb(self):
         """
@@ -316,13 +594,192 @@ class Simulator:
         if self.is_halt_instruction:
             self.halted = True
 
-    def run(self, max_cycles=100000):
-        """Executa simulação completa"""
-        self.halted = False
-        self.cycle_counter = 0
-        self.instruction_count = 0
-        self.current_stage = 'IF'
+    def _check_options(self, sliced):
+        """Valida opções de execução; retorna True se houver stop points."""
+        stop_points = self.has_stop_points()
+        if stop_points and (self.mode == self.MODE_PIPELINE or self.verbose or
+                            self.profiler is not None or
+                            self.tracer is not None):
+            raise ValueError("Breakpoints e watchpoints indisponíveis nos "
+                             "modos pipeline e verboso e com perfil ou rastro")
+        if sliced and self.mode == self.MODE_PIPELINE:
+            raise ValueError("Execução em trechos (limites de instruções e "
+                             "de tempo, assíncrona) indisponível no modo "
+                             "pipeline")
+        return stop_points
+
+    def begin(self, resume=False, sliced=False):
+        """
+        Prepara uma execução: valida as opções e, sem resume, zera
+        contadores e estatísticas. Seguido de advance() (ver execute() e
+        async_runner.py).
+
+        Args:
+            resume: continua do estado atual (ex.: checkpoint restaurado ou
+                    parada em breakpoint) sem zerar contadores
+            sliced: a execução será feita em trechos de instruções
+                    (indisponível no modo pipeline, que esvazia ao parar)
+        """
+        self._stop_points = self._check_options(sliced)
+        # Ao continuar, o breakpoint no PC atual (onde parou) é ignorado
+        self._skip_pc = self.cpu.PC & self.address_mask if resume else None
+        self.stop_reason = None
+
+        if not resume:
+            self.halted = False
+            self.trap = None
+            self.cycle_counter = 0
+            self.instruction_count = 0
+            self.current_stage = 'IF'
+            if self.pipeline is not None:
+                self.pipeline.reset_stats()
+            if self.predictor is not None:
+                self.predictor.reset_stats()
+            if self.caches is not None:
+                self.caches.reset_stats()
+            if self.profiler is not None:
+                self.profiler.reset()
+            if self.reverse is not None:
+                self.reverse.reset()
+
+    def advance(self, max_cycles):
+        """
+        Executa até max_cycles (ciclos acumulados) após begin(). Com
+        max_cycles a partir do ciclo atual em múltiplos de 4, para em
+        fronteira de instrução.
+
+        Retorna: StopReason se a execução terminou (HALT, opcode inválido,
+        breakpoint ou watchpoint), ou None se só atingiu max_cycles
+        """
+        self._execute(max_cycles, self._skip_pc, self._stop_points)
+        self._skip_pc = None
+        if self.stop_reason is not None or self.halted:
+            return self.finish(STOP_HALT)
+        return None
+
+    def execute(self, max_cycles=100000, resume=False, max_instructions=None,
+                timeout=None):
+        """
+        Executa a simulação sem E/S de console (exceto os ciclos do modo
+        verboso); run() é execute() mais cabeçalho e resumo impressos.
 
+        Args:
+            max_cycles: limite de ciclos (None: sem limite)
+            resume: continua do estado atual sem zerar contadores (ver
+                    begin()); os limites de ciclos e instruções são totais
+                    acumulados
+            max_instructions: limite de instruções (None: sem limite)
+            timeout: limite de tempo de relógio em segundos, consultado a
+                     cada TIMEOUT_SLICE instruções (None: sem limite)
+
+        Retorna: StopReason (HALT, opcode inválido, limite de ciclos,
+        instruções ou tempo, breakpoint ou watchpoint; ver breakpoints.py)
+        """
+        sliced = max_instructions is not None or timeout is not None
+        self.begin(resume, sliced)
+        if max_cycles is None:
+            max_cycles = math.inf
+
+        # Sem limites extras, um único trecho até max_cycles; com eles,
+        # trechos de ciclos múltiplos de 4 (fronteiras de instrução)
+        if not sliced:
+            return self.advance(max_cycles) or self.finish(STOP_LIMIT)
+
+        deadline = time.perf_counter() + timeout if timeout is not None else None
+        stages = self.STAGES_PER_INSTRUCTION
+        while True:
+            limit = max_cycles
+            if max_instructions is not None:
+                remaining = max_instructions - self.instruction_count
+                if remaining <= 0:
+                    return self.finish(STOP_INSTRUCTIONS)
+                limit = min(limit, self.cycle_counter + remaining * stages)
+            if deadline is not None:
+                if time.perf_counter() >= deadline:
+                    return self.finish(STOP_TIMEOUT)
+                limit = min(limit,
+                            self.cycle_counter + self.TIMEOUT_SLICE * stages)
+            cycles = self.cycle_counter
+            stop = self.advance(limit)
+            if stop is not None:
+                return stop
+            if limit >= max_cycles or self.cycle_counter == cycles:
+                return self.finish(STOP_LIMIT)
+
+    def _execute(self, max_cycles, skip_pc, stop_points):
+        """Executa até max_cycles (ciclos acumulados) no modo configurado."""
+        # Conclui instrução interrompida no meio (retomada de checkpoint)
+        while self.current_stage != 'IF' and self.cycle_counter < max_cycles:
+            if not self.execute_cycle():
+                break
+
+        # Instruções completas enquanto couberem no limite de ciclos
+        last_full = max_cycles - self.STAGES_PER_INSTRUCTION
+        if self.mode == self.MODE_PIPELINE:
+            self.pipeline.run(max_cycles)
+        elif self.verbose:
+            pass
+        elif self.reverse is not None:
+            self.stop_reason = run_with_stops(self, last_full, skip_pc,
+                                              self.reverse.step_forward)
+        elif stop_points:
+            self.stop_reason = run_with_stops(self, last_full, skip_pc)
+        elif self.profiler is not None:
+            self.profiler.run(last_full)
+        elif self.tracer is not None:
+            self.tracer.run(last_full)
+        elif self.mode == self.MODE_FAST:
+            while self.cycle_counter <= last_full:
+                if not self.execute_instruction():
+                    break
+        elif self.mode == self.MODE_TRANSLATE:
+            while self.cycle_counter <= last_full:
+                if not self.execute_block(max_cycles):
+                    break
+
+        # Modo por estágios (ou ciclos restantes do modo rápido; com
+        # histórico reverso a execução para na fronteira de instrução)
+        while (self.stop_reason is None and self.reverse is None and
+               self.cycle_counter < max_cycles):
+            if not self.execute_cycle():
+                break
+
+    def finish(self, limit_kind=STOP_LIMIT):
+        """
+        Encerra a execução: define stop_reason (se ainda não houver) como
+        HALT, opcode inválido ou limit_kind e o retorna.
+        """
+        if self.stop_reason is None:
+            pc = self.cpu.PC & self.address_mask
+            if self.trap is not None:
+                kind, pc = STOP_TRAP, self.trap[0]
+            elif self.halted:
+                kind = STOP_HALT
+            else:
+                kind = limit_kind
+            self.stop_reason = StopReason(kind, pc, self.cycle_counter,
+                                          self.instruction_count)
+        return self.stop_reason
+
+    def run(self, max_cycles=100000, resume=False, max_instructions=None,
+            timeout=None):
+        """
+        Executa simulação completa imprimindo cabeçalho e resumo (ver
+        execute(), que recebe os mesmos argumentos).
+
+        Retorna: StopReason
+        """
+        # Opções inválidas falham antes do cabeçalho
+        self._check_options(max_instructions is not None or timeout is not None)
+        self.print_header()
+
+        zero_divisions = self.alu.zero_divisions
+        stop = self.execute(max_cycles, resume, max_instructions, timeout)
+        self.print_summary(self.alu.zero_divisions - zero_divisions)
+        return stop
+
+    def print_header(self):
+        """Cabeçalho impresso antes da execução."""
         print("\n" + "="*70)
         print("INICIANDO SIMULAÇÃO UFLA-RISC")
         if self.verbose:
@@ -331,9 +788,17 @@ class Simulator:
             print("MODO: SILENCIOSO (apenas resumo final)")
         print("="*70)
 
-        while self.cycle_counter < max_cycles:
-            if not self.execute_cycle():
-                break
+    def print_summary(self, zero_divisions=0):
+        """Resumo da execução (ciclos, CPI e estatísticas ativas)."""
+        if self.trap is not None:
+            address, instruction = self.trap
+            print(f"\n⚠️  ERRO: Opcode inválido 0x{instruction >> 24:02x} detectado!")
+            print(f"Instrução: 0x{instruction:08x}")
+            print(f"PC: {address}")
+            print("Encerrando simulação...")
+        if zero_divisions and not self.verbose:
+            print(f"\n⚠️  WARNING: {zero_divisions} divisão(ões)/módulo(s) "
+                  f"por zero (resultado 0)")
 
         print("\n" + "="*70)
         print("SIMULAÇÃO FINALIZADA")
@@ -344,9 +809,34 @@ class Simulator:
         if self.instruction_count > 0:
             cpi = self.cycle_counter / self.instruction_count
             print(f"CPI (Cycles Per Instruction): {cpi:.2f}")
-            if cpi == 4.0:
+            if self.pipeline is not None:
+                self.pipeline.print_stats()
+            elif cpi == 4.0:
                 print("✓ CPI perfeito! (4 estágios por instrução)")
             else:
                 print(f"⚠️  CPI esperado: 4.0 | Real: {cpi:.2f}")
         else:
             print("CPI: N/A (nenhuma instrução executada)")
+
+        if self.predictor is not None:
+            self.predictor.print_stats(self.instruction_count)
+        if self.caches is not None:
+            self.caches.print_stats()
+        if self.profiler is not None:
+            self.profiler.print_report()
+        if self.tracer is not None:
+            self.tracer.print_stats()
+
+
+def _build_exec_table():
+    """
+    Monta a tabela de execução (256 entradas) a partir da ISA definida no
+    decodificador. Opcodes não definidos apontam para _exec_trap.
+    """
+    table = [Simulator._exec_trap] * 256
+    for opcode, mnemonic in InstructionDecoder.OPCODE_NAMES.items():
+        table[opcode] = getattr(Simulator, '_exec_' + mnemonic.lower())
+    return table
+
+
+Simulator.EXEC_TABLE = _build_exec_table()
@@ -0,0 +1,236 @@
+"""
+text_loader.py - Carregador Rápido do Formato Texto
+
+Valida o arquivo texto ('address' + linhas de 32 bits) inteiro sem laço
+Python por linha e converte as palavras de cada segmento de uma vez (um
+inteiro de base 2 para todo o segmento). Só arquivos com linhas inválidas
+passam pela análise linha a linha, que gera os avisos com o número da
+linha.
+
+Inclui cache em disco opcional da imagem analisada (formato de
+program_image.py), indexado pelo caminho e validado pelo hash do
+conteúdo, com número limitado de entradas.
+"""
+
+import hashlib
+import os
+import re
+import sys
+from array import array
+
+from program_image import encode_image
+from utils import MAX_ADDRESS_BITS
+
+_WORD_RE = re.compile(r'[01]{32}')
+_ADDRESS_RE = re.compile(rb'address[ \t]+([01]+)', re.IGNORECASE)
+_WORD_BYTES_RE = re.compile(rb'[01]{32}')
+
+# Marca com b'x' os bytes fora de linhas de palavras puras ('0', '1',
+# '\n'): comentários, diretivas, espaços e lixo
+_MARK_TABLE = bytes(c if c in b'01\n' else ord('x') for c in range(256))
+
+# Separadores de linha além de '\n' (str.splitlines também os considera)
+_OTHER_EOL_RE = re.compile('[\v\f\x1c\x1d\x1e\x85\u2028\u2029]')
+
+# Endereços são limitados ao maior espaço suportado; a memória aplica
+# a própria máscara na carga
+_ADDRESS_MASK = (1 << MAX_ADDRESS_BITS) - 1
+
+# Typecode de palavras de 32 bits (igual a memory.WORD_TYPECODE)
+_TYPECODE = 'I' if array('I').itemsize == 4 else 'L'
+
+
+def _words_from_bits(bits):
+    """Converte a concatenação (bytes) de palavras de 32 bits num array."""
+    words = array(_TYPECODE)
+    if bits:
+        words.frombytes(int(bits, 2).to_bytes(len(bits) // 8, 'big'))
+        if sys.byteorder == 'little':
+            words.byteswap()
+    return words
+
+
+def _parse_whole_text(text):
+    """
+    Análise sem laço por linha: as regiões só com palavras são validadas
+    e convertidas em bloco; só linhas com outros caracteres (comentários,
+    'address', espaços) são examinadas uma a uma.
+
+    Retorna: segmentos, ou None se houver linha inválida (ver
+    parse_text_program)
+    """
+    data = text.encode('utf-8').replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    marks = data.translate(_MARK_TABLE)
+
+    segments = []
+    start = 0
+    bits = []
+    pos = 0
+    end = len(data)
+    while pos <= end:
+        special = marks.find(b'x', pos)
+        if special >= 0:
+            line_start = max(pos, data.rfind(b'\n', pos, special) + 1)
+        else:
+            line_start = end
+
+        # Região só com [01\n]: toda linha tem 0 ou 32 caracteres
+        lines = data[pos:line_start].split(b'\n')
+        if not set(map(len, lines)) <= {0, 32}:
+            return None
+        bits.extend(lines)
+        if special < 0:
+            break
+
+        line_end = data.find(b'\n', special)
+        if line_end < 0:
+            line_end = end
+        line = data[line_start:line_end].strip(b' \t')
+        pos = line_end + 1
+
+        if not line:
+            continue
+        if line[:1] == b'#':
+            if _OTHER_EOL_RE.search(line.decode('utf-8')):
+                return None
+            continue
+        if _WORD_BYTES_RE.fullmatch(line):
+            bits.append(line)
+            continue
+        directive = _ADDRESS_RE.fullmatch(line)
+        if directive is None:
+            return None
+        words = _words_from_bits(b''.join(bits))
+        if words:
+            segments.append((start, words))
+        start = int(directive.group(1), 2) & _ADDRESS_MASK
+        bits = []
+
+    words = _words_from_bits(b''.join(bits))
+    if words:
+        segments.append((start, words))
+    return segments
+
+
+def parse_text_program(text):
+    """
+    Analisa programa no formato texto.
+
+    Retorna: (segmentos, avisos)
+        segmentos: lista de (endereço, array de palavras), na ordem do arquivo
+        avisos: lista de (número_da_linha, mensagem)
+    """
+    segments = _parse_whole_text(text)
+    if segments is not None:
+        return segments, []
+
+    # Há linhas inválidas: análise linha a linha para os avisos
+    segments = []
+    warnings = []
+    start = 0
+    words = array(_TYPECODE)
+    fullmatch = _WORD_RE.fullmatch
+
+    for line_num, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+
+        # Ignorar linhas vazias e comentários
+        if not line or line[0] == '#':
+            continue
+
+        # Instrução (32 bits em binário)
+        if len(line) == 32 and fullmatch(line):
+            words.append(int(line, 2))
+            continue
+
+        # Diretiva "address"
+        if line[:7].lower() == 'address':
+            parts = line.split()
+            if len(parts) >= 2:
+                try:
+                    address = int(parts[1], 2) & _ADDRESS_MASK
+                except ValueError:
+                    warnings.append(
+                        (line_num, f"endereço inválido em {parts[1]}"))
+                    continue
+                if words:
+                    segments.append((start, words))
+                start = address
+                words = array(_TYPECODE)
+            continue
+
+        warnings.append((line_num, f"instrução inválida: {line}"))
+
+    if words:
+        segments.append((start, words))
+    return segments, warnings
+
+
+class ParsedImageCache:
+    """
+    Cache em disco de programas texto já analisados (desligado por padrão;
+    ver Memory.load_program_from_text e a opção --text-cache do CLI).
+    """
+
+    # Variável de ambiente para o diretório do cache
+    ENV_DIR = 'UFLA_RISC_CACHE_DIR'
+    MAX_ENTRIES = 64
+
+    def __init__(self, directory=None, max_entries=MAX_ENTRIES):
+        """Inicializa cache (padrão: $UFLA_RISC_CACHE_DIR ou ~/.cache/ufla-risc)."""
+        self.directory = directory or os.environ.get(self.ENV_DIR) or \
+            os.path.join(os.path.expanduser('~'), '.cache', 'ufla-risc')
+        self.max_entries = max_entries
+
+    def _entry_path(self, filename):
+        """Caminho da entrada: uma por arquivo (editá-lo substitui a entrada)."""
+        key = os.path.abspath(filename)
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.directory, digest + '.img')
+
+    def _prune(self):
+        """Remove as entradas usadas há mais tempo além de max_entries."""
+        try:
+            entries = [entry for entry in os.scandir(self.directory)
+                       if entry.name.endswith('.img')]
+            entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+            for entry in entries[:max(0, len(entries) - self.max_entries)]:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+    def lookup(self, filename, content):
+        """
+        Retorna bytes da imagem em cache para o conteúdo lido, ou None.
+        A entrada só vale se o hash do conteúdo coincidir.
+        """
+        path = self._entry_path(filename)
+        try:
+            with open(path, 'rb') as f:
+                cached = f.read()
+        except OSError:
+            return None
+
+        content_hash = hashlib.sha256(content).digest()
+        if cached[:len(content_hash)] != content_hash:
+            return None
+        try:
+            os.utime(path)  # mtime marca o último uso (ver _prune)
+        except OSError:
+            pass
+        return memoryview(cached)[len(content_hash):]
+
+    def store(self, filename, content, segments):
+        """Grava imagem analisada no cache (falhas são ignoradas)."""
+        try:
+            path = self._entry_path(filename)
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(hashlib.sha256(content).digest())
+                f.write(encode_image(segments))
+            os.replace(tmp_path, path)
+        except OSError:
+            return False
+        self._prune()
+        return True
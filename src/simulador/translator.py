@@ -0,0 +1,291 @@
+"""
+translator.py - Tradução de Blocos Básicos
+
+Traduz sequências lineares de instruções UFLA-RISC em funções Python
+geradas, armazenadas por PC de entrada. Um bloco termina em JAL, JR, BEQ,
+BNE, J, HALT ou STORE (para que código auto-modificável nunca execute uma
+tradução desatualizada). A memória notifica o tradutor a cada escrita.
+"""
+
+from collections import namedtuple
+
+from utils import MASK32, NUM_REGISTERS
+
+# Bloco traduzido: função gerada, nº de instruções, código-fonte gerado e,
+# se terminar em BEQ/BNE, o desvio (pc, é BEQ, ra, rb, destino) para que
+# o simulador registre o resultado na unidade de controle
+TranslatedBlock = namedtuple('TranslatedBlock',
+                             ['function', 'length', 'source', 'branch'])
+
+# Expressões inline (sem flags) para operações da ALU.
+# a/b: registradores lidos (RA, RB)
+_INLINE_OPS = {
+    0x01: '({a} + {b}) & 0xFFFFFFFF',                        # ADD
+    0x02: '({a} - {b}) & 0xFFFFFFFF',                        # SUB
+    0x03: '0',                                               # ZEROS
+    0x04: '{a} ^ {b}',                                       # XOR
+    0x05: '{a} | {b}',                                       # OR
+    0x06: '~{a} & 0xFFFFFFFF',                               # NOT
+    0x07: '{a} & {b}',                                       # AND
+    0x08: '({a} << ({b} & 0x1F)) & 0xFFFFFFFF',              # ASL
+    0x09: '(((({a} ^ 0x80000000) - 0x80000000) >> ({b} & 0x1F))'
+          ' & 0xFFFFFFFF)',                                  # ASR
+    0x0A: '({a} << ({b} & 0x1F)) & 0xFFFFFFFF',              # LSL
+    0x0B: '{a} >> ({b} & 0x1F)',                             # LSR
+    0x0C: '{a}',                                             # PASSA
+    0x17: '1 if (({a} ^ 0x80000000) < ({b} ^ 0x80000000)) else 0',  # SLT
+    0x18: '({a} * {b}) & 0xFFFFFFFF',                        # MUL
+    0x1B: '-(({a} ^ 0x80000000) - 0x80000000) & 0xFFFFFFFF',  # NEG
+    0x1C: '({a} + 1) & 0xFFFFFFFF',                          # INC
+    0x1D: '({a} - 1) & 0xFFFFFFFF',                          # DEC
+}
+
+# Chamadas equivalentes na ALU (atualizam flags e last_result)
+_ALU_CALLS = {
+    0x01: 'alu.add({a}, {b})',
+    0x02: 'alu.sub({a}, {b})',
+    0x03: 'alu.zeros()',
+    0x04: 'alu.xor({a}, {b})',
+    0x05: 'alu.or_op({a}, {b})',
+    0x06: 'alu.not_op({a})',
+    0x07: 'alu.and_op({a}, {b})',
+    0x08: 'alu.asl({a}, {b} & 0x1F)',
+    0x09: 'alu.asr({a}, {b} & 0x1F)',
+    0x0A: 'alu.lsl({a}, {b} & 0x1F)',
+    0x0B: 'alu.lsr({a}, {b} & 0x1F)',
+    0x0C: 'alu.copy({a})',
+    0x17: 'alu.slt({a}, {b})',
+    0x18: 'alu.mul({a}, {b})',
+    0x19: 'alu.div({a}, {b})',
+    0x1A: 'alu.mod({a}, {b})',
+    0x1B: 'alu.neg({a})',
+    0x1C: 'alu.inc({a})',
+    0x1D: 'alu.dec({a})',
+}
+
+# DIV/MOD sempre passam pela ALU (aviso de divisão por zero)
+_ALWAYS_CALL_ALU = {0x19, 0x1A}
+
+# Instruções que encerram um bloco
+BLOCK_TERMINATORS = {0x11, 0x12, 0x13, 0x14, 0x15, 0x16, 0xFF}
+
+# Opcodes suportados pela tradução
+_TRANSLATABLE = (set(_ALU_CALLS) | BLOCK_TERMINATORS |
+                 {0x0E, 0x0F, 0x10, 0x1E})
+
+
+class BlockTranslator:
+    """Tradutor de blocos básicos para funções Python em cache."""
+
+    # Tamanho máximo de um bloco (instruções)
+    MAX_BLOCK_LENGTH = 64
+
+    # Execuções de um PC antes de traduzi-lo (código "quente")
+    HOT_THRESHOLD = 2
+
+    def __init__(self, memory, decoder):
+        """Inicializa tradutor sobre a memória e o decodificador."""
+        self.memory = memory
+        self.decoder = decoder
+        self.blocks = {}        # PC de entrada -> TranslatedBlock
+        self.address_map = {}   # endereço -> PCs de blocos que o contêm
+        self.heat = {}          # PC -> nº de consultas antes da tradução
+        self.translations = 0
+        self.invalidations = 0
+
+    # ==================== CONSULTA ====================
+
+    def lookup(self, pc):
+        """
+        Retorna o bloco traduzido que começa em pc.
+        Retorna None enquanto o PC não estiver quente ou se a instrução
+        em pc não puder ser traduzida (ex.: opcode inválido).
+        """
+        block = self.blocks.get(pc)
+        if block is not None:
+            return block
+
+        heat = self.heat.get(pc, 0) + 1
+        if heat < self.HOT_THRESHOLD:
+            self.heat[pc] = heat
+            return None
+        self.heat.pop(pc, None)
+        return self.translate(pc)
+
+    # ==================== TRADUÇÃO ====================
+
+    def translate(self, pc):
+        """Traduz o bloco iniciado em pc e o armazena em cache."""
+        instructions = []
+        while len(instructions) < self.MAX_BLOCK_LENGTH:
+            word_pc = (pc + len(instructions)) & MASK32
+            decoded = self.decoder.decode_compact(self.memory.read(word_pc))
+            if decoded.opcode not in _TRANSLATABLE:
+                break
+            instructions.append(decoded)
+            if decoded.opcode in BLOCK_TERMINATORS:
+                break
+
+        if not instructions:
+            return None
+
+        source = self._generate(pc, instructions)
+        namespace = {}
+        exec(compile(source, f'<bloco 0x{pc:04x}>', 'exec'), namespace)
+        last = instructions[-1]
+        branch = None
+        if last.opcode in (0x14, 0x15):
+            branch = ((pc + len(instructions) - 1) & MASK32,
+                      last.opcode == 0x14,
+                      min(last.ra, NUM_REGISTERS - 1),
+                      min(last.rb, NUM_REGISTERS - 1),
+                      last.branch_offset & 0xFF)
+        block = TranslatedBlock(namespace['block'], len(instructions), source,
+                                branch)
+
+        self.blocks[pc] = block
+        for i in range(len(instructions)):
+            address = (pc + i) % self.memory.size
+            self.address_map.setdefault(address, set()).add(pc)
+        self.translations += 1
+        return block
+
+    def _generate(self, pc, instructions):
+        """
+        Gera o código-fonte do bloco.
+
+        Registradores são copiados para variáveis locais na entrada e
+        escritos de volta na saída. A última operação que afeta flags (e
+        DIV/MOD) é executada pela própria ALU, garantindo flags e
+        last_result idênticos ao interpretador.
+        """
+        flag_ops = [i for i, d in enumerate(instructions)
+                    if d.opcode in _ALU_CALLS]
+        last_flag_op = flag_ops[-1] if flag_ops else None
+
+        mask = self.memory.address_mask
+        read_regs = set()
+        written_regs = set()
+        body = []
+        halted = 'False'
+
+        def reg(idx):
+            idx = min(idx, NUM_REGISTERS - 1)
+            read_regs.add(idx)
+            return f'r{idx}'
+
+        for i, d in enumerate(instructions):
+            op = d.opcode
+            next_pc = (pc + i + 1) & MASK32
+            dest = None
+            expr = None
+
+            if op in _ALU_CALLS:
+                fields = {'a': reg(d.ra), 'b': reg(d.rb)}
+                if i == last_flag_op or op in _ALWAYS_CALL_ALU:
+                    expr = _ALU_CALLS[op].format(**fields)
+                else:
+                    expr = _INLINE_OPS[op].format(**fields)
+                dest = d.rc
+            elif op == 0x0E:  # LCH
+                expr = f'(({d.const16} << 16) | ({reg(d.rc)} & 0xFFFF)) & 0xFFFFFFFF'
+                dest = d.rc
+            elif op == 0x0F:  # LCL
+                expr = f'({reg(d.rc)} & 0xFFFF0000) | {d.const16}'
+                dest = d.rc
+            elif op == 0x10:  # LOAD
+                expr = f'mem_read({reg(d.ra)} & {mask})'
+                dest = d.rc
+            elif op == 0x11:  # STORE
+                body.append(f'memory.write({reg(d.rc)} & {mask}, {reg(d.ra)})')
+                body.append(f'cpu.PC = {next_pc}')
+            elif op == 0x12:  # JAL
+                body.append(f'r31 = {next_pc}')
+                written_regs.add(31)
+                body.append(f'cpu.PC = {d.address & 0xFFFFFF}')
+            elif op == 0x13:  # JR
+                body.append(f'cpu.PC = {reg(d.rc)} & {mask}')
+            elif op in (0x14, 0x15):  # BEQ / BNE
+                cmp = '==' if op == 0x14 else '!='
+                body.append(
+                    f'cpu.PC = {d.branch_offset & 0xFF} '
+                    f'if {reg(d.ra)} {cmp} {reg(d.rb)} else {next_pc}')
+            elif op == 0x16:  # J
+                body.append(f'cpu.PC = {d.address & 0xFFFFFF}')
+            elif op == 0xFF:  # HALT
+                body.append(f'cpu.PC = {next_pc}')
+                halted = 'True'
+            elif op == 0x1E:  # NOP
+                pass
+
+            if dest is None:
+                continue
+            if dest == 0:
+                # Write-back em R0 é descartado; ainda assim executa a operação
+                if expr.startswith(('alu.', 'mem_read')):
+                    body.append(expr)
+                continue
+            dest = min(dest, NUM_REGISTERS - 1)
+            body.append(f'r{dest} = {expr}')
+            read_regs.add(dest)
+            written_regs.add(dest)
+
+        last = instructions[-1]
+        if last.opcode not in BLOCK_TERMINATORS:
+            body.append(f'cpu.PC = {(pc + len(instructions)) & MASK32}')
+        body.append(f'cpu.IR = {last.raw}')
+
+        if last_flag_op is not None:
+            body.append('cpu.flag_state = alu.flag_state')
+
+        lines = ['def block(regs, cpu, alu, memory):',
+                 '    mem_read = memory.read']
+        lines += [f'    r{idx} = regs[{idx}]' for idx in sorted(read_regs)]
+        lines += [f'    {stmt}' for stmt in body]
+        lines += [f'    regs[{idx}] = r{idx}' for idx in sorted(written_regs)]
+        lines.append(f'    return {halted}')
+        return '\n'.join(lines) + '\n'
+
+    # ==================== INVALIDAÇÃO ====================
+
+    def invalidate(self, address):
+        """Descarta blocos que contêm o endereço escrito."""
+        entries = self.address_map.pop(address, None)
+        if not entries:
+            return
+        for pc in entries:
+            block = self.blocks.pop(pc, None)
+            if block is None:
+                continue
+            self.invalidations += 1
+            for i in range(block.length):
+                other = self.address_map.get((pc + i) % self.memory.size)
+                if other is not None:
+                    other.discard(pc)
+
+    def invalidate_range(self, start_address, count):
+        """Descarta blocos que intersectam um intervalo de endereços."""
+        if count >= len(self.address_map):
+            stale = [addr for addr in self.address_map
+                     if (addr - start_address) % self.memory.size < count]
+        else:
+            stale = [(start_address + i) % self.memory.size for i in range(count)]
+        for addr in stale:
+            self.invalidate(addr)
+
+    def invalidate_all(self):
+        """Descarta todas as traduções."""
+        self.invalidations += len(self.blocks)
+        self.blocks.clear()
+        self.address_map.clear()
+        self.heat.clear()
+
+    # ==================== ESTATÍSTICAS ====================
+
+    def get_stats(self):
+        """Retorna estatísticas do tradutor."""
+        return {
+            'blocks': len(self.blocks),
+            'translations': self.translations,
+            'invalidations': self.invalidations
+        }
@@ -15,6 +15,11 @@ SIGN_BIT_32 = 0x80000000
 # Tamanho da memória (64K palavras de 32 bits)
 MEMORY_SIZE = 65536
 
+# Espaço de endereçamento (bits de endereço de palavra): 16 por padrão,
+# configurável até 24 (alcance de JAL/J)
+ADDRESS_BITS = 16
+MAX_ADDRESS_BITS = 24
+
 # Número de registradores
 NUM_REGISTERS = 32
 
@@ -139,6 +144,77 @@ def create_flags_dict(neg=0, zero=0, carry=0, overflow=0):
     }
 
 
+# Avaliação preguiçosa de flags: o estado é a tupla (tipo, resultado, a, b)
+# e N/Z/C/V só são calculados quando alguém os lê.
+FLAGS_EXPLICIT = 0  # resultado = bits N Z C V já materializados
+FLAGS_LOGICAL = 1   # N/Z do resultado, C = V = 0
+FLAGS_ADD = 2       # resultado = a + b (sem truncar)
+FLAGS_SUB = 3       # resultado = a - b (sem truncar)
+
+# Estado inicial (todos os flags em 0)
+FLAGS_CLEAR = (FLAGS_EXPLICIT, 0, 0, 0)
+
+
+def make_flag_state(neg=0, zero=0, carry=0, overflow=0):
+    """Cria estado de flags explícito a partir dos valores."""
+    bits = ((1 if neg else 0) << 3 | (1 if zero else 0) << 2 |
+            (1 if carry else 0) << 1 | (1 if overflow else 0))
+    return (FLAGS_EXPLICIT, bits, 0, 0)
+
+
+def evaluate_flags(state):
+    """
+    Materializa um estado de flags preguiçoso.
+
+    Retorna tupla (neg, zero, carry, overflow) com a mesma semântica de
+    ALU.update_flags_arithmetic / update_flags_logical.
+    """
+    kind, result, a, b = state
+    if kind == FLAGS_EXPLICIT:
+        return ((result >> 3) & 1, (result >> 2) & 1,
+                (result >> 1) & 1, result & 1)
+
+    result_u32 = result & MASK32
+    neg = 1 if (result_u32 & SIGN_BIT_32) else 0
+    zero = 1 if result_u32 == 0 else 0
+    if kind == FLAGS_LOGICAL:
+        return (neg, zero, 0, 0)
+
+    a_s32 = to_s32(a)
+    b_s32 = to_s32(b)
+    result_s32 = to_s32(result_u32)
+    if kind == FLAGS_SUB:
+        carry = 1 if (a < b) else 0
+        overflow = 1 if (
+            (a_s32 >= 0 and b_s32 < 0 and result_s32 < 0) or
+            (a_s32 < 0 and b_s32 >= 0 and result_s32 >= 0)
+        ) else 0
+    else:
+        carry = 1 if (result > MASK32) else 0
+        overflow = 1 if (
+            (a_s32 >= 0 and b_s32 >= 0 and result_s32 < 0) or
+            (a_s32 < 0 and b_s32 < 0 and result_s32 >= 0)
+        ) else 0
+    return (neg, zero, carry, overflow)
+
+
+def lazy_flag_property(index, doc=None):
+    """
+    Cria propriedade de um flag individual sobre 'flag_state'.
+    A classe deve implementar get_flag_values() e set_flag_state().
+    Atribuir um flag materializa os demais e torna o estado explícito.
+    """
+    def getter(self):
+        return self.get_flag_values()[index]
+
+    def setter(self, value):
+        values = list(self.get_flag_values())
+        values[index] = 1 if value else 0
+        self.set_flag_state(make_flag_state(*values))
+
+    return property(getter, setter, doc=doc)
+
+
 def flags_to_string(flags_dict):
     """Converte flags para string legível."""
     return (f"neg={flags_dict['neg']} zero={flags_dict['zero']} "
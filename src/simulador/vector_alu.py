@@ -0,0 +1,180 @@
+"""
+vector_alu.py - ALU Vetorizada (NumPy)
+
+Modelo de referência das operações de alu.ALU sobre arrays uint32: cada
+função recebe arrays de operandos e devolve (resultado, flags), com flags
+no mesmo formato preguiçoso da ALU, (tipo, a, b), ou None para operações
+que não alteram flags. flag_bits() materializa N/Z/C/V.
+
+Usada pela execução em lote (batch.py) e pelo teste de conformidade com
+a ALU (src/ferramentas/conformidade_alu.py).
+
+Requer NumPy (dependência opcional).
+"""
+
+import numpy as np
+
+from utils import FLAGS_ADD, FLAGS_LOGICAL, FLAGS_SUB
+
+_ZERO = np.uint32(0)
+_ONE = np.uint32(1)
+_LOGICAL = (FLAGS_LOGICAL, None, None)
+
+
+def flag_bits(kind, result, a=None, b=None):
+    """
+    Flags N<<3 | Z<<2 | C<<1 | V (uint8 por elemento), com a semântica de
+    utils.evaluate_flags (resultado já truncado em 32 bits).
+    """
+    bits = (result >> 31).astype(np.uint8) << 3
+    bits |= (result == 0).astype(np.uint8) << 2
+    if kind == FLAGS_LOGICAL:
+        return bits
+    if kind == FLAGS_ADD:
+        carry = result < a
+        overflow = (a ^ result) & (b ^ result)
+    else:
+        carry = a < b
+        overflow = (a ^ b) & (a ^ result)
+    bits |= carry.astype(np.uint8) << 1
+    bits |= (overflow >> 31).astype(np.uint8)
+    return bits
+
+
+def _signed(value):
+    """uint32 -> int64 com sinal de 32 bits."""
+    return value.astype(np.int32).astype(np.int64)
+
+
+# ==================== OPERAÇÕES ALU ====================
+
+def add(a, b):
+    """Adição."""
+    return a + b, (FLAGS_ADD, a, b)
+
+
+def sub(a, b):
+    """Subtração (carry = a < b sem sinal)."""
+    return a - b, (FLAGS_SUB, a, b)
+
+
+def xor(a, b):
+    """XOR lógico."""
+    return a ^ b, _LOGICAL
+
+
+def or_op(a, b):
+    """OR lógico."""
+    return a | b, _LOGICAL
+
+
+def and_op(a, b):
+    """AND lógico."""
+    return a & b, _LOGICAL
+
+
+def not_op(a):
+    """NOT lógico (complemento)."""
+    return ~a, _LOGICAL
+
+
+def zeros(a):
+    """Zero (a só dá o tamanho)."""
+    return np.zeros(len(a), np.uint32), _LOGICAL
+
+
+# ==================== OPERAÇÕES ESPECIAIS ====================
+
+def mul(a, b):
+    """Multiplicação (truncada em 32 bits)."""
+    return a * b, _LOGICAL
+
+
+def div(a, b):
+    """Divisão com sinal (piso, como // do Python); por zero resulta 0."""
+    divisor = _signed(b)
+    zero = divisor == 0
+    result = np.floor_divide(_signed(a), np.where(zero, 1, divisor))
+    result[zero] = 0
+    return result.astype(np.uint32), _LOGICAL
+
+
+def mod(a, b):
+    """Módulo com sinal (sinal do divisor, como % do Python); por zero resulta 0."""
+    divisor = _signed(b)
+    zero = divisor == 0
+    result = np.remainder(_signed(a), np.where(zero, 1, divisor))
+    result[zero] = 0
+    return result.astype(np.uint32), _LOGICAL
+
+
+def slt(a, b):
+    """Set Less Than com sinal."""
+    return (a.astype(np.int32) < b.astype(np.int32)).astype(np.uint32), _LOGICAL
+
+
+def inc(a):
+    """Incremento (flags de a + 1)."""
+    return a + _ONE, (FLAGS_ADD, a, _ONE)
+
+
+def dec(a):
+    """Decremento (flags de a - 1)."""
+    return a - _ONE, (FLAGS_SUB, a, _ONE)
+
+
+def neg(a):
+    """Negação (flags de 0 - a)."""
+    return _ZERO - a, (FLAGS_SUB, _ZERO, a)
+
+
+def copy(a):
+    """Cópia (PASSA)."""
+    return np.array(a), _LOGICAL
+
+
+# ==================== OPERAÇÕES DE SHIFT ====================
+
+def asl(value, shift_amount):
+    """Arithmetic Shift Left."""
+    return value << (shift_amount & 0x1F), _LOGICAL
+
+
+def asr(value, shift_amount):
+    """Arithmetic Shift Right (preserva bit de sinal)."""
+    shift = (shift_amount & 0x1F).astype(np.int32)
+    return (value.astype(np.int32) >> shift).astype(np.uint32), _LOGICAL
+
+
+def lsl(value, shift_amount):
+    """Logical Shift Left."""
+    return value << (shift_amount & 0x1F), _LOGICAL
+
+
+def lsr(value, shift_amount):
+    """Logical Shift Right."""
+    return value >> (shift_amount & 0x1F), _LOGICAL
+
+
+# ==================== OPERAÇÕES COM CONSTANTES ====================
+
+def load_const_high(reg_value, const16):
+    """Carrega constante nos 16 bits altos (não altera flags)."""
+    return (const16 << 16) | (reg_value & 0xFFFF), None
+
+
+def load_const_low(reg_value, const16):
+    """Carrega constante nos 16 bits baixos (não altera flags)."""
+    return (reg_value & 0xFFFF0000) | const16, None
+
+
+# Nome do método em alu.ALU -> (função, nº de operandos)
+OPERATIONS = {
+    'add': (add, 2), 'sub': (sub, 2), 'xor': (xor, 2), 'or_op': (or_op, 2),
+    'and_op': (and_op, 2), 'not_op': (not_op, 1), 'zeros': (zeros, 0),
+    'mul': (mul, 2), 'div': (div, 2), 'mod': (mod, 2), 'slt': (slt, 2),
+    'inc': (inc, 1), 'dec': (dec, 1), 'neg': (neg, 1), 'copy': (copy, 1),
+    'asl': (asl, 2), 'asr': (asr, 2), 'lsl': (lsl, 2), 'lsr': (lsr, 2),
+    'load_const_high': (load_const_high, 2),
+    'load_const_low': (load_const_low, 2),
+}
@@ -0,0 +1,16 @@
+"""
+conftest.py - Configuração dos Testes
+
+Torna os módulos de src/simulador, src/interpretador e src/ferramentas
+importáveis pelo nome, como nos próprios scripts.
+"""
+
+import os
+import sys
+
+_SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                    'src')
+for _module_dir in ('simulador', 'interpretador', 'ferramentas'):
+    _path = os.path.join(_SRC, _module_dir)
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
@@ -0,0 +1,102 @@
+"""
+programas.py - Programas Aleatórios e Estado de Referência
+
+Gerador de programas usado pelos testes diferenciais: opcodes válidos com
+registradores quase sempre em R0..R7 (para haver dependências), desvios
+para dentro do programa, alguns índices de registrador fora de 0..31 e
+algumas palavras aleatórias (opcodes inválidos). LOAD/STORE usam os
+valores dos registradores como endereço, então escritas no próprio
+código (código automodificável) acontecem naturalmente.
+"""
+
+import contextlib
+import io
+
+from memory import Memory
+from simulador import Simulator
+
+OPCODES = [0x01, 0x02, 0x03, 0x04, 0x05, 0x06, 0x07, 0x08, 0x09, 0x0A,
+           0x0B, 0x0C, 0x0E, 0x0F, 0x10, 0x11, 0x12, 0x13, 0x14, 0x15,
+           0x16, 0x17, 0x18, 0x19, 0x1A, 0x1B, 0x1C, 0x1D, 0x1E]
+HALT_WORD = 0xFFFFFFFF
+
+# Valores iniciais que exercitam carry, overflow e sinal
+INTERESTING = [0, 1, 0xFFFFFFFF, 0x80000000, 0x7FFFFFFF]
+
+
+def random_register(rng):
+    """Índice de registrador, quase sempre em R0..R7."""
+    if rng.random() < 0.1:
+        return rng.choice([0, 1, 7, 31, rng.randrange(256)])
+    return rng.randrange(8)
+
+
+def random_program(rng, length):
+    """Lista de palavras com length instruções seguidas de HALT."""
+    words = []
+    for _ in range(length):
+        op = rng.choice(OPCODES)
+        if op in (0x12, 0x16):                      # JAL, J
+            word = op << 24 | rng.randrange(length + 2)
+        elif op in (0x14, 0x15):                    # BEQ, BNE
+            word = (op << 24 | random_register(rng) << 16 |
+                    random_register(rng) << 8 | rng.randrange(min(256, length + 2)))
+        elif op in (0x0E, 0x0F):                    # LCH, LCL
+            word = op << 24 | rng.randrange(1 << 16) << 8 | random_register(rng)
+        else:
+            word = (op << 24 | random_register(rng) << 16 |
+                    random_register(rng) << 8 | random_register(rng))
+        if rng.random() < 0.02:
+            word = rng.getrandbits(32)
+        words.append(word)
+    words.append(HALT_WORD)
+    return words
+
+
+def random_registers(rng):
+    """{registrador: valor} iniciais para R1..R7."""
+    return {reg: rng.choice(INTERESTING + [rng.getrandbits(32), rng.randrange(16)])
+            for reg in range(1, 8)}
+
+
+def new_simulator(words, registers=None, **options):
+    """Simulator com o programa em 0 e os registradores iniciais."""
+    options.setdefault('memory', Memory())
+    sim = Simulator(**options)
+    for address, word in enumerate(words):
+        sim.memory.write(address, word)
+    for reg, value in (registers or {}).items():
+        sim.cpu.regs[reg] = value
+    return sim
+
+
+def quiet():
+    """Descarta as mensagens impressas pelo simulador."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def state(sim):
+    """Estado arquitetural comparável entre modos e implementações."""
+    cpu = sim.cpu
+    memory = sim.memory
+    return {
+        'registradores': list(cpu.regs),
+        'pc': cpu.PC,
+        'flags': cpu.get_flag_values(),
+        'parado': sim.halted,
+        'trap': sim.trap,
+        'ciclos': sim.cycle_counter,
+        'instrucoes': sim.instruction_count,
+        'memoria': sorted((address, memory.read(address))
+                          for address in memory.get_non_zero_words()),
+    }
+
+
+def reference_state(words, instructions, registers=None):
+    """Estado após executar instructions instruções, uma a uma (modo rápido)."""
+    sim = new_simulator(words, registers, mode=Simulator.MODE_FAST)
+    with quiet():
+        for _ in range(instructions):
+            if not sim.execute_instruction():
+                break
+    return state(sim)
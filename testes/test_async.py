@@ -0,0 +1,150 @@
+"""
+Execução cooperativa (async_runner.py): em trechos, com pausa, cancelamento
+e nova chamada a run(), o resultado deve ser o mesmo de
+Simulator.execute() com os mesmos limites; o tamanho do trecho se ajusta
+à latência desejada.
+"""
+
+import asyncio
+import random
+
+import pytest
+
+from async_runner import (MAX_GROWTH, MAX_SLICE, MIN_SLICE, AsyncRunner,
+                          run_program_async)
+from headless import run_program
+from programas import (new_simulator, quiet, random_program, random_registers,
+                       state)
+from simulador import Simulator
+
+SEEDS = range(100)
+MODES = [Simulator.MODE_STAGED, Simulator.MODE_FAST, Simulator.MODE_TRANSLATE]
+JUMP_TO_START = 0x16000000  # J 0
+
+
+def expected_run(words, registers, mode, max_cycles, max_instructions):
+    sim = new_simulator(words, registers, mode=mode)
+    with quiet():
+        stop = sim.execute(max_cycles, max_instructions=max_instructions)
+    return state(sim), stop.kind
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_runner_matches_execute(seed):
+    rng = random.Random(seed)
+    words = random_program(rng, rng.randrange(3, 40))
+    registers = random_registers(rng)
+    mode = rng.choice(MODES)
+    max_cycles = 4 * rng.randrange(1, 2000)
+    max_instructions = rng.choice([None, rng.randrange(1, 3000)])
+
+    sim = new_simulator(words, registers, mode=mode)
+    runner = AsyncRunner(sim, max_cycles, max_instructions,
+                         initial_slice=rng.randrange(MIN_SLICE, 200))
+    with quiet():
+        stop = asyncio.run(runner.run())
+    assert ((state(sim), stop.kind) ==
+            expected_run(words, registers, mode, max_cycles, max_instructions))
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_pause_cancel_and_rerun_match_execute(seed):
+    # Programa que volta ao início em vez de parar (roda até o limite,
+    # salvo opcode inválido ou HALT aleatório)
+    rng = random.Random(1000 + seed)
+    words = random_program(rng, rng.randrange(3, 40))
+    words[-1] = JUMP_TO_START
+    registers = random_registers(rng)
+    mode = rng.choice(MODES)
+    max_instructions = rng.randrange(200, 5000)
+    pause_at = rng.randrange(1, 4)
+    cancel_at = pause_at + rng.randrange(1, 4)
+
+    sim = new_simulator(words, registers, mode=mode)
+
+    def progress(p):
+        if p.slices == pause_at:
+            runner.pause()
+        if p.slices == cancel_at:
+            task.cancel()
+
+    runner = AsyncRunner(sim, None, max_instructions, progress=progress,
+                         initial_slice=MIN_SLICE)
+
+    async def interrupted():
+        nonlocal task
+        task = asyncio.create_task(runner.run())
+        while not runner.paused and not task.done():
+            await asyncio.sleep(0)
+        if runner.paused:
+            instructions = sim.instruction_count
+            for _ in range(10):
+                await asyncio.sleep(0)
+            assert sim.instruction_count == instructions
+            runner.resume()
+        try:
+            await task
+        except asyncio.CancelledError:
+            # Cancelado numa fronteira de instrução (o trap do modo staged
+            # para no meio dela)
+            assert sim.halted or sim.cycle_counter == (
+                sim.STAGES_PER_INSTRUCTION * sim.instruction_count)
+        return await runner.run()
+
+    task = None
+    with quiet():
+        stop = asyncio.run(interrupted())
+    assert ((state(sim), stop.kind) ==
+            expected_run(words, registers, mode, None, max_instructions))
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_run_program_async_matches_headless(mode):
+    rng = random.Random(3)
+    words = random_program(rng, 30)
+    program = '\n'.join(f'{word:032b}' for word in words).encode()
+    result = asyncio.run(run_program_async(program, mode=mode,
+                                           registers={1: 9}))
+    expected = run_program(program, mode=mode, registers={1: 9})
+    assert result.registers == expected.registers
+    assert result.cycles == expected.cycles
+    assert result.stop.kind == expected.stop.kind
+
+
+def test_slice_adaptation():
+    sim = new_simulator([JUMP_TO_START], mode=Simulator.MODE_FAST)
+    runner = AsyncRunner(sim, target_latency=0.005, initial_slice=256)
+
+    runner._adapt(256, 0.0005)      # 10x mais rápido: cresce até MAX_GROWTH
+    assert runner.slice_size == 256 * MAX_GROWTH
+    runner._adapt(1024, 0.005)      # no alvo: mantém
+    assert runner.slice_size == 1024
+    runner._adapt(1024, 0.010)      # 2x mais lento: reduz à metade
+    assert runner.slice_size == 512
+    runner._adapt(100, 1.0)         # trecho encurtado por limite: ignora
+    assert runner.slice_size == 512
+    runner._adapt(512, 0.0)         # duração não mensurável: cresce
+    assert runner.slice_size == 512 * MAX_GROWTH
+
+    runner.slice_size = MIN_SLICE
+    runner._adapt(MIN_SLICE, 1.0)
+    assert runner.slice_size == MIN_SLICE
+    runner.slice_size = MAX_SLICE
+    runner._adapt(MAX_SLICE, 0.0)
+    assert runner.slice_size == MAX_SLICE
+
+
+def test_slices_grow_toward_target_latency():
+    # Um laço infinito em trechos de 16 instruções (bem abaixo de 20 ms)
+    sim = new_simulator([JUMP_TO_START], mode=Simulator.MODE_FAST)
+    runner = AsyncRunner(sim, None, 200000, target_latency=0.02,
+                         initial_slice=MIN_SLICE)
+    sizes = []
+
+    async def collect():
+        async for progress in runner.slices():
+            sizes.append(progress.slice_size)
+
+    asyncio.run(collect())
+    assert sizes[0] > MIN_SLICE
+    assert max(sizes) > 100 * MIN_SLICE
@@ -0,0 +1,137 @@
+"""
+Caches: a hierarquia I/D (cache.py) contra um modelo de referência
+simples (um OrderedDict por conjunto) e o cache em disco de imagens texto
+(text_loader.ParsedImageCache): desligado por padrão, invalidado quando o
+arquivo muda e limitado a max_entries.
+"""
+
+import contextlib
+import io
+import os
+import random
+from collections import OrderedDict
+
+import pytest
+
+from cache import Cache
+from memory import Memory
+from text_loader import ParsedImageCache
+
+MEMORY_LATENCY = 100
+
+
+def reference_counts(size, line, ways, policy, write_policy, stream):
+    """Contadores esperados; 'memoria' conta acessos à memória principal."""
+    sets = size // (line * ways)
+    tables = [OrderedDict() for _ in range(sets)]
+    counts = dict.fromkeys(('leituras', 'escritas', 'faltas_leitura',
+                            'faltas_escrita', 'despejos', 'write_backs',
+                            'memoria'), 0)
+    for address, is_write in stream:
+        block = address // line
+        table = tables[block % sets]
+        tag = block // sets
+        counts['escritas' if is_write else 'leituras'] += 1
+        if tag in table:
+            if policy == 'lru':
+                table.move_to_end(tag)
+            if is_write:
+                if write_policy == 'wb':
+                    table[tag] = True
+                else:
+                    counts['memoria'] += 1
+            continue
+        counts['faltas_escrita' if is_write else 'faltas_leitura'] += 1
+        if is_write and write_policy == 'wt':
+            counts['memoria'] += 1  # sem alocação na escrita
+            continue
+        if len(table) == ways:
+            _, dirty = table.popitem(last=False)
+            counts['despejos'] += 1
+            if dirty:
+                counts['write_backs'] += 1
+                counts['memoria'] += 1
+        table[tag] = is_write
+        counts['memoria'] += 1
+    return counts
+
+
+@pytest.mark.parametrize('seed', range(200))
+def test_cache_matches_reference_model(seed):
+    rng = random.Random(seed)
+    size_bits = rng.randint(2, 8)
+    line_bits = rng.randint(0, 2)
+    size, line = 2 ** size_bits, 2 ** line_bits
+    ways = 2 ** rng.randint(0, min(3, size_bits - line_bits))
+    policy = rng.choice(['lru', 'fifo'])
+    write_policy = rng.choice(['wb', 'wt'])
+    stream = [(rng.randrange(512), rng.random() < 0.3) for _ in range(3000)]
+
+    cache = Cache('T', size, line, ways, policy, write_policy, hit_latency=1,
+                  memory_latency=MEMORY_LATENCY)
+    for address, is_write in stream:
+        cache.access(address, is_write)
+
+    got = {'leituras': cache.reads, 'escritas': cache.writes,
+           'faltas_leitura': cache.read_misses,
+           'faltas_escrita': cache.write_misses,
+           'despejos': cache.evictions, 'write_backs': cache.writebacks,
+           'memoria': (cache.cycles - len(stream)) // MEMORY_LATENCY}
+    assert got == reference_counts(size, line, ways, policy, write_policy,
+                                   stream)
+
+
+PROGRAM = ("address 0000000000000000\n"
+           "00001111000000000000010100000001\n"
+           "11111111111111111111111111111111\n")
+
+
+def load_text(path, use_cache=False):
+    """(palavras carregadas, True se vieram do cache)."""
+    memory = Memory()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        count = memory.load_program_from_text(str(path), use_cache=use_cache)
+    words = [memory.read(address) for address in range(count)]
+    return words, '(cache)' in output.getvalue()
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    directory = tmp_path / 'cache'
+    monkeypatch.setenv(ParsedImageCache.ENV_DIR, str(directory))
+    return directory
+
+
+def test_text_cache_is_opt_in(tmp_path, cache_dir):
+    program = tmp_path / 'programa.txt'
+    program.write_text(PROGRAM)
+    assert load_text(program) == ([0x0F000501, 0xFFFFFFFF], False)
+    assert load_text(program) == ([0x0F000501, 0xFFFFFFFF], False)
+    assert not cache_dir.exists()
+
+
+def test_text_cache_hit_and_invalidation(tmp_path, cache_dir):
+    program = tmp_path / 'programa.txt'
+    program.write_text(PROGRAM)
+    words = [0x0F000501, 0xFFFFFFFF]
+    assert load_text(program, use_cache=True) == (words, False)
+    assert len(os.listdir(cache_dir)) == 1
+    assert load_text(program, use_cache=True) == (words, True)
+
+    # Conteúdo novo no mesmo caminho substitui a entrada
+    program.write_text(PROGRAM.replace('0101', '0111', 1))
+    words = [0x0F000701, 0xFFFFFFFF]
+    assert load_text(program, use_cache=True) == (words, False)
+    assert load_text(program, use_cache=True) == (words, True)
+    assert len(os.listdir(cache_dir)) == 1
+
+
+def test_text_cache_is_bounded(tmp_path, cache_dir):
+    cache = ParsedImageCache(max_entries=3)
+    for index in range(6):
+        program = tmp_path / f'programa{index}.txt'
+        program.write_text(PROGRAM)
+        cache.store(str(program), program.read_bytes(),
+                    [(0, [0x0F000501, 0xFFFFFFFF])])
+    assert len(os.listdir(cache_dir)) == 3
@@ -0,0 +1,106 @@
+"""
+Checkpoint (checkpoint.py): salvar num ciclo qualquer (no modo staged,
+inclusive no meio de uma instrução), restaurar num Simulator novo e
+continuar deve dar o mesmo estado que a execução sem interrupção.
+Checkpoints corrompidos ou truncados são recusados sem alterar o
+simulador.
+"""
+
+import random
+
+import pytest
+
+from breakpoints import STOP_TRAP
+from checkpoint import (CODECS, CheckpointError, encode_checkpoint,
+                        restore_checkpoint)
+from programas import (HALT_WORD, new_simulator, quiet, random_program,
+                       random_registers, state)
+from simulador import Simulator
+
+SEEDS = range(300)
+MODES = [Simulator.MODE_STAGED, Simulator.MODE_FAST, Simulator.MODE_TRANSLATE]
+
+
+def checkpoint_at(words, registers, mode, cycles, codec='zlib'):
+    sim = new_simulator(words, registers, mode=mode)
+    with quiet():
+        sim.execute(max_cycles=cycles)
+    return encode_checkpoint(sim, codec)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_resume_matches_uninterrupted_run(seed):
+    rng = random.Random(seed)
+    words = random_program(rng, rng.randrange(3, 40))
+    registers = random_registers(rng)
+    mode = rng.choice(MODES)
+    total = 4 * rng.randrange(1, 400)
+    # Só o modo staged para no meio de uma instrução
+    if mode == Simulator.MODE_STAGED:
+        cut = rng.randrange(1, total)
+    else:
+        cut = 4 * rng.randrange(1, total // 4 + 1)
+
+    expected = new_simulator(words, registers, mode=mode)
+    with quiet():
+        expected_stop = expected.execute(max_cycles=total)
+
+    data = checkpoint_at(words, registers, mode, cut, rng.choice(list(CODECS)))
+    sim = new_simulator([], mode=mode)
+    restore_checkpoint(sim, data)
+    with quiet():
+        stop = sim.execute(max_cycles=total, resume=True)
+
+    assert state(sim) == state(expected)
+    assert stop.kind == expected_stop.kind
+    assert sim.alu.zero_divisions == expected.alu.zero_divisions
+
+
+def test_trap_survives_checkpoint():
+    # LCL R1, 5; opcode inválido 0xFE; HALT
+    words = [0x0F000501, 0xFE000000, HALT_WORD]
+    data = checkpoint_at(words, {}, Simulator.MODE_FAST, 1000)
+    sim = new_simulator([], mode=Simulator.MODE_FAST)
+    restore_checkpoint(sim, data)
+    assert sim.trap == (1, 0xFE000000)
+    with quiet():
+        assert sim.execute(resume=True).kind == STOP_TRAP
+
+
+def restore_or_error(data):
+    """(estado antes, estado depois, erro) da restauração num simulador."""
+    sim = new_simulator([0x0F000701, HALT_WORD], mode=Simulator.MODE_FAST)
+    before = state(sim)
+    try:
+        restore_checkpoint(sim, data)
+    except CheckpointError:
+        return before, state(sim), True
+    return before, state(sim), False
+
+
+@pytest.mark.parametrize('codec', list(CODECS))
+def test_truncated_checkpoint_is_rejected(codec):
+    rng = random.Random(1)
+    words = random_program(rng, 30)
+    data = checkpoint_at(words, random_registers(rng), Simulator.MODE_FAST,
+                         400, codec)
+    for length in range(len(data)):
+        before, after, rejected = restore_or_error(data[:length])
+        assert rejected and after == before, length
+
+
+def test_corrupted_checkpoint_is_rejected():
+    rng = random.Random(2)
+    words = random_program(rng, 30)
+    data = checkpoint_at(words, random_registers(rng), Simulator.MODE_FAST,
+                         400, 'zlib')
+    _, intact, _ = restore_or_error(data)
+    # O zlib confere a carga (adler32) e o cabeçalho é validado campo a
+    # campo; só passam bits que o zlib ignora (ex.: enchimento do último
+    # byte), e esses restauram o mesmo estado
+    for index in range(len(data)):
+        for bit in range(8):
+            corrupted = bytearray(data)
+            corrupted[index] ^= 1 << bit
+            before, after, rejected = restore_or_error(bytes(corrupted))
+            assert after == (before if rejected else intact), (index, bit)
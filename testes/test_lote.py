@@ -0,0 +1,114 @@
+"""
+Execução em lote (batch.py) contra o modo rápido: cada lane deve
+terminar no mesmo estado que um Simulator com os mesmos valores
+iniciais, inclusive quando as lanes divergem em desvios ou executam
+código diferente no mesmo endereço.
+"""
+
+import random
+
+import pytest
+
+from memory import Memory
+from programas import INTERESTING, new_simulator, random_program
+from simulador import Simulator
+
+pytest.importorskip('numpy')
+from batch import BatchSimulator  # noqa: E402
+
+ADDRESS_BITS = 12
+LANES = 4
+SEEDS = range(300)
+
+
+def lane_inputs(rng):
+    return [{reg: rng.choice(INTERESTING + [rng.getrandbits(32), rng.randrange(16)])
+             for reg in range(1, 8)} for _ in range(LANES)]
+
+
+def expected_state(words, registers, max_cycles, patch=None):
+    sim = new_simulator(words, registers, mode=Simulator.MODE_FAST,
+                        memory=Memory(ADDRESS_BITS))
+    if patch is not None:
+        sim.memory.write(*patch)
+    sim.execute(max_cycles=max_cycles)
+    cpu = sim.cpu
+    n, z, c, v = cpu.get_flag_values()
+    return {'registradores': list(cpu.regs), 'pc': cpu.PC,
+            'flags': n << 3 | z << 2 | c << 1 | v, 'parado': sim.halted,
+            'ciclos': sim.cycle_counter,
+            'instrucoes': sim.instruction_count,
+            'memoria': sim.memory.to_bytes(0, None, 'little')}
+
+
+def lane_state(result, lane):
+    return {'registradores': [int(r) for r in result['registers'][lane]],
+            'pc': int(result['pc'][lane]),
+            'flags': int(result['flags'][lane]),
+            'parado': bool(result['halted'][lane]),
+            'ciclos': int(result['cycles'][lane]),
+            'instrucoes': int(result['instructions'][lane]),
+            'memoria': result['memory'][lane].astype('<u4').tobytes()}
+
+
+def new_batch(words):
+    batch = BatchSimulator(LANES, ADDRESS_BITS)
+    memory = Memory(ADDRESS_BITS)
+    for address, word in enumerate(words):
+        memory.write(address, word)
+    batch.load_memory(memory)
+    return batch
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_lanes_match_fast_mode(seed):
+    rng = random.Random(seed)
+    words = random_program(rng, rng.randrange(3, 40))
+    inputs = lane_inputs(rng)
+    max_cycles = 4 * rng.randrange(1, 400)
+
+    batch = new_batch(words)
+    for reg in range(1, 8):
+        batch.set_register(reg, [registers[reg] for registers in inputs])
+    result = batch.run(max_cycles=max_cycles)
+
+    for lane, registers in enumerate(inputs):
+        assert (lane_state(result, lane) ==
+                expected_state(words, registers, max_cycles)), lane
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_lanes_with_different_code(seed):
+    # Cada lane tem uma palavra diferente no mesmo endereço do programa
+    rng = random.Random(5000 + seed)
+    words = random_program(rng, rng.randrange(3, 30))
+    inputs = lane_inputs(rng)
+    address = rng.randrange(len(words))
+    patches = [random_program(rng, 1)[0] for _ in range(LANES)]
+
+    batch = new_batch(words)
+    for reg in range(1, 8):
+        batch.set_register(reg, [registers[reg] for registers in inputs])
+    batch.set_memory(address, patches)
+    result = batch.run(max_cycles=2000)
+
+    for lane, registers in enumerate(inputs):
+        assert (lane_state(result, lane) ==
+                expected_state(words, registers, 2000,
+                               (address, patches[lane]))), lane
+
+
+def test_to_simulator_continues_lane():
+    rng = random.Random(7)
+    words = random_program(rng, 30)
+    inputs = lane_inputs(rng)
+    batch = new_batch(words)
+    for reg in range(1, 8):
+        batch.set_register(reg, [registers[reg] for registers in inputs])
+    batch.run(max_cycles=400)
+
+    sim = batch.to_simulator(2, mode=Simulator.MODE_FAST)
+    sim.execute(max_cycles=2000, resume=True)
+    expected = expected_state(words, inputs[2], 2000)
+    assert list(sim.cpu.regs) == expected['registradores']
+    assert sim.cycle_counter == expected['ciclos']
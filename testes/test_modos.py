@@ -0,0 +1,81 @@
+"""
+Modos de execução: staged (referência), fast, translate (bit a bit
+idêntico ao interpretador, inclusive com código automodificável), com
+memória paginada, com caches e pipeline (mesmo estado arquitetural,
+outra contagem de ciclos). Os exemplos são conferidos com os goldens.
+"""
+
+import glob
+import os
+import random
+
+import pytest
+
+from cache import build_hierarchy
+from paged_memory import PagedMemory
+from programas import (HALT_WORD, new_simulator, random_program,
+                       random_registers, state)
+from regressao import run_suite
+from simulador import Simulator
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'exemplos')
+SEEDS = range(300)
+
+VARIANTS = {
+    'fast': lambda: {'mode': Simulator.MODE_FAST},
+    'translate': lambda: {'mode': Simulator.MODE_TRANSLATE},
+    'fast_paginada': lambda: {'mode': Simulator.MODE_FAST,
+                              'memory': PagedMemory(16)},
+    'translate_caches': lambda: {
+        'mode': Simulator.MODE_TRANSLATE,
+        'caches': build_hierarchy('64:4:2', '64:4:2:fifo:wt', '256:8:4')},
+}
+
+
+def run(words, registers, max_cycles, **options):
+    sim = new_simulator(words, registers, **options)
+    stop = sim.execute(max_cycles=max_cycles)
+    return state(sim), stop.kind
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_modes_match_staged(seed):
+    rng = random.Random(seed)
+    words = random_program(rng, rng.randrange(3, 40))
+    registers = random_registers(rng)
+    max_cycles = 4 * rng.randrange(1, 400)
+    expected = run(words, registers, max_cycles, mode=Simulator.MODE_STAGED)
+
+    for name, options in VARIANTS.items():
+        assert run(words, registers, max_cycles, **options()) == expected, name
+
+    if expected[0]['parado']:
+        # O pipeline só muda a contagem de ciclos
+        got, kind = run(words, registers, None, mode=Simulator.MODE_PIPELINE)
+        reference = dict(expected[0])
+        del got['ciclos'], reference['ciclos']
+        assert (got, kind) == (reference, expected[1])
+
+
+def test_translator_sees_store_into_current_block():
+    # LCL R5, 10; LCL R7, 4; LOAD R6 <- [R5]; STORE [R7] <- R6; DEC R1; HALT
+    # O STORE troca o DEC (no mesmo bloco básico) pelo INC do endereço 10
+    words = [0x0F000A05, 0x0F000407, 0x10050006, 0x11060007, 0x1D010001,
+             HALT_WORD, 0, 0, 0, 0, 0x1C010001]
+    expected = run(words, {}, 1000, mode=Simulator.MODE_STAGED)
+    assert expected[0]['registradores'][1] == 1
+    for name, options in VARIANTS.items():
+        assert run(words, {}, 1000, **options()) == expected, name
+
+
+@pytest.mark.parametrize('mode', [Simulator.MODE_STAGED, Simulator.MODE_FAST,
+                                  Simulator.MODE_TRANSLATE,
+                                  Simulator.MODE_PIPELINE])
+def test_examples_match_goldens(mode):
+    programs = sorted(glob.glob(os.path.join(EXAMPLES, '*.asm')))
+    results = run_suite(programs, os.path.join(EXAMPLES, 'golden'), mode,
+                        jobs=2)
+    failures = [(r['programa'], r['diffs']) for r in results
+                if r['status'] != 'ok']
+    assert not failures
@@ -0,0 +1,136 @@
+"""
+Perfil de execução (profiler.py) contra contagens refeitas instrução a
+instrução no modo rápido: execuções e ciclos por PC e por opcode, blocos
+básicos, pilhas colapsadas (JAL empilha, JR R31 desempilha) e as tabelas
+impressas por print_report().
+"""
+
+import random
+
+import pytest
+
+from profiler import OP_JAL, OP_JR, function_name
+from programas import (new_simulator, quiet, random_program, random_registers,
+                       state)
+from simulador import Simulator
+
+SEEDS = range(150)
+RETURN_WORD = OP_JR << 24 | 31  # JR R31
+
+
+def program_with_calls(rng):
+    """Programa aleatório com chamadas (JAL) e retornos (JR R31) extras."""
+    words = random_program(rng, rng.randrange(3, 40))
+    for _ in range(rng.randrange(4)):
+        words[rng.randrange(len(words) - 1)] = (OP_JAL << 24 |
+                                                rng.randrange(len(words)))
+        words[rng.randrange(len(words) - 1)] = RETURN_WORD
+    return words
+
+
+def reference_profile(words, registers, max_cycles):
+    """Contadores por PC, por opcode e por pilha, instrução a instrução."""
+    sim = new_simulator(words, registers, mode=Simulator.MODE_FAST)
+    pcs, opcodes, stacks = {}, {}, {}
+    stack = [sim.cpu.PC]
+    with quiet():
+        while sim.cycle_counter <= max_cycles - sim.STAGES_PER_INSTRUCTION:
+            pc, cycle = sim.cpu.PC & sim.address_mask, sim.cycle_counter
+            if not sim.execute_instruction():
+                break
+            spent = sim.cycle_counter - cycle
+            for table, key in ((pcs, pc), (opcodes, sim.opcode)):
+                count, cycles = table.get(key, (0, 0))
+                table[key] = (count + 1, cycles + spent)
+            stacks[tuple(stack)] = stacks.get(tuple(stack), 0) + spent
+            if sim.opcode == OP_JAL:
+                stack.append(sim.cpu.PC & sim.address_mask)
+            elif sim.opcode == OP_JR and sim.rc >= 31 and len(stack) > 1:
+                stack.pop()
+    return pcs, opcodes, stacks, state(sim)
+
+
+def profiled(words, registers, max_cycles):
+    sim = new_simulator(words, registers, mode=Simulator.MODE_FAST,
+                        profile=True)
+    with quiet():
+        sim.execute(max_cycles=max_cycles)
+    return sim
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_counters_match_reference(seed, tmp_path):
+    rng = random.Random(seed)
+    words = program_with_calls(rng)
+    registers = random_registers(rng)
+    max_cycles = 4 * rng.randrange(1, 400)
+    pcs, opcodes, stacks, final = reference_profile(words, registers,
+                                                    max_cycles)
+    sim = profiled(words, registers, max_cycles)
+    profiler = sim.profiler
+
+    # O perfil não muda a execução
+    assert state(sim) == final
+    assert profiler.executed_pcs() == sorted(pcs)
+    assert {pc: (profiler.count(pc), profiler.pc_cycles(pc))
+            for pc in profiler.executed_pcs()} == pcs
+    assert {op: (profiler.opcode_counts[op], profiler.opcode_cycles(op))
+            for op in range(256) if profiler.opcode_counts[op]} == opcodes
+
+    # Blocos básicos: contíguos, cobrem cada PC executado uma vez
+    blocks = profiler.basic_blocks()
+    covered = [start + i for start, length, _, _ in blocks
+               for i in range(length)]
+    assert covered == sorted(pcs)
+    assert sum(block[3] for block in blocks) == sim.cycle_counter
+
+    path = tmp_path / 'pilhas.txt'
+    lines = profiler.write_collapsed(str(path))
+    expected = [';'.join(map(function_name, stack)) + f' {spent}'
+                for stack, spent in sorted(stacks.items()) if spent]
+    assert path.read_text().splitlines() == expected
+    assert lines == len(expected)
+
+
+def report_rows(text, title):
+    """Linhas de dados de uma tabela do relatório, já divididas."""
+    lines = text.splitlines()
+    start = next(i for i, line in enumerate(lines) if line.startswith(title))
+    rows = []
+    for line in lines[start + 2:]:
+        if not line.startswith('  '):
+            break
+        rows.append(line.split())
+    return rows
+
+
+def test_report_tables(capsys):
+    # Semente com três funções e uma chamada recursiva
+    rng = random.Random(34)
+    words = program_with_calls(rng)
+    registers = random_registers(rng)
+    pcs, opcodes, stacks, _ = reference_profile(words, registers, 4000)
+    sim = profiled(words, registers, 4000)
+    capsys.readouterr()
+    sim.profiler.print_report(limit=5)
+    text = capsys.readouterr().out
+    total = sim.cycle_counter
+
+    hot = sorted(pcs, key=lambda pc: (-pcs[pc][1], pc))[:5]
+    assert [row[:4] for row in report_rows(text, 'Pontos quentes')] == [
+        [str(pc), str(pcs[pc][0]), str(pcs[pc][1]),
+         f'{100 * pcs[pc][1] / total:.1f}%'] for pc in hot]
+
+    rows = report_rows(text, 'Por opcode')
+    assert {row[0]: (int(row[1]), int(row[2])) for row in rows} == {
+        sim.decoder.get_mnemonic(op): counts for op, counts in opcodes.items()}
+
+    functions = {}
+    for stack, spent in stacks.items():
+        functions.setdefault(stack[-1], [0, 0])[0] += spent
+        for func in set(stack):
+            functions.setdefault(func, [0, 0])[1] += spent
+    top = sorted(functions, key=lambda f: (-functions[f][1], f))[:5]
+    assert [row[:3] for row in report_rows(text, 'Funções')] == [
+        [function_name(f), str(functions[f][0]), str(functions[f][1])]
+        for f in top]
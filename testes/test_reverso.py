@@ -0,0 +1,152 @@
+"""
+Execução reversa (reverse.py) contra o histórico gravado: o estado após
+goto/reverse_step/run_to_cycle deve ser igual ao de uma reexecução do
+início, e reverse_continue deve parar na ocorrência anterior mais
+recente de breakpoint ou escrita observada.
+"""
+
+import random
+
+import pytest
+
+from breakpoints import (STOP_BREAKPOINT, STOP_CYCLE, STOP_HALT,
+                         STOP_HISTORY_START, STOP_TRAP, STOP_WATCH_WRITE)
+from journal import KIND_MEM
+from programas import (HALT_WORD, new_simulator, quiet, random_program,
+                       random_registers, reference_state, state)
+from simulador import Simulator
+
+MAX_CYCLES = 4000
+SEEDS = range(40)
+
+# (intervalo entre checkpoints, orçamento): diários e segmentos
+# descartados pelo orçamento forçam a reexecução a partir de checkpoints
+HISTORY_OPTIONS = [(1, 10 ** 9), (3, 10 ** 9), (7, 3000), (50, 20000),
+                   (1000, 10 ** 9), (3, 2000)]
+
+
+def recorded_simulator(rng, words, registers, mode=Simulator.MODE_FAST):
+    interval, budget = rng.choice(HISTORY_OPTIONS)
+    sim = new_simulator(words, registers, mode=mode)
+    debugger = sim.enable_reverse(interval, budget)
+    with quiet():
+        sim.run(max_cycles=MAX_CYCLES)
+    return sim, debugger
+
+
+def recorded_history(words, registers):
+    """Por instrução: PC e endereços escritos (execução de referência)."""
+    sim = new_simulator(words, registers, mode=Simulator.MODE_FAST)
+    journal = sim.enable_journal()
+    pcs, writes = [], []
+    with quiet():
+        while sim.cycle_counter <= MAX_CYCLES - sim.STAGES_PER_INSTRUCTION:
+            journal.clear()
+            pc = sim.cpu.PC & sim.address_mask
+            if not sim.execute_instruction():
+                break
+            pcs.append(pc)
+            writes.append({index for kind, index, _, _ in journal.entries()
+                           if kind == KIND_MEM})
+    return pcs, writes
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_goto_matches_reexecution(seed):
+    rng = random.Random(seed)
+    words = random_program(rng, rng.randrange(3, 40))
+    registers = random_registers(rng)
+    mode = rng.choice([Simulator.MODE_FAST, Simulator.MODE_TRANSLATE,
+                       Simulator.MODE_STAGED])
+    sim, debugger = recorded_simulator(rng, words, registers, mode)
+    total = debugger.position
+
+    with quiet():
+        for _ in range(6):
+            target = rng.randrange(0, total + 3)
+            reached = debugger.goto(target)
+            assert state(sim) == reference_state(words, reached, registers)
+            if debugger.history_start <= target < total:
+                assert reached == target
+
+        debugger.reverse_step(2)
+        assert state(sim) == reference_state(words, debugger.position, registers)
+
+        cycle = rng.randrange(0, sim.cycle_counter + 40)
+        stop = debugger.run_to_cycle(cycle)
+        assert state(sim) == reference_state(words, debugger.position, registers)
+        if stop.kind == STOP_CYCLE:
+            assert sim.cycle_counter <= cycle
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_reverse_continue_matches_history(seed):
+    rng = random.Random(1000 + seed)
+    words = random_program(rng, rng.randrange(3, 40))
+    registers = random_registers(rng)
+    pcs, writes = recorded_history(words, registers)
+    if not pcs:
+        pytest.skip("programa sem instruções executadas")
+    sim, debugger = recorded_simulator(rng, words, registers)
+
+    breakpoint_pc = rng.choice(pcs)
+    sim.add_breakpoint(breakpoint_pc)
+    watched = None
+    written = sorted(set().union(*writes))
+    if written and rng.random() < 0.5:
+        watched = rng.choice(written)
+        sim.add_watchpoint(watched, watched, 'w')
+
+    position = debugger.position
+    with quiet():
+        for _ in range(3):
+            # Parada esperada: antes da instrução no breakpoint, ou logo
+            # depois da escrita observada
+            expected = None
+            for p in range(position - 1, debugger.history_start - 1, -1):
+                if watched in writes[p] and p + 1 < position:
+                    expected, kind = p + 1, STOP_WATCH_WRITE
+                    break
+                if pcs[p] == breakpoint_pc:
+                    expected, kind = p, STOP_BREAKPOINT
+                    break
+            start = debugger.history_start
+            stop = debugger.reverse_continue()
+            if expected is None:
+                assert stop.kind == STOP_HISTORY_START
+                assert debugger.position == start
+                break
+            assert (stop.kind, debugger.position) == (kind, expected)
+            assert state(sim) == reference_state(words, expected, registers)
+            position = expected
+
+
+def trapping_simulator():
+    # LCL R1, 1; INC R1, R1; opcode inválido; HALT
+    words = [0x0F000101, 0x1C010001, 0xFE000000, HALT_WORD]
+    sim = new_simulator(words, mode=Simulator.MODE_FAST)
+    return sim, sim.enable_reverse(interval=2)
+
+
+def test_run_to_cycle_reports_trap_and_rewind_clears_it():
+    sim, debugger = trapping_simulator()
+    stop = debugger.run_to_cycle(100)
+    assert stop.kind == STOP_TRAP and stop.pc == 2
+    assert sim.trap is not None
+
+    stop = debugger.run_to_cycle(4)
+    assert stop.kind == STOP_CYCLE
+    assert (sim.halted, sim.trap, sim.stop_reason) == (False, None, None)
+
+    assert debugger.run(1000).kind == STOP_TRAP
+    debugger.reverse_step()
+    assert sim.trap is None and not sim.halted
+
+
+def test_run_to_cycle_reports_halt():
+    words = [0x0F000101, HALT_WORD]
+    sim = new_simulator(words, mode=Simulator.MODE_FAST)
+    debugger = sim.enable_reverse()
+    assert debugger.run_to_cycle(1000).kind == STOP_HALT
+    assert debugger.run_to_cycle(0).kind == STOP_CYCLE
+    assert not sim.halted
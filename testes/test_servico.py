@@ -0,0 +1,141 @@
+"""
+Serviço de simulação (servico.py): resultados iguais aos da API headless,
+cache de fontes montadas, erros JSON-RPC, teto de ciclos do pipeline,
+reinício do pool após estourar o tempo, encerramento sem esperar jobs e
+uma chamada completa por HTTP.
+"""
+
+import base64
+import os
+import threading
+import time
+
+import pytest
+
+import servico
+from headless import run_program
+from servico import (ERROR_METHOD, ERROR_PROGRAM, ERROR_TIMEOUT,
+                     PIPELINE_CYCLES_PER_SECOND, ServiceClient, ServiceError,
+                     SimulationService, assemble_source, create_server)
+from simulador import Simulator
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'exemplos')
+LOOP = "lcl r1, 0\ninicio:\ninc r1, r1\nj inicio\n"
+
+
+@pytest.fixture(scope='module')
+def service():
+    service = SimulationService(workers=2, timeout=5.0)
+    assert service.warm_up() == 2
+    yield service
+    service.shutdown()
+
+
+def read_example(name):
+    with open(os.path.join(EXAMPLES, name), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.mark.parametrize('mode', [Simulator.MODE_FAST, Simulator.MODE_STAGED,
+                                  Simulator.MODE_TRANSLATE])
+def test_execute_matches_headless(service, mode):
+    source = read_example('09_fatorial.asm')
+    expected = run_program(assemble_source(source), mode=mode,
+                           registers={1: 6})
+    response = service.execute({'fonte': source, 'modo': mode,
+                                'registradores': {'1': 6}})
+    assert response['registradores'] == expected.registers
+    assert response['ciclos'] == expected.cycles
+    assert response['parada'] == expected.stop.kind
+
+    image = base64.b64encode(assemble_source(source)).decode()
+    by_image = service.execute({'imagem': image, 'modo': mode,
+                                'registradores': {'1': 6}})
+    assert by_image['registradores'] == expected.registers
+
+
+def test_source_cache(service):
+    source = read_example('10_fibonacci.asm')
+    service.execute({'fonte': source})
+    assert service.execute({'fonte': source})['cache'] is True
+
+
+def test_errors(service):
+    with pytest.raises(ServiceError) as error:
+        service.execute({'fonte': "instrucao_invalida r1"})
+    assert error.value.code == ERROR_PROGRAM
+    response = service.handle({'jsonrpc': '2.0', 'id': 3, 'method': 'x'})
+    assert response['error']['code'] == ERROR_METHOD
+
+
+def test_pipeline_cycles_capped_by_timeout(service):
+    response = service.execute({'fonte': LOOP, 'modo': Simulator.MODE_PIPELINE,
+                                'tempo_limite': 0.2})
+    assert response['parada'] == 'limit'
+    assert response['ciclos'] <= 0.2 * PIPELINE_CYCLES_PER_SECOND
+
+
+def test_hard_timeout_restarts_pool(monkeypatch):
+    monkeypatch.setattr(servico, 'HARD_TIMEOUT_MARGIN', 0.5)
+    service = SimulationService(workers=2, timeout=5.0)
+    try:
+        assert service.warm_up() == 2
+        old_workers = service.pool.processes()
+        assert len(old_workers) == 2
+        results = {}
+
+        def other_job():
+            results['outro'] = service._submit(time.sleep, 1.0, timeout=5.0)
+
+        thread = threading.Thread(target=other_job)
+        thread.start()
+        time.sleep(0.2)
+        with pytest.raises(ServiceError) as error:
+            service._submit(time.sleep, 60, timeout=0.2)
+        assert error.value.code == ERROR_TIMEOUT
+        thread.join(10)
+
+        # O job interrompido junto foi repetido no pool novo
+        assert 'outro' in results
+        assert service.restarts == 1
+        assert not any(process.is_alive() for process in old_workers)
+        assert service.execute({'fonte': "lcl r1, 7\nhalt"})['registradores'][1] == 7
+    finally:
+        service.shutdown()
+
+
+def test_shutdown_does_not_wait_for_running_jobs():
+    service = SimulationService(workers=1, timeout=60.0)
+    service.warm_up()
+    errors = []
+
+    def stuck_job():
+        try:
+            service._submit(time.sleep, 60, timeout=60.0)
+        except ServiceError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=stuck_job)
+    thread.start()
+    time.sleep(0.3)
+    start = time.perf_counter()
+    service.shutdown()
+    thread.join(10)
+    assert time.perf_counter() - start < 5
+    assert len(errors) == 1
+
+
+def test_http_round_trip(service):
+    server = create_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    client = ServiceClient(server.server_address[1], timeout=10)
+    try:
+        result = client.call('executar', {'fonte': "lcl r1, 5\nhalt"})
+        assert result['registradores'][1] == 5
+        assert client.call('estatisticas')['workers'] == 2
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()